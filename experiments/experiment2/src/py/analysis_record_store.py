@@ -0,0 +1,213 @@
+"""
+A compact, append-only store for the analyses of Reddit Submissions. Analyses are held as slotted records, which allow
+for constant-time appends and in-place updates; a DataFrame is only built when the store is exported.
+"""
+
+import numpy
+import pandas
+
+
+class AnalysisRecord:
+    """
+    The analysis of a single Reddit Submission.
+    """
+
+    """ Class Fields """
+    # The fields of an analysis, in the order of the exported DataFrame columns.
+    __slots__ = (
+        'subm_object',
+        'subm_id',
+        'comment_count',
+        'title',
+        'title_kwd_intxn',
+        'title_kwd_intxn_size',
+        'title_kwd_weighted_score',
+        'title_kwds',
+        'title_relevance_score',
+        'subma_relevance_score',
+        'subma_kwd_intxn',
+        'subma_kwd_intxn_size',
+        'subma_kwd_weighted_score',
+        'subma_kwds',
+        'subma_url',
+        'utterance_content',
+        'engagement_time'
+    )
+
+
+    """ Constructor """
+    def __init__(
+            self,
+            subm_object=None,
+            subm_id: str = None,
+            comment_count: int = None,
+            title: str = None,
+            title_kwd_intxn: list = None,
+            title_kwd_intxn_size: float = None,
+            title_kwd_weighted_score: float = None,
+            title_kwds: (list, tuple) = None,
+            title_relevance_score: float = None,
+            subma_relevance_score: float = None,
+            subma_kwd_intxn: list = None,
+            subma_kwd_intxn_size: float = None,
+            subma_kwd_weighted_score: float = None,
+            subma_kwds: (list, tuple) = None,
+            subma_url: str = None,
+            utterance_content: str = None,
+            engagement_time: str = None
+    ):
+        """
+        Creates an AnalysisRecord. Fields that were not measured are None.
+        """
+
+        self.subm_object = subm_object
+        self.subm_id = subm_id
+        self.comment_count = comment_count
+        self.title = title
+        self.title_kwd_intxn = title_kwd_intxn
+        self.title_kwd_intxn_size = title_kwd_intxn_size
+        self.title_kwd_weighted_score = title_kwd_weighted_score
+        self.title_kwds = title_kwds
+        self.title_relevance_score = title_relevance_score
+        self.subma_relevance_score = subma_relevance_score
+        self.subma_kwd_intxn = subma_kwd_intxn
+        self.subma_kwd_intxn_size = subma_kwd_intxn_size
+        self.subma_kwd_weighted_score = subma_kwd_weighted_score
+        self.subma_kwds = subma_kwds
+        self.subma_url = subma_url
+        self.utterance_content = utterance_content
+        self.engagement_time = engagement_time
+
+
+    """ Methods """
+    def update(self, fields: dict):
+        """
+        Updates the record in place.
+
+        :param fields: The values of the fields to update.
+        """
+
+        for field, value in fields.items():
+
+            setattr(self, field, value)
+
+
+    def to_dict(self, exclude: (list, tuple) = ()):
+        """
+        Returns the record as a dict.
+
+        :param exclude: The fields to omit (e.g. 'subm_object', which cannot be serialized).
+        :return: The dict of the record's fields.
+        """
+
+        return {field: getattr(self, field) for field in self.__slots__ if field not in exclude}
+
+
+class AnalysisRecordStore:
+    """
+    An append-only collection of AnalysisRecords, indexed by Submission ID.
+    """
+
+    """ Constructor """
+    def __init__(self):
+        """
+        Creates an empty AnalysisRecordStore.
+        """
+
+        # The records, in order of appending.
+        self.records = []
+
+        # The index of the position of each Submission's record within 'records'.
+        self.index = {}
+
+
+    """ Methods """
+    def append(self, analysis: dict):
+        """
+        Appends the analysis of a Submission to the store.
+
+        :param analysis: The analysis, as produced by RedditAgent.analyze_submission.
+        :return: The record of the analysis.
+        """
+
+        # Define the record.
+        record = AnalysisRecord(**analysis)
+
+        # Append and index the record.
+        self.index[record.subm_id] = len(self.records)
+        self.records.append(record)
+
+
+        return record
+
+
+    def extend(self, analyses: (list, tuple)):
+        """
+        Appends a collection of analyses to the store.
+
+        :param analyses: The analyses.
+        """
+
+        for analysis in analyses:
+
+            self.append(analysis)
+
+
+    def get(self, subm_id: str):
+        """
+        Returns the record of a Submission.
+
+        :param subm_id: The ID of the Submission.
+        :return: The record, or None if the Submission has not been analyzed.
+        """
+
+        position = self.index.get(subm_id)
+
+        return None if position is None else self.records[position]
+
+
+    def column(self, field: str, dtype=float):
+        """
+        Returns the values of a field for every record as a NumPy array.
+
+        :param field: The field.
+        :param dtype: The type of the array. For float arrays, fields that were not measured are NaN.
+        :return: The array of values, in the order of the records.
+        """
+
+        if dtype is float:
+
+            return numpy.fromiter(
+                (numpy.nan if getattr(record, field) is None else getattr(record, field) for record in self.records),
+                dtype=float,
+                count=len(self.records)
+            )
+
+        return numpy.array([getattr(record, field) for record in self.records], dtype=dtype)
+
+
+    def to_dataframe(self, exclude: (list, tuple) = ()):
+        """
+        Exports the store as a DataFrame with one row per record.
+
+        :param exclude: The fields to omit (e.g. 'subm_object', which cannot be serialized).
+        :return: The DataFrame.
+        """
+
+        # Define the exported columns.
+        columns = [field for field in AnalysisRecord.__slots__ if field not in exclude]
+
+        return pandas.DataFrame(
+            {column: [getattr(record, column) for record in self.records] for column in columns},
+            columns=columns
+        )
+
+
+    def __iter__(self):
+
+        return iter(self.records)
+
+
+    def __len__(self):
+
+        return len(self.records)
@@ -0,0 +1,208 @@
+"""
+An append-only, crash-safe archive of analysis records in the JSON Lines format. Records are written as they complete
+rather than at the end of a process, so an interrupted process loses at most the record being written. An archive is a
+sequence of segment files which are rotated by size and age, and which may be read while they are being written.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+
+class ArchiveWriter:
+    """
+    A writer of analysis records to the segments of an archive. Segments are named '<name>.<sequence>.jsonl' within the
+    archive directory. Every record is written as a single line and flushed, so readers see every complete record.
+
+    The durability of records is governed by the fsync policy:
+        - Always: every record is synced to disk before 'write' returns.
+        - Interval: records are synced at most every 'fsync_interval' seconds, and when a segment is closed.
+        - Never: records are left to the operating system to be written to disk.
+    """
+
+    """ Class Fields """
+    # The fsync policies.
+    fsync_policies = ("always", "interval", "never")
+
+
+    """ Constructor """
+    def __init__(
+            self,
+            archive_dp: str,
+            name: str,
+            max_bytes: (int, None) = 64 * 1024 * 1024,
+            max_seconds: (float, None) = None,
+            fsync_policy: str = "interval",
+            fsync_interval: float = 1.0
+    ):
+        """
+        Creates an ArchiveWriter, opening the first segment after any existing segments of the archive.
+
+        :param archive_dp: The directory of the archive.
+        :param name: The name of the archive (e.g. the date-time stamp of the process).
+        :param max_bytes: The size beyond which a segment is rotated. If None, segments are not rotated by size.
+        :param max_seconds: The age beyond which a segment is rotated. If None, segments are not rotated by age.
+        :param fsync_policy: The fsync policy (see the class description).
+        :param fsync_interval: The minimum amount of seconds between two syncs under the 'interval' policy.
+        """
+
+        if fsync_policy not in self.fsync_policies:
+            raise ValueError("Unknown fsync policy: " + str(fsync_policy))
+
+        self.archive_dp = archive_dp
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+
+        # The lock that serializes writes, which may be performed by the analysis and engagement threads.
+        self.lock = threading.Lock()
+
+        # Define the sequence number of the first segment.
+        self.sequence = len(archive_segments(archive_dp, name))
+
+        # The current segment and its state.
+        self.file = None
+        self.segment_fp = str()
+        self.segment_opened = 0.0
+        self.last_sync = 0.0
+
+        os.makedirs(archive_dp, exist_ok=True)
+        self.open_segment()
+
+
+    """ Methods """
+    def open_segment(self):
+        """
+        Opens the next segment of the archive.
+        """
+
+        self.segment_fp = os.path.join(self.archive_dp, "%s.%04d.jsonl" % (self.name, self.sequence))
+        self.file = open(self.segment_fp, "ab")
+        self.segment_opened = self.last_sync = time.monotonic()
+        self.sequence += 1
+
+
+    def close_segment(self):
+        """
+        Closes the current segment, syncing it to disk unless the fsync policy is 'never'.
+        """
+
+        if self.file is None:
+            return
+
+        self.file.flush()
+        if self.fsync_policy != "never":
+            os.fsync(self.file.fileno())
+
+        self.file.close()
+        self.file = None
+
+
+    def write(self, record: dict):
+        """
+        Appends a record to the archive, rotating the current segment beforehand if it is due.
+
+        :param record: The JSON-serializable record.
+        """
+
+        line = (json.dumps(record) + "\n").encode("utf-8")
+
+        with self.lock:
+
+            if self.file is None:
+                raise ValueError("The archive '" + self.name + "' is closed.")
+
+            # Rotate the segment if it has reached its maximum size or age.
+            if self.file.tell() > 0 and (
+                    (self.max_bytes is not None and self.file.tell() + len(line) > self.max_bytes)
+                    or (self.max_seconds is not None and time.monotonic() - self.segment_opened >= self.max_seconds)
+            ):
+                self.close_segment()
+                self.open_segment()
+
+            # Perform output. The line is written with a single call and flushed so that it is visible to readers.
+            self.file.write(line)
+            self.file.flush()
+
+            # Sync the segment as the policy requires.
+            now = time.monotonic()
+            if self.fsync_policy == "always" or (
+                    self.fsync_policy == "interval" and now - self.last_sync >= self.fsync_interval
+            ):
+                os.fsync(self.file.fileno())
+                self.last_sync = now
+
+
+    def close(self):
+        """
+        Closes the archive.
+        """
+
+        with self.lock:
+
+            self.close_segment()
+
+
+    def __enter__(self):
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+
+def archive_segments(archive_dp: str, name: str):
+    """
+    Returns the file-paths of the segments of an archive.
+
+    :param archive_dp: The directory of the archive.
+    :param name: The name of the archive.
+    :return: The list of segment file-paths, in order of writing.
+    """
+
+    return sorted(glob.glob(os.path.join(glob.escape(archive_dp), glob.escape(name) + ".[0-9][0-9][0-9][0-9].jsonl")))
+
+
+def read_records(archive_dp: str, name: str, latest: bool = True):
+    """
+    Reads the records of an archive, which may still be being written. A trailing partial line (e.g. of a write
+    interrupted by a crash) is ignored.
+
+    :param archive_dp: The directory of the archive.
+    :param name: The name of the archive.
+    :param latest: The boolean indicating if only the latest record of each Submission is to be returned. Records are
+        appended again when their engagement completes, so the latest record of a Submission is its final state.
+    :return: The list of records, in order of writing (of the first record of each Submission if 'latest').
+    """
+
+    records = []
+
+    for segment_fp in archive_segments(archive_dp, name):
+
+        with open(segment_fp, "rb") as file:
+
+            for line in file:
+
+                # Skip an unterminated line.
+                if not line.endswith(b"\n"):
+                    break
+
+                records.append(json.loads(line.decode("utf-8")))
+
+    if latest:
+
+        # Keep the latest record of each Submission, in order of its first record.
+        latest_records = {}
+        for record in records:
+            latest_records[record.get("subm_id")] = record
+
+        records = list(latest_records.values())
+
+
+    return records
@@ -0,0 +1,312 @@
+"""
+In-process stand-ins for the PRAW and Indico IO backends used by the RedditAgent. Every network operation is simulated
+with a configurable latency, which allows for the pipeline to be benchmarked offline.
+"""
+
+import random
+import threading
+import time
+import zlib
+
+from indicoio.utils.errors import IndicoError
+
+
+# The vocabulary used to generate Submission Titles.
+VOCABULARY = (
+    "government", "report", "election", "storm", "power", "water", "city", "court", "senate", "market", "police",
+    "school", "health", "budget", "vote", "island", "aid", "relief", "recovery", "crisis", "hurricane", "maria",
+    "puerto", "rico", "energy", "grid", "fema", "federal", "governor", "deaths", "study", "climate", "trade", "tariff"
+)
+
+
+class FakeCommentForest:
+    """
+    A stand-in for a PRAW CommentForest.
+    """
+
+    """ Constructor """
+    def __init__(self, comment_count: int, expansion_latency: float):
+        """
+        Creates a FakeCommentForest.
+
+        :param comment_count: The amount of comments in the forest.
+        :param expansion_latency: The seconds taken to expand the forest.
+        """
+
+        self.comment_count = comment_count
+        self.expansion_latency = expansion_latency
+        self.comments = None
+
+
+    """ Methods """
+    def replace_more(self, limit: int = 32):
+        """
+        Simulates the expansion of the forest.
+        """
+
+        if self.comments is None:
+
+            time.sleep(self.expansion_latency)
+            self.comments = ["comment %d" % i for i in range(self.comment_count)]
+
+
+    def list(self):
+        """
+        Returns the flattened forest.
+        """
+
+        return list(self.comments or [])
+
+
+class FakeSubmission:
+    """
+    A stand-in for a PRAW Submission.
+    """
+
+    """ Constructor """
+    def __init__(self, subm_id: str, title: str, url: str, num_comments: int, backend: "FakeRedditBackend"):
+        """
+        Creates a FakeSubmission.
+        """
+
+        self.id = subm_id
+        self.title = title
+        self.url = url
+        self.num_comments = num_comments
+        self.created_utc = time.time()
+        self.comments = FakeCommentForest(num_comments, backend.forest_latency)
+        self.backend = backend
+
+
+    """ Methods """
+    def reply(self, body: str):
+        """
+        Simulates the creation of a comment.
+        """
+
+        time.sleep(self.backend.reply_latency)
+        self.backend.replies += 1
+
+
+class FakeSubredditStream:
+    """
+    A stand-in for a PRAW SubredditStream.
+    """
+
+    """ Constructor """
+    def __init__(self, subreddit: "FakeSubreddit"):
+
+        self.subreddit = subreddit
+
+
+    """ Methods """
+    def submissions(self, skip_existing: bool = False, pause_after: int = None):
+        """
+        Yields the Subreddit's Submissions, pausing once they are exhausted.
+        """
+
+        for submission in self.subreddit.hot():
+            yield submission
+
+        if pause_after is not None:
+            yield None
+
+
+class FakeSubreddit:
+    """
+    A stand-in for a PRAW Subreddit.
+    """
+
+    """ Constructor """
+    def __init__(self, backend: "FakeRedditBackend"):
+
+        self.backend = backend
+        self.stream = FakeSubredditStream(self)
+
+
+    """ Methods """
+    def hot(self, limit: int = None, params: dict = None):
+        """
+        Yields the Subreddit's Submissions, simulating a listing request for every page of 100 Submissions.
+        """
+
+        # Continue the listing after the given Submission.
+        start = 0
+        if params and params.get("after"):
+            start = self.backend.submissions.index(self.backend.submissions_by_id[params["after"][3:]]) + 1
+
+        listing = self.backend.submissions[start:]
+        for i, submission in enumerate(listing if limit is None else listing[:limit]):
+
+            if i % 100 == 0:
+                time.sleep(self.backend.listing_latency)
+
+            yield submission
+
+
+class FakeRedditBackend:
+    """
+    The shared state of the fake Reddit API: the Submissions of the work Subreddit and the simulated latencies.
+    """
+
+    """ Constructor """
+    def __init__(
+            self,
+            submission_count: int,
+            listing_latency: float = 0.0,
+            forest_latency: float = 0.0,
+            reply_latency: float = 0.0,
+            ptopic_keywords: (list, tuple) = (),
+            seed: int = 0
+    ):
+        """
+        Creates a FakeRedditBackend with generated Submissions.
+
+        :param submission_count: The amount of Submissions in the work Subreddit.
+        :param listing_latency: The seconds taken by a listing request (100 Submissions).
+        :param forest_latency: The seconds taken to expand a comment forest.
+        :param reply_latency: The seconds taken to create a comment.
+        :param ptopic_keywords: Keywords mixed into some of the Titles, so that a share of the Submissions is relevant.
+        :param seed: The seed of the generator of Submissions.
+        """
+
+        self.listing_latency = listing_latency
+        self.forest_latency = forest_latency
+        self.reply_latency = reply_latency
+        self.replies = 0
+
+        generator = random.Random(seed)
+        vocabulary = VOCABULARY + tuple(ptopic_keywords)
+
+        self.submissions = []
+        for i in range(submission_count):
+
+            title = " ".join(generator.choice(vocabulary) for _ in range(generator.randint(5, 14))).capitalize()
+            self.submissions.append(FakeSubmission(
+                subm_id="b%06d" % i,
+                title=title,
+                url="https://news.example.com/%d/%s" % (i, title.lower().replace(" ", "-")),
+                num_comments=generator.randint(0, 500),
+                backend=self
+            ))
+
+        # The index of the Submissions by ID.
+        self.submissions_by_id = {submission.id: submission for submission in self.submissions}
+
+
+    """ Methods """
+    def create_reddit(self, **kwargs):
+        """
+        A stand-in for the praw.Reddit constructor.
+        """
+
+        return FakeReddit(self)
+
+
+class FakeReddit:
+    """
+    A stand-in for a praw.Reddit instance.
+    """
+
+    """ Constructor """
+    def __init__(self, backend: FakeRedditBackend):
+
+        self.backend = backend
+
+
+    """ Methods """
+    def subreddit(self, display_name: str = None):
+
+        return FakeSubreddit(self.backend)
+
+
+    def submission(self, id: str = None):
+
+        return self.backend.submissions_by_id[id]
+
+
+    def info(self, fullnames: list = None):
+
+        # Reject an empty request, as PRAW does.
+        if not fullnames:
+            raise TypeError("Either `fullnames` or `url` must be provided.")
+
+        return (self.backend.submissions_by_id[fullname[3:]] for fullname in fullnames)
+
+
+class FakeIndico:
+    """
+    A stand-in for the 'keywords' and 'relevance' functions of the Indico IO API.
+    """
+
+    """ Constructor """
+    def __init__(self, request_latency: float = 0.0, item_latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        """
+        Creates a FakeIndico.
+
+        :param request_latency: The fixed seconds taken by every request.
+        :param item_latency: The additional seconds taken for every text within a request.
+        :param error_rate: The share of texts that are rejected with an IndicoError.
+        :param seed: The seed of the generator of rejected texts.
+        """
+
+        self.request_latency = request_latency
+        self.item_latency = item_latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+    """ Methods """
+    def keywords(self, texts, **kwargs):
+        """
+        Simulates keyword extraction, returning the longest words of each text.
+        """
+
+        results = [
+            {word.lower(): round(1.0 / (rank + 1), 3)
+             for rank, word in enumerate(sorted(set(text.split()), key=len, reverse=True)[:5])}
+            for text in self.request(texts)
+        ]
+
+        return results if isinstance(texts, list) else results[0]
+
+
+    def relevance(self, texts, queries, **kwargs):
+        """
+        Simulates relevance measurement as the share of query words occurring within each text.
+        """
+
+        results = [
+            [
+                len(set(query.lower().split()) & set(text.lower().replace("-", " ").split())) / len(query.split())
+                for query in queries
+            ]
+            for text in self.request(texts)
+        ]
+
+        return results if isinstance(texts, list) else results[0]
+
+
+    def request(self, texts):
+        """
+        Simulates the latency of a request and rejects it if it contains an invalid text.
+
+        :return: The list of texts of the request.
+        """
+
+        texts = texts if isinstance(texts, list) else [texts]
+
+        with self.lock:
+            self.requests += 1
+
+        time.sleep(self.request_latency + self.item_latency * len(texts))
+
+        for text in texts:
+
+            if random.Random(self.seed ^ zlib.crc32(text.encode("utf-8"))).random() < self.error_rate:
+                raise IndicoError("Simulated rejection of an invalid text.")
+
+
+        return texts
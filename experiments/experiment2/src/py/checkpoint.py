@@ -0,0 +1,98 @@
+"""
+A persistent checkpoint of the state of a process, which allows for an interrupted process to be resumed. The state is
+saved atomically, so a checkpoint is never left partially written.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class Checkpoint:
+    """
+    A JSON checkpoint file. Every save writes the state to a temporary file which is synced to disk and then renamed over
+    the checkpoint, so the checkpoint always holds either the previous or the new state in its entirety.
+    """
+
+    """ Constructor """
+    def __init__(self, checkpoint_fp: str, interval: float = 60):
+        """
+        Creates a Checkpoint.
+
+        :param checkpoint_fp: The file-path of the checkpoint.
+        :param interval: The minimum amount of seconds between two periodic saves (see 'save').
+        """
+
+        self.checkpoint_fp = checkpoint_fp
+        self.interval = interval
+
+        # The monotonic time of the last save.
+        self.last_save = float("-inf")
+
+        # The lock that serializes saves, which may be performed by the process and engagement threads.
+        self.lock = threading.Lock()
+
+
+    """ Methods """
+    def load(self):
+        """
+        Loads the saved state.
+
+        :return: The state, or None if there is no checkpoint.
+        """
+
+        try:
+
+            with open(self.checkpoint_fp, "r") as file:
+                return json.load(file)
+
+        except FileNotFoundError:
+
+            return None
+
+
+    def save(self, state_function, force: bool = False):
+        """
+        Saves the state, if 'interval' seconds have passed since the last save or if forced.
+
+        :param state_function: The function that returns the JSON-serializable state. It is only called if the state is
+            saved, so that periodic saves are cheap when they are not due.
+        :param force: The boolean indicating if the state is to be saved regardless of the interval.
+        :return: The boolean indicating if the state was saved.
+        """
+
+        with self.lock:
+
+            if not force and time.monotonic() - self.last_save < self.interval:
+                return False
+
+            # Write the state to a temporary file.
+            os.makedirs(os.path.dirname(self.checkpoint_fp) or ".", exist_ok=True)
+            temporary_fp = self.checkpoint_fp + ".tmp"
+
+            with open(temporary_fp, "w") as file:
+
+                json.dump(state_function(), file)
+                file.flush()
+                os.fsync(file.fileno())
+
+            # Replace the checkpoint.
+            os.replace(temporary_fp, self.checkpoint_fp)
+            self.last_save = time.monotonic()
+
+
+            return True
+
+
+    def clear(self):
+        """
+        Deletes the checkpoint, e.g. once its process has completed.
+        """
+
+        with self.lock:
+
+            try:
+                os.remove(self.checkpoint_fp)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,208 @@
+"""
+An optional columnar archive of analysis records in the Parquet format. The archive is partitioned by problem-topic and
+date ('<root>/problem_topic=<ID>/date=<YYYY-MM-DD>/<name>.parquet') and keyword lists are dictionary-encoded, so that
+reading back many processes only loads the partitions, columns and rows that are requested.
+
+The archive requires the 'pyarrow' package.
+"""
+
+import os
+
+from .analysis_record_store import AnalysisRecord
+
+try:
+
+    import pyarrow
+    import pyarrow.parquet
+
+except ImportError:
+
+    pyarrow = None
+
+
+# The fields of an analysis that hold keyword lists.
+KEYWORD_FIELDS = ("title_kwd_intxn", "title_kwds", "subma_kwd_intxn", "subma_kwds")
+
+# The fields of an analysis that hold integers.
+INTEGER_FIELDS = ("comment_count",)
+
+# The fields of an analysis that hold scores.
+FLOAT_FIELDS = (
+    "title_kwd_intxn_size",
+    "title_kwd_weighted_score",
+    "title_relevance_score",
+    "subma_relevance_score",
+    "subma_kwd_intxn_size",
+    "subma_kwd_weighted_score"
+)
+
+# The fields of an analysis that are archived (every field but the Submission object, which cannot be serialized).
+ARCHIVED_FIELDS = tuple(field for field in AnalysisRecord.__slots__ if field != "subm_object")
+
+
+class ColumnarArchive:
+    """
+    A Parquet archive of analysis records, partitioned by problem-topic and date.
+    """
+
+    """ Constructor """
+    def __init__(self, root_dp: str = "../resources/archive"):
+        """
+        Opens the archive at the given directory.
+
+        :param root_dp: The root directory of the archive.
+        """
+
+        if pyarrow is None:
+            raise ImportError("The columnar archive requires the 'pyarrow' package.")
+
+        self.root_dp = root_dp
+
+
+    """ Methods """
+    @staticmethod
+    def schema():
+        """
+        Returns the Arrow schema of archived analyses. Keyword lists are lists of dictionary-encoded strings.
+
+        :return: The schema.
+        """
+
+        def field_type(field):
+
+            if field in KEYWORD_FIELDS:
+                return pyarrow.list_(pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))
+
+            if field in INTEGER_FIELDS:
+                return pyarrow.int64()
+
+            if field in FLOAT_FIELDS:
+                return pyarrow.float64()
+
+            return pyarrow.string()
+
+
+        return pyarrow.schema([(field, field_type(field)) for field in ARCHIVED_FIELDS])
+
+
+    @staticmethod
+    def to_column(values: list, data_type):
+        """
+        Converts the values of a field into an Arrow array, dictionary-encoding the strings of keyword lists.
+
+        :param values: The values of the field, one per record.
+        :param data_type: The Arrow type of the field.
+        :return: The Arrow array.
+        """
+
+        if not pyarrow.types.is_list(data_type):
+
+            return pyarrow.array(values, type=data_type)
+
+        # Encode the flattened keywords once, then restore the lists.
+        lists = pyarrow.array([None if value is None else list(value) for value in values], type=pyarrow.list_(
+            pyarrow.string()
+        ))
+
+        return pyarrow.ListArray.from_arrays(
+            lists.offsets,
+            lists.flatten().dictionary_encode(),
+            mask=lists.is_null()
+        )
+
+
+    def archive_fp(self, ptopic_id: str, name: str, date: str):
+        """
+        Returns the file-path of a file within the partition of a problem-topic and date.
+
+        :param ptopic_id: The ID of the problem-topic.
+        :param name: The name of the file.
+        :param date: The date of the partition, as 'YYYY-MM-DD'.
+        :return: The file-path.
+        """
+
+        return os.path.join(self.root_dp, "problem_topic=" + ptopic_id, "date=" + date, name + ".parquet")
+
+
+    def write(self, ptopic_id: str, records: (list, tuple), name: str, date: str):
+        """
+        Writes a collection of analyses as a new file within the partition of a problem-topic and date.
+
+        :param ptopic_id: The ID of the problem-topic.
+        :param records: The analyses, as dicts (see AnalysisRecord.to_dict).
+        :param name: The name of the file (e.g. the date-time stamp of the process).
+        :param date: The date of the partition, as 'YYYY-MM-DD'.
+        :return: The file-path of the written file.
+        """
+
+        schema = self.schema()
+
+        # Build the table column by column.
+        table = pyarrow.Table.from_arrays(
+            [self.to_column([record.get(field.name) for record in records], field.type) for field in schema],
+            schema=schema
+        )
+
+        # Define the partition directory.
+        archive_fp = self.archive_fp(ptopic_id, name, date)
+        partition_dp = os.path.dirname(archive_fp)
+        os.makedirs(partition_dp, exist_ok=True)
+
+        # Write to a hidden temporary file first, so that readers never see a partially written file.
+        temporary_fp = os.path.join(partition_dp, "." + name + ".parquet.tmp")
+        pyarrow.parquet.write_table(table, temporary_fp, compression="snappy")
+        os.replace(temporary_fp, archive_fp)
+
+
+        return archive_fp
+
+
+    def read(
+            self,
+            columns: (list, tuple) = None,
+            ptopic_ids: (list, tuple) = None,
+            start_date: str = None,
+            end_date: str = None,
+            filters: (list, tuple) = ()
+    ):
+        """
+        Reads analyses from the archive as a DataFrame. Partitions outside the requested problem-topics and dates are
+        not opened, only the requested columns are decoded, and the predicates are applied while reading.
+
+        :param columns: The fields to read. If None, every field is read.
+        :param ptopic_ids: The IDs of the problem-topics to read. If None, every problem-topic is read.
+        :param start_date: The first date to read, as 'YYYY-MM-DD'.
+        :param end_date: The last date to read, as 'YYYY-MM-DD'.
+        :param filters: Additional predicates, as (field, operator, value) tuples that must all hold, e.g.
+            ("title_relevance_score", ">", 0.5).
+        :return: The DataFrame, with the 'problem_topic' and 'date' partition columns appended.
+        """
+
+        # Define the predicates.
+        predicates = list(filters)
+
+        if ptopic_ids is not None:
+            predicates.append(("problem_topic", "in", list(ptopic_ids)))
+
+        if start_date is not None:
+            predicates.append(("date", ">=", start_date))
+
+        if end_date is not None:
+            predicates.append(("date", "<=", end_date))
+
+        if not os.path.isdir(self.root_dp):
+
+            # Output status.
+            print("Archive '" + self.root_dp + "' not found.")
+
+            return self.schema().empty_table().to_pandas()
+
+        table = pyarrow.parquet.read_table(
+            self.root_dp,
+            columns=None if columns is None else list(columns) + ["problem_topic", "date"],
+            filters=predicates or None,
+            partitioning="hive"
+        )
+
+
+        return table.to_pandas()
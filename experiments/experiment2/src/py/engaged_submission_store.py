@@ -0,0 +1,156 @@
+"""
+A persistent, hash-indexed store of the IDs of Reddit Submissions that have been engaged. The store keeps the format of
+'engaged_subm_ids.csv' (comma-terminated IDs) and may be shared by several Agent processes.
+"""
+
+import fcntl
+import os
+import threading
+
+import pandas
+
+
+class EngagedSubmissionStore:
+    """
+    An append-only set of engaged Submission IDs backed by a file.
+
+    Every ID in the file is terminated by a comma, so an append that was interrupted (e.g. by a crash) leaves an
+    unterminated tail which is ignored when the file is read. Appends are serialized between processes with an exclusive
+    file lock and are flushed to disk before they are considered complete. IDs appended by other processes are picked
+    up whenever the file has grown since it was last read.
+    """
+
+    """ Class Fields """
+    # The file-path of the store.
+    store_fp = str()
+
+
+    """ Constructor """
+    def __init__(self, store_fp: str):
+        """
+        Opens the store at the given file-path. The file is created on the first append if it does not exist.
+
+        :param store_fp: The file-path of the store.
+        """
+
+        self.store_fp = store_fp
+
+        # The set of engaged Submission IDs.
+        self.ids = set()
+
+        # The amount of bytes of the file that have been read into 'ids'.
+        self.offset = 0
+
+        # The lock that serializes access to 'ids' and 'offset' between threads.
+        self.lock = threading.Lock()
+
+        # Read the existing IDs.
+        if not os.path.exists(store_fp):
+
+            print("File '" + os.path.basename(store_fp) + "' not found. Starting an empty store.")
+
+        self.refresh()
+
+
+    """ Methods """
+    def refresh(self):
+        """
+        Reads the IDs that have been appended to the file since it was last read.
+        """
+
+        with self.lock:
+
+            try:
+
+                # Skip reading if the file has not grown.
+                if os.path.getsize(self.store_fp) <= self.offset:
+                    return
+
+                with open(self.store_fp, "rb") as file:
+
+                    file.seek(self.offset)
+                    content = file.read()
+
+            except FileNotFoundError:
+
+                return
+
+            # Consider only the IDs that are terminated; an unterminated tail is an append still in progress (or an
+            # interrupted one).
+            end = content.rfind(b",") + 1
+
+            self.ids.update(element for element in content[:end].decode("utf-8").split(",") if element != '')
+            self.offset += end
+
+
+    def add(self, subm_id: str):
+        """
+        Records a Submission as engaged. The ID is durably appended to the file before it is added to the in-memory
+        set.
+
+        :param subm_id: The ID of the Submission.
+        """
+
+        with open(self.store_fp, "ab") as file:
+
+            # Serialize appends between processes.
+            fcntl.flock(file, fcntl.LOCK_EX)
+
+            try:
+
+                # Terminate the unterminated tail of an interrupted append so that it does not merge with this ID.
+                prefix = b""
+                if file.tell() > 0:
+
+                    with open(self.store_fp, "rb") as reader:
+
+                        reader.seek(-1, os.SEEK_END)
+                        if reader.read(1) != b",":
+                            prefix = b","
+
+                # Perform output.
+                file.write(prefix + subm_id.encode("utf-8") + b",")
+                file.flush()
+                os.fsync(file.fileno())
+
+            finally:
+
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+        with self.lock:
+
+            self.ids.add(subm_id)
+
+
+    def contains_many(self, subm_ids: (list, tuple)):
+        """
+        Determines which of a collection of Submissions have been engaged, in a single vectorized pass.
+
+        :param subm_ids: The IDs of the Submissions.
+        :return: The NumPy boolean array indicating, for each ID, whether the Submission has been engaged.
+        """
+
+        # Pick up the IDs appended by other processes.
+        self.refresh()
+
+        with self.lock:
+
+            return pandas.Index(subm_ids, dtype=object).isin(self.ids)
+
+
+    def __contains__(self, subm_id: str):
+
+        # Pick up the IDs appended by other processes.
+        self.refresh()
+
+        return subm_id in self.ids
+
+
+    def __iter__(self):
+
+        return iter(set(self.ids))
+
+
+    def __len__(self):
+
+        return len(self.ids)
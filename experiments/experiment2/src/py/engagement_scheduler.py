@@ -0,0 +1,210 @@
+"""
+A script that allows for the delivery of Reddit comments in the background, observing a posting rate policy. Comments
+are queued and delivered by a worker thread as posting slots become available, so the process that queues them does
+not block.
+"""
+
+import fcntl
+import os
+import queue
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A rate limiter that grants posting slots separated by a minimum interval.
+    """
+
+    """ Class Fields """
+    # The minimum amount of seconds between two posts.
+    min_interval = float()
+
+
+    """ Constructor """
+    def __init__(self, min_interval: float = 600):
+        """
+        Creates a RateLimiter.
+
+        :param min_interval: The minimum amount of seconds between two posts. The default of 10 minutes avoids the
+            "excessive posting" error of the Reddit API for accounts with little karma.
+        """
+
+        self.min_interval = min_interval
+
+        # The time at which the next slot becomes available.
+        self.next_slot = 0.0
+
+        # The lock that serializes slot reservations.
+        self.lock = threading.Lock()
+
+
+    """ Methods """
+    def acquire(self):
+        """
+        Blocks until a posting slot is available and reserves it.
+        """
+
+        with self.lock:
+
+            # Reserve the next slot.
+            slot = max(self.next_slot, time.time())
+            self.next_slot = slot + self.min_interval
+
+        # Wait for the reserved slot.
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    A rate limiter whose next slot is kept in a file, so that its posting slots are shared by several processes (e.g.
+    the shards of a sharded process, which post as the same Reddit account). Reservations are serialized between
+    processes with an exclusive file lock.
+    """
+
+    """ Constructor """
+    def __init__(self, slot_fp: str, min_interval: float = 600):
+        """
+        Creates a FileRateLimiter. The file is created if it does not exist.
+
+        :param slot_fp: The file-path of the file holding the time of the next slot.
+        :param min_interval: The minimum amount of seconds between two posts of all processes sharing the file.
+        """
+
+        super().__init__(min_interval=min_interval)
+
+        self.slot_fp = slot_fp
+
+        os.makedirs(os.path.dirname(slot_fp) or ".", exist_ok=True)
+
+
+    """ Methods """
+    def acquire(self):
+        """
+        Blocks until a posting slot is available and reserves it.
+        """
+
+        with self.lock, open(self.slot_fp, "a+") as file:
+
+            # Serialize reservations between processes.
+            fcntl.flock(file, fcntl.LOCK_EX)
+
+            try:
+
+                # Read the next slot. An empty or damaged file holds no reservation.
+                file.seek(0)
+                try:
+                    next_slot = float(file.read() or 0.0)
+                except ValueError:
+                    next_slot = 0.0
+
+                # Reserve the next slot.
+                slot = max(next_slot, time.time())
+                file.truncate(0)
+                file.write(repr(slot + self.min_interval))
+                file.flush()
+
+            finally:
+
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+        # Wait for the reserved slot.
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class EngagementScheduler:
+    """
+    A queue of pending Reddit comments drained by a background worker through a RateLimiter.
+    """
+
+    """ Constructor """
+    def __init__(self, rate_limiter: RateLimiter):
+        """
+        Creates an EngagementScheduler and starts its worker.
+
+        :param rate_limiter: The rate limiter that grants posting slots.
+        """
+
+        self.rate_limiter = rate_limiter
+
+        # The queue of pending engagements.
+        self.engagements = queue.Queue()
+
+        # Define and start the worker.
+        self.worker = threading.Thread(target=self.run, name="engagement-scheduler", daemon=True)
+        self.worker.start()
+
+
+    """ Methods """
+    def submit(self, post, on_posted=None, on_failed=None):
+        """
+        Queues an engagement.
+
+        :param post: The function that delivers the comment.
+        :param on_posted: The function called once the comment has been delivered.
+        :param on_failed: The function called, with the raised exception, if the comment could not be delivered (e.g. an
+            APIException if the Reddit API rejects the comment).
+        """
+
+        self.engagements.put((post, on_posted, on_failed))
+
+
+    def pending(self):
+        """
+        Returns the amount of engagements that have not been delivered.
+
+        :return: The amount of pending engagements.
+        """
+
+        return self.engagements.unfinished_tasks
+
+
+    def join(self):
+        """
+        Blocks until every queued engagement has been processed.
+        """
+
+        self.engagements.join()
+
+
+    def run(self):
+        """
+        The worker process. Delivers the queued engagements, waiting for a posting slot before each one.
+        """
+
+        while True:
+
+            post, on_posted, on_failed = self.engagements.get()
+
+            try:
+
+                # Wait for a posting slot.
+                self.rate_limiter.acquire()
+
+                try:
+
+                    # Deliver the comment.
+                    post()
+
+                except Exception as e:
+
+                    if on_failed is not None:
+                        on_failed(e)
+
+                else:
+
+                    if on_posted is not None:
+                        on_posted()
+
+            except Exception as e:
+
+                # Keep the worker alive for the remaining engagements.
+                print("Caught error in 'EngagementScheduler': ", e)
+
+            finally:
+
+                self.engagements.task_done()
@@ -6,7 +6,9 @@ alexjosephswanson@gmail.com
 
 
 import pandas
+from .multi_topic_reddit_agent import MultiTopicRedditAgent
 from .reddit_agent import RedditAgent
+from .sharded_runner import ShardedRunner
 
 
 def process__pr_h_c__():
@@ -71,11 +73,75 @@ def process__j_g_c__():
     )
 
 
+def process__multi_topic__():
+
+    # Define the credentials for the Reddit object.
+    reddit_parameters = (
+        "zO1z52xZNtdxrA",
+        "VbAzyOfUcj-94a71j8V_6lUTyAM",
+        "An observer of Subreddit Streams for Alexander Swanson in Experiment: Reddit AI",
+        "ssa1G",
+        "subreddit.stream.agent.1.password"
+    )
+
+    # Define the Agent for both problem-topics, which fetches and analyzes every Submission once.
+    machine = MultiTopicRedditAgent(
+        reddit_params=reddit_parameters,
+        problem_topics={
+            "__pr_h_c__": "Puerto Rico Humanitarian Crisis",
+            "__j_g_c__": "James Gunn Controversy"
+        }
+    )
+
+    # Initialize the process.
+    machine.start(
+        work_subreddits=['news', 'worldnews'],
+        engage=False,
+        subm_fetch_limit=5,
+        analyze_subm_articles=True,
+        analyze_subm_relevance=True,
+        relevance_threshold=0.65,
+        record_data=True
+    )
+
+
+def process__pr_h_c__sharded__():
+
+    # Define the credentials for the Reddit object.
+    reddit_parameters = (
+        "zO1z52xZNtdxrA",
+        "VbAzyOfUcj-94a71j8V_6lUTyAM",
+        "An observer of Subreddit Streams for Alexander Swanson in Experiment: Reddit AI",
+        "ssa1G",
+        "subreddit.stream.agent.1.password"
+    )
+
+    # Define the runner, which shards the process across one process per CPU core.
+    machine = ShardedRunner(
+        reddit_params=reddit_parameters,
+        problem_topic_id="__pr_h_c__",
+        problem_topic_title="Puerto Rico Humanitarian Crisis"
+    )
+
+    # Initialize the process.
+    machine.start(
+        work_subreddits=['news', 'worldnews'],
+        engage=False,
+        subm_fetch_limit=100,
+        analyze_subm_articles=True,
+        analyze_subm_relevance=True,
+        relevance_threshold=0.65,
+        record_data=True
+    )
+
+
 def main():
 
     # Run the experiments.
     process__pr_h_c__()
     # process__j_g_c__()
+    # process__multi_topic__()
+    # process__pr_h_c__sharded__()
 
     # x: pandas.DataFrame = pandas.read_json(
     #     path_or_buf="../resources/dataframes/__pr_h_c__/data/2018-07-31_22-58-43.json")
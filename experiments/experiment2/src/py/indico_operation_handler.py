@@ -0,0 +1,186 @@
+"""
+A script that allows for batched natural language processing requests to the Indico IO API. Collections of texts are
+sent as chunked batch requests instead of one request per text, and texts with a cached result are not sent at all.
+Relevance may alternatively be measured offline by a LocalRelevanceEngine.
+"""
+
+from .nlp_cache import NLPCache
+from .relevance_engine import LocalRelevanceEngine
+
+import indicoio
+from indicoio.utils.errors import IndicoError
+
+
+class IndicoOperationHandler:
+    """
+    A handler for natural language processing operations with the Indico IO API.
+    """
+
+    """ Class Fields """
+    # The maximum amount of texts sent within a single Indico IO request.
+    batch_size = int()
+
+    # The cache of Indico IO results. If None, every text is requested.
+    cache = None
+
+    # The offline engine used to measure relevance. If None, relevance is measured by the Indico IO API.
+    relevance_engine = None
+
+
+    """ Constructor """
+    def __init__(self, batch_size: int = 50, cache: NLPCache = None, relevance_engine: LocalRelevanceEngine = None):
+        """
+        Creates an IndicoOperationHandler.
+
+        :param batch_size: The maximum amount of texts sent within a single Indico IO request.
+        :param cache: The cache of Indico IO results.
+        :param relevance_engine: The offline engine used to measure relevance instead of the Indico IO API.
+        """
+
+        # Define the batch size.
+        self.batch_size = max(1, batch_size)
+
+        # Define the cache.
+        self.cache = cache
+
+        # Define the relevance engine.
+        self.relevance_engine = relevance_engine
+
+
+    """ Methods """
+    def batch_keywords(self, texts: (list, tuple)):
+        """
+        Generates keyword analyses for a collection of texts (or URLs) using the Indico IO API's 'keywords' function.
+
+        :param texts: The texts to analyze.
+        :return: The list of keyword analyses, in the order of 'texts'. The analysis of a text that could not be
+            processed is the IndicoError raised for it.
+        """
+
+        return self.batch_request(lambda chunk: indicoio.keywords(chunk), texts, operation="keywords")
+
+
+    def batch_relevance(self, texts: (list, tuple), queries: (list, tuple)):
+        """
+        Generates relevance measures for a collection of texts (or URLs) against a collection of queries using the
+        Indico IO API's 'relevance' function, or the relevance engine if one is defined.
+
+        :param texts: The texts to measure.
+        :param queries: The queries to measure every text against.
+        :return: The list of relevance measures, in the order of 'texts'. Each measure is the list of relevance scores
+            of the text for every query. The measure of a text that could not be processed is the IndicoError raised
+            for it.
+        """
+
+        if self.relevance_engine is not None:
+
+            # Score the whole collection at once; local measures are neither chunked nor cached.
+            return self.relevance_engine.relevance(list(texts), list(queries))
+
+        return self.batch_request(
+            lambda chunk: indicoio.relevance(chunk, list(queries)),
+            texts,
+            operation="relevance",
+            topic="\x1f".join(queries)
+        )
+
+
+    def batch_request(self, function, texts: (list, tuple), operation: str, topic: str = ""):
+        """
+        Retrieves the results of an Indico IO function for a collection of texts. Results are taken from the cache where
+        possible; the remaining distinct texts are sent in chunks of 'batch_size' and their results are cached.
+
+        :param function: The function that performs the Indico IO request for a list of texts.
+        :param texts: The texts to send.
+        :param operation: The name of the operation, used as part of the cache key.
+        :param topic: The problem-topic the operation is performed for, used as part of the cache key.
+        :return: The list of results, in the order of 'texts'.
+        """
+
+        if self.cache is None:
+
+            return self.send_chunks(function, texts)
+
+        # Retrieve the cached results.
+        results = self.cache.get_many(operation, topic, texts)
+
+        # Define the distinct texts without a cached result.
+        pending = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+
+        if pending:
+
+            # Request the results of the pending texts.
+            responses = dict(zip(pending, self.send_chunks(function, pending)))
+
+            # Cache the successful results.
+            successes = [text for text in pending if not isinstance(responses[text], IndicoError)]
+            self.cache.put_many(operation, topic, successes, [responses[text] for text in successes])
+
+            # Merge the requested results with the cached results.
+            results = [responses[text] if result is None else result for text, result in zip(texts, results)]
+
+
+        return results
+
+
+    def send_chunks(self, function, texts: (list, tuple)):
+        """
+        Sends a collection of texts to an Indico IO function in chunks of 'batch_size'.
+
+        :param function: The function that performs the Indico IO request for a list of texts.
+        :param texts: The texts to send.
+        :return: The list of results, in the order of 'texts'.
+        """
+
+        # Define the container for the results.
+        results = []
+
+        for i in range(0, len(texts), self.batch_size):
+
+            # Perform the batch request for the chunk of texts.
+            results.extend(self.send_chunk(function, list(texts[i:i + self.batch_size])))
+
+
+        return results
+
+
+    def send_chunk(self, function, chunk: list):
+        """
+        Sends a chunk of texts to an Indico IO function. If the request fails, the chunk is split in halves which are
+        requested separately, so that an invalid text is isolated in a logarithmic amount of requests and does not
+        dismiss the rest of the chunk.
+
+        :param function: The function that performs the Indico IO request for a list of texts.
+        :param chunk: The texts to send.
+        :return: The list of results, in the order of 'chunk'. The result of an invalid text is its IndicoError.
+        """
+
+        try:
+
+            # Perform the batch request.
+            return list(function(chunk))
+
+        except IndicoError as e:
+
+            if len(chunk) == 1:
+                return [e]
+
+            # Isolate the invalid text(s) by requesting each half of the chunk separately.
+            middle = len(chunk) // 2
+
+            return self.send_chunk(function, chunk[:middle]) + self.send_chunk(function, chunk[middle:])
+
+
+    @staticmethod
+    def resolve(result):
+        """
+        Returns a result produced by a batch request, raising the IndicoError recorded for it if the request failed.
+
+        :param result: The result of a single text.
+        :return: The result.
+        """
+
+        if isinstance(result, IndicoError):
+            raise result
+
+        return result
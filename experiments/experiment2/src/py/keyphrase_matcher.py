@@ -0,0 +1,237 @@
+"""
+A matcher that finds every occurrence of a collection of (possibly multi-word) keyphrases within a text in a single
+pass, using an Aho-Corasick automaton over word tokens.
+"""
+
+import re
+from collections import deque
+
+
+class KeyphraseMatcher:
+    """
+    An Aho-Corasick automaton over word tokens. Keyphrases are matched on whole tokens only, so "rico" does not match
+    within "ricochet", and multi-word keyphrases such as "puerto rico" are matched as a sequence of tokens.
+
+    Each keyphrase is added with a payload (e.g. the ID of its problem-topic), which allows a single automaton to serve
+    many problem-topics.
+    """
+
+    """ Class Fields """
+    # The pattern of a word token.
+    token_pattern = re.compile(r"\w+")
+
+
+    """ Constructor """
+    def __init__(self):
+        """
+        Creates an empty KeyphraseMatcher.
+        """
+
+        # The transitions of each state, mapping a token to the next state. State 0 is the root.
+        self.transitions = [{}]
+
+        # The failure transition of each state.
+        self.failures = [0]
+
+        # The (keyphrase, payload) pairs of the keyphrases whose path ends at each state.
+        self.terminals = [[]]
+
+        # The (keyphrase, payload) pairs matched upon reaching each state; includes the matches of its failure states.
+        self.outputs = [[]]
+
+
+    """ Methods """
+    @classmethod
+    def from_keyphrases(cls, keyphrases: (list, tuple), payload=None):
+        """
+        Creates and compiles a KeyphraseMatcher for a collection of keyphrases sharing a payload.
+
+        :param keyphrases: The keyphrases.
+        :param payload: The payload of every keyphrase.
+        :return: The compiled KeyphraseMatcher.
+        """
+
+        matcher = cls()
+
+        for keyphrase in keyphrases:
+            matcher.add(keyphrase, payload)
+
+        matcher.compile()
+
+
+        return matcher
+
+
+    def add(self, keyphrase: str, payload=None):
+        """
+        Adds a keyphrase to the automaton. The automaton must be compiled before it is used again.
+
+        :param keyphrase: The keyphrase.
+        :param payload: The value reported along with each match of the keyphrase.
+        """
+
+        # Define the tokens of the keyphrase.
+        tokens = self.tokenize(keyphrase)
+
+        if not tokens:
+            return
+
+        # Follow (or create) the path of the tokens from the root.
+        state = 0
+        for token in tokens:
+
+            if token not in self.transitions[state]:
+
+                self.transitions.append({})
+                self.failures.append(0)
+                self.terminals.append([])
+                self.outputs.append([])
+                self.transitions[state][token] = len(self.transitions) - 1
+
+            state = self.transitions[state][token]
+
+        # Record the keyphrase at the final state of its path.
+        if (" ".join(tokens), payload) not in self.terminals[state]:
+            self.terminals[state].append((" ".join(tokens), payload))
+
+
+    def compile(self):
+        """
+        Computes the failure transitions and outputs of the automaton with a breadth-first traversal.
+        """
+
+        # Define the queue of states to visit, starting with the children of the root.
+        states = deque()
+
+        for state in self.transitions[0].values():
+
+            self.failures[state] = 0
+            self.outputs[state] = list(self.terminals[state])
+            states.append(state)
+
+        while states:
+
+            state = states.popleft()
+
+            for token, next_state in self.transitions[state].items():
+
+                # Find the longest proper suffix of the path to 'next_state' that is also a path from the root.
+                failure = self.failures[state]
+                while failure and token not in self.transitions[failure]:
+                    failure = self.failures[failure]
+
+                self.failures[next_state] = self.transitions[failure].get(token, 0)
+
+                # The failure state is shallower, so its output is already complete.
+                self.outputs[next_state] = self.terminals[next_state] + self.outputs[self.failures[next_state]]
+
+                states.append(next_state)
+
+
+    def find(self, text: str):
+        """
+        Finds every occurrence of the keyphrases within a text in a single pass over its tokens.
+
+        :param text: The text to search.
+        :return: The list of (keyphrase, payload) pairs, one per occurrence, in order of the end of the occurrence.
+        """
+
+        # Define the container for the matches.
+        matches = []
+
+        state = 0
+        for token in self.tokenize(text):
+
+            # Follow failure transitions until the token can be consumed (or the root is reached).
+            while state and token not in self.transitions[state]:
+                state = self.failures[state]
+
+            state = self.transitions[state].get(token, 0)
+
+            matches.extend(self.outputs[state])
+
+
+        return matches
+
+
+    def match(self, text: str, payload=None):
+        """
+        Returns the distinct keyphrases occurring within a text.
+
+        :param text: The text to search.
+        :param payload: If provided, only the keyphrases added with this payload are returned.
+        :return: The list of distinct keyphrases, in order of first occurrence.
+        """
+
+        return list(dict.fromkeys(
+            keyphrase for keyphrase, match_payload in self.find(text) if payload is None or match_payload == payload
+        ))
+
+
+    def match_collection(self, texts: (list, tuple), payload=None):
+        """
+        Returns the distinct keyphrases occurring within any text of a collection. Keyphrases are not matched across the
+        boundary of two texts.
+
+        :param texts: The texts to search (e.g. the keywords of a Linked Article).
+        :param payload: If provided, only the keyphrases added with this payload are returned.
+        :return: The list of distinct keyphrases, in order of first occurrence.
+        """
+
+        return list(dict.fromkeys(keyphrase for text in texts for keyphrase in self.match(text, payload)))
+
+
+    def match_by_payload(self, text: str):
+        """
+        Returns the distinct keyphrases occurring within a text, grouped by payload. This allows for the keyphrases of
+        several problem-topics to be matched in a single pass.
+
+        :param text: The text to search.
+        :return: The dict of the list of distinct keyphrases (in order of first occurrence) of each matched payload.
+        """
+
+        return self.group_by_payload(self.find(text))
+
+
+    def match_collection_by_payload(self, texts: (list, tuple)):
+        """
+        Returns the distinct keyphrases occurring within any text of a collection, grouped by payload.
+
+        :param texts: The texts to search.
+        :return: The dict of the list of distinct keyphrases (in order of first occurrence) of each matched payload.
+        """
+
+        return self.group_by_payload(match for text in texts for match in self.find(text))
+
+
+    @staticmethod
+    def group_by_payload(matches):
+        """
+        Groups (keyphrase, payload) pairs by payload, dropping repeated keyphrases.
+
+        :param matches: The (keyphrase, payload) pairs.
+        :return: The dict of the list of distinct keyphrases of each payload.
+        """
+
+        groups = {}
+
+        for keyphrase, payload in matches:
+
+            group = groups.setdefault(payload, [])
+            if keyphrase not in group:
+                group.append(keyphrase)
+
+
+        return groups
+
+
+    @classmethod
+    def tokenize(cls, text: str):
+        """
+        Splits a text into lowercase word tokens.
+
+        :param text: The text to split.
+        :return: The list of tokens.
+        """
+
+        return cls.token_pattern.findall(text.lower())
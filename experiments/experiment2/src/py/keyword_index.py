@@ -0,0 +1,92 @@
+"""
+A weighted inverted index of problem-topic keywords. Every keyword maps to the problem-topics it belongs to and its
+measured relevance to each (as recorded in 'problem_topic_kwds.json'), which allows for texts to be given a weighted
+keyword score for every problem-topic in a single matching pass.
+"""
+
+from .keyphrase_matcher import KeyphraseMatcher
+
+
+class WeightedKeywordIndex:
+    """
+    An inverted index from keyword to (problem-topic, weight), backed by a KeyphraseMatcher whose payloads are the
+    problem-topic IDs.
+    """
+
+    """ Constructor """
+    def __init__(self):
+        """
+        Creates an empty WeightedKeywordIndex.
+        """
+
+        # The postings of every keyword: the weight of the keyword for each problem-topic, by problem-topic ID.
+        self.postings = {}
+
+        # The matcher of the keywords.
+        self.matcher = KeyphraseMatcher()
+
+
+    """ Methods """
+    def add_topic(self, ptopic_id: str, kwds_and_relevance: dict):
+        """
+        Adds the keywords of a problem-topic to the index. The index must be compiled before it is used again.
+
+        :param ptopic_id: The ID of the problem-topic.
+        :param kwds_and_relevance: The keywords of the problem-topic and their measured relevance. If a keyword occurs
+            more than once (e.g. in different letter cases), its greatest relevance is kept.
+        """
+
+        for keyword, weight in kwds_and_relevance.items():
+
+            # Define the keyword as it is reported by the matcher.
+            keyphrase = " ".join(KeyphraseMatcher.tokenize(keyword))
+
+            if not keyphrase:
+                continue
+
+            posting = self.postings.setdefault(keyphrase, {})
+            posting[ptopic_id] = max(float(weight), posting.get(ptopic_id, float("-inf")))
+
+            self.matcher.add(keyphrase, ptopic_id)
+
+
+    def compile(self):
+        """
+        Compiles the matcher of the keywords.
+        """
+
+        self.matcher.compile()
+
+
+    def match(self, text: str):
+        """
+        Returns the distinct keywords occurring within a text for every problem-topic.
+
+        :param text: The text to search.
+        :return: The dict of the list of distinct keywords (in order of first occurrence) of each matched problem-topic.
+        """
+
+        return self.matcher.match_by_payload(text)
+
+
+    def match_collection(self, texts: (list, tuple)):
+        """
+        Returns the distinct keywords occurring within any text of a collection for every problem-topic.
+
+        :param texts: The texts to search (e.g. the keywords of a Linked Article).
+        :return: The dict of the list of distinct keywords (in order of first occurrence) of each matched problem-topic.
+        """
+
+        return self.matcher.match_collection_by_payload(texts)
+
+
+    def score(self, ptopic_id: str, keywords: (list, tuple)):
+        """
+        Returns the weighted keyword score of a problem-topic: the sum of the relevance of the given keywords.
+
+        :param ptopic_id: The ID of the problem-topic.
+        :param keywords: The distinct keywords matched for the problem-topic.
+        :return: The weighted score.
+        """
+
+        return float(sum(self.postings[keyword][ptopic_id] for keyword in keywords))
@@ -0,0 +1,316 @@
+"""
+The script for operation of several RedditAgents over several Subreddits in a single pass. Every Submission is fetched,
+requested from Indico IO and matched against the problem-topic keywords once, and is then evaluated against every
+problem-topic. The analyses, engagement clearance and archives of each problem-topic remain separate.
+"""
+
+
+# Imports
+from .engagement_scheduler import EngagementScheduler, RateLimiter
+from .indico_operation_handler import IndicoOperationHandler
+from .keyword_index import WeightedKeywordIndex
+from .nlp_cache import NLPCache
+from .reddit_agent import RedditAgent
+from .reddit_operation_handler import RedditOperationHandler
+
+import praw
+from datetime import datetime
+from indicoio.utils.errors import IndicoError
+
+
+class MultiTopicRedditAgent:
+    """
+    An orchestrator of one RedditAgent per problem-topic, sharing the collection and analysis of Submissions between
+    them.
+    """
+
+    """ Class Fields """
+    # The RedditAgents, by problem-topic ID.
+    agents = dict()
+
+    # The compiled, weighted index of the keywords of every problem-topic.
+    kwd_index = WeightedKeywordIndex
+
+    # The Subreddits from which Submissions are fetched.
+    work_subreddits = tuple()
+
+    # The handler for Indico IO natural language processing operations, shared by the RedditAgents.
+    indico_op_handler = IndicoOperationHandler
+
+    # The scheduler for the delivery of comments, shared by the RedditAgents.
+    engagement_scheduler = EngagementScheduler
+
+
+    """ Constructor """
+    def __init__(self, reddit_params: tuple, problem_topics: dict):
+        """
+        Initializes a RedditAgent for each of the given problem-topics, sharing a single PRAW Reddit object.
+
+        :param reddit_params: The values necessary to create access to the Reddit API (see RedditAgent).
+        :param problem_topics: The Title of each problem-topic, by problem-topic ID.
+        """
+
+        # The PRAW Reddit object.
+        self.reddit_instance = praw.Reddit(
+            client_id=reddit_params[0],
+            client_secret=reddit_params[1],
+            user_agent=reddit_params[2],
+            username=reddit_params[3],
+            password=reddit_params[4]
+        )
+
+        # Initialize the RedditAgents.
+        self.agents = {
+            ptopic_id: RedditAgent(
+                reddit_params=reddit_params,
+                problem_topic_id=ptopic_id,
+                problem_topic_title=ptopic_title,
+                reddit_instance=self.reddit_instance
+            )
+            for ptopic_id, ptopic_title in problem_topics.items()
+        }
+
+        # Compile the index of the keywords of every problem-topic.
+        self.kwd_index = WeightedKeywordIndex()
+        for ptopic_id, agent in self.agents.items():
+
+            self.kwd_index.add_topic(ptopic_id, agent.ptopic_kwd_weights)
+
+        self.kwd_index.compile()
+
+
+    """ Methods """
+    def start(
+            self,
+            work_subreddits: (list, tuple),
+            engage: bool,
+            subm_fetch_limit: (int, None),
+            analyze_subm_articles: bool,
+            relevance_threshold: (float, dict),
+            analyze_subm_titles: bool = True,
+            analyze_subm_relevance: bool = False,
+            analysis_workers: int = 8,
+            nlp_batch_size: int = 50,
+            nlp_cache_fp: (str, None) = "../resources/cache/nlp_cache.sqlite3",
+            engagement_interval: float = 600,
+            relevance_backend: str = "indico",
+            **options
+    ):
+        """
+        Starts the batch process over every work Subreddit for every problem-topic.
+
+        :param work_subreddits: The Subreddits from which to fetch Submissions.
+        :param engage: The boolean indicating if the program is to create comments for Submissions.
+        :param subm_fetch_limit: The amount of Submissions to fetch from each work Subreddit.
+        :param analyze_subm_articles: The boolean indicating if the program is to analyze Submission Linked Articles.
+        :param relevance_threshold: The relevance threshold of every problem-topic, or a dict of the threshold of each
+            problem-topic by ID.
+        :param analyze_subm_titles: The boolean indicating if the program is to analyze a Submission titles.
+        :param analyze_subm_relevance: The boolean indicating if the program is to analyze Submission Relevance.
+        :param analysis_workers: The amount of worker threads used to analyze Submissions concurrently.
+        :param nlp_batch_size: The maximum amount of texts sent within a single Indico IO request.
+        :param nlp_cache_fp: The file-path of the persistent cache of Indico IO results. If None, results are not
+            cached.
+        :param engagement_interval: The minimum amount of seconds between two comments created by any of the Agents.
+        :param relevance_backend: The backend used to measure relevance (see RedditAgent.configure).
+        :param options: The remaining options of every RedditAgent (see RedditAgent.configure). The multi-topic process
+            is not sharded.
+        """
+
+        if options.get("shard_count", 1) != 1 or options.get("coordination_dp") is not None:
+            raise ValueError("The multi-topic process is not sharded.")
+
+        # Define global variables.
+        self.work_subreddits = tuple(work_subreddits)
+        self.subm_fetch_limit = subm_fetch_limit
+        self.analysis_workers = analysis_workers
+
+        # Define the offline relevance engine, with every problem-topic registered.
+        relevance_engine = None
+        if relevance_backend == "local":
+
+            for agent in self.agents.values():
+                relevance_engine = agent.create_relevance_engine(relevance_engine)
+
+        # Initialize the handlers shared by the RedditAgents.
+        self.indico_op_handler = IndicoOperationHandler(
+            batch_size=nlp_batch_size,
+            cache=None if nlp_cache_fp is None else NLPCache(cache_fp=nlp_cache_fp),
+            relevance_engine=relevance_engine
+        )
+        self.engagement_scheduler = EngagementScheduler(rate_limiter=RateLimiter(min_interval=engagement_interval))
+
+        # Define the date-time stamp for the operation.
+        op_datetime_stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        for ptopic_id, agent in self.agents.items():
+
+            # Configure the Agent, sharing the handlers and the date-time stamp.
+            agent.configure(
+                work_subreddit=self.work_subreddits[0],
+                engage=engage,
+                subm_fetch_limit=subm_fetch_limit,
+                analyze_subm_articles=analyze_subm_articles,
+                relevance_threshold=relevance_threshold[ptopic_id] if isinstance(relevance_threshold, dict)
+                else relevance_threshold,
+                analyze_subm_titles=analyze_subm_titles,
+                analyze_subm_relevance=analyze_subm_relevance,
+                analysis_workers=analysis_workers,
+                op_datetime_stamp=op_datetime_stamp,
+                indico_op_handler=self.indico_op_handler,
+                engagement_scheduler=self.engagement_scheduler,
+                **options
+            )
+
+        # Begin the batch process.
+        self.run_batch_process()
+
+        if self.indico_op_handler.cache is not None:
+
+            # Output status.
+            print("Indico IO cache usage: ", self.indico_op_handler.cache.stats())
+
+            # Release the cache.
+            self.indico_op_handler.cache.close()
+
+
+    def run_batch_process(self):
+        """
+        Performs Reddit Submission analysis for every problem-topic using a batch method of Submission collection. The
+        "Hot" Submissions of every work Subreddit are collected and requested from Indico IO once; each RedditAgent then
+        runs its batch process over them (see RedditAgent.run_batch_process). A Submission cleared for several
+        problem-topics is engaged by the first of them only.
+        """
+
+        # Get the "Hot" Submissions of the work Subreddits.
+        submissions = self.get_hot_submissions()
+
+        # Request the Indico IO results and match the keywords of the Submissions.
+        nlp_analyses = self.prefetch_nlp_analyses(submissions)
+
+        # Define the IDs of the Submissions for which a comment has been queued.
+        claimed_subm_ids = set()
+
+        # Define the Agents whose batch process has been started.
+        started_agents = []
+
+        try:
+
+            # Analyze the Submissions and queue the comments of every problem-topic, without waiting for their delivery.
+            for ptopic_id, agent in self.agents.items():
+
+                cleared = agent.run_batch_process(
+                    submissions=submissions,
+                    nlp_analyses={
+                        submission.id: nlp_analysis[ptopic_id]
+                        for submission, nlp_analysis in zip(submissions, nlp_analyses)
+                    },
+                    excluded_subm_ids=claimed_subm_ids,
+                    join=False
+                )
+                started_agents.append(agent)
+                claimed_subm_ids.update(record.subm_id for record in cleared)
+
+        finally:
+
+            # Wait for the delivery of the queued comments (through the shared scheduler) and finish the batch process of
+            # every problem-topic.
+            for agent in started_agents:
+                agent.finish_batch_process()
+
+
+    def get_hot_submissions(self):
+        """
+        Returns the "Hot" Submissions of every work Subreddit. A Submission listed by several Subreddits (e.g. a
+        cross-post) is only kept once.
+
+        :return: The list of distinct Submission objects.
+        """
+
+        submissions = {}
+
+        for work_subreddit in self.work_subreddits:
+
+            reddit_op_handler = RedditOperationHandler(reddit_instance=self.reddit_instance, subreddit=work_subreddit)
+
+            for submission in reddit_op_handler.get_hot_submissions(fetch_limit=self.subm_fetch_limit):
+                submissions.setdefault(submission.id, submission)
+
+
+        return list(submissions.values())
+
+
+    def prefetch_nlp_analyses(self, submissions: (list, tuple)):
+        """
+        Performs the Indico IO requests for a collection of Submissions once for all problem-topics, and matches the
+        keywords of every problem-topic against the Submissions in a single pass.
+
+        :param submissions: The Submissions for which to perform the requests.
+        :return: The list of the Indico IO results and keyword intersections of each Submission (see
+            'RedditAgent.prefetch_nlp_analyses'), by problem-topic ID, in the order of 'submissions'.
+        """
+
+        agents = list(self.agents.values())
+        lead_agent = agents[0]
+
+        # Define the containers for the results shared by all problem-topics and for the results of each.
+        shared_analyses = [{} for _ in submissions]
+        nlp_analyses = [{ptopic_id: {} for ptopic_id in self.agents} for _ in submissions]
+
+        # Define references to the Titles and Linked Article URLs of the Submissions.
+        titles = [submission.title for submission in submissions]
+        urls = [submission.url for submission in submissions]
+
+        if lead_agent.do_analyze_subm_titles:
+
+            # Generate keyword analyses for the Submission Titles and match the keywords of every problem-topic.
+            for shared_analysis, nlp_analysis, title, result in zip(
+                    shared_analyses, nlp_analyses, titles, self.indico_op_handler.batch_keywords(titles)
+            ):
+                shared_analysis["title_kwd_analysis"] = result
+                matches = self.kwd_index.match(title)
+
+                for ptopic_id in self.agents:
+                    nlp_analysis[ptopic_id]["title_kwd_intxn"] = matches.get(ptopic_id, [])
+
+        if lead_agent.do_analyze_subm_articles:
+
+            # Generate keyword analyses for the Linked Articles and match the keywords of every problem-topic.
+            for shared_analysis, nlp_analysis, result in zip(
+                    shared_analyses, nlp_analyses, self.indico_op_handler.batch_keywords(urls)
+            ):
+                shared_analysis["subma_kwd_analysis"] = result
+
+                if isinstance(result, IndicoError):
+                    continue
+
+                matches = self.kwd_index.match_collection([keyword.lower() for keyword in result])
+
+                for ptopic_id in self.agents:
+                    nlp_analysis[ptopic_id]["subma_kwd_intxn"] = matches.get(ptopic_id, [])
+
+        if lead_agent.do_analyze_relevance:
+
+            # Generate relevance measures for the Titles and Linked Articles against every problem-topic at once.
+            results = self.indico_op_handler.batch_relevance(
+                [text for pair in zip(titles, urls) for text in pair],
+                [agent.problem_topic_title for agent in agents]
+            )
+
+            for i, nlp_analysis in enumerate(nlp_analyses):
+
+                for j, agent in enumerate(agents):
+
+                    nlp_analysis[agent.problem_topic_id]["relevance_analysis"] = [
+                        result if isinstance(result, IndicoError) else [result[j]]
+                        for result in results[2 * i: 2 * i + 2]
+                    ]
+
+        # Merge the shared results into the results of each problem-topic.
+        for shared_analysis, nlp_analysis in zip(shared_analyses, nlp_analyses):
+
+            for ptopic_analysis in nlp_analysis.values():
+                ptopic_analysis.update(shared_analysis)
+
+
+        return nlp_analyses
@@ -0,0 +1,220 @@
+"""
+A persistent, SQLite-backed cache for the results of natural language processing requests. Results are keyed by the
+normalized input text (or URL), the operation that produced them and the problem-topic they were produced for.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+class NLPCache:
+    """
+    A persistent cache of natural language processing results with size-based LRU eviction and a time-to-live.
+    """
+
+    """ Class Fields """
+    # The file-path of the SQLite database.
+    cache_fp = str()
+
+    # The maximum amount of entries the cache holds before the least recently used entries are evicted.
+    max_entries = int()
+
+    # The amount of seconds after which an entry expires.
+    ttl = float()
+
+    # The amount of lookups answered by the cache.
+    hits = 0
+
+    # The amount of lookups not answered by the cache.
+    misses = 0
+
+
+    """ Constructor """
+    def __init__(self, cache_fp: str, max_entries: int = 100000, ttl: float = 86400, timeout: float = 30):
+        """
+        Opens (creating if necessary) the cache stored at the given file-path.
+
+        :param cache_fp: The file-path of the SQLite database.
+        :param max_entries: The maximum amount of entries the cache holds.
+        :param ttl: The amount of seconds after which an entry expires.
+        :param timeout: The amount of seconds a request waits for the database to be unlocked by another process (e.g.
+            another shard of a ShardedRunner).
+        """
+
+        self.cache_fp = cache_fp
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # Create the directory of the database if it does not exist.
+        if os.path.dirname(cache_fp):
+            os.makedirs(os.path.dirname(cache_fp), exist_ok=True)
+
+        # Define the database connection. The connection is shared by the analysis worker threads, so access to it is
+        # serialized by 'lock'.
+        self.connection = sqlite3.connect(cache_fp, timeout=timeout, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        with self.lock:
+
+            # Use write-ahead logging, so that the processes sharing the database read while another one writes.
+            self.connection.execute("PRAGMA journal_mode=WAL")
+
+        with self.lock, self.connection:
+
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_cache ("
+                "key TEXT PRIMARY KEY, operation TEXT, topic TEXT, value TEXT, created REAL, accessed REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS nlp_cache_accessed ON nlp_cache (accessed)")
+
+
+    """ Methods """
+    def get_many(self, operation: str, topic: str, texts: (list, tuple)):
+        """
+        Looks up the cached results for a collection of texts.
+
+        :param operation: The operation that produced the results (e.g. "keywords").
+        :param topic: The problem-topic the results were produced for; empty for topic-independent operations.
+        :param texts: The input texts (or URLs).
+        :return: The list of cached results, in the order of 'texts'. The result of a text that is not cached is None.
+        """
+
+        # Define the keys of the texts.
+        keys = [self.make_key(operation, topic, text) for text in texts]
+
+        # Define the time before which entries have expired.
+        now = time.time()
+        expiry = now - self.ttl
+
+        with self.lock, self.connection:
+
+            # Retrieve the live entries for the keys.
+            rows = {}
+            for i in range(0, len(keys), 500):
+
+                chunk = keys[i:i + 500]
+                rows.update(self.connection.execute(
+                    "SELECT key, value FROM nlp_cache WHERE created >= ? AND key IN (%s)" % ",".join("?" * len(chunk)),
+                    [expiry] + chunk
+                ))
+
+            # Record the access time of the entries that were found.
+            self.connection.executemany("UPDATE nlp_cache SET accessed = ? WHERE key = ?", [(now, k) for k in rows])
+
+        results = [json.loads(rows[key]) if key in rows else None for key in keys]
+
+        # Update the hit and miss counters, which are shared by the analysis worker threads.
+        with self.lock:
+
+            self.hits += len(keys) - results.count(None)
+            self.misses += results.count(None)
+
+
+        return results
+
+
+    def put_many(self, operation: str, topic: str, texts: (list, tuple), values: (list, tuple)):
+        """
+        Stores the results for a collection of texts, evicting the least recently used entries if the cache exceeds
+        its maximum size.
+
+        :param operation: The operation that produced the results.
+        :param topic: The problem-topic the results were produced for; empty for topic-independent operations.
+        :param texts: The input texts (or URLs).
+        :param values: The results, in the order of 'texts'. The results must be JSON-serializable.
+        """
+
+        now = time.time()
+
+        with self.lock, self.connection:
+
+            # Store the entries.
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO nlp_cache VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (self.make_key(operation, topic, text), operation, topic, json.dumps(value), now, now)
+                    for text, value in zip(texts, values)
+                ]
+            )
+
+            # Remove expired entries.
+            self.connection.execute("DELETE FROM nlp_cache WHERE created < ?", (now - self.ttl,))
+
+            # Evict the least recently used entries beyond the maximum size.
+            self.connection.execute(
+                "DELETE FROM nlp_cache WHERE key IN "
+                "(SELECT key FROM nlp_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+    def stats(self):
+        """
+        Returns the usage counters of the cache.
+
+        :return: The dict of the hit count, miss count, hit rate and entry count.
+        """
+
+        with self.lock:
+
+            entries = self.connection.execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+            hits, misses = self.hits, self.misses
+
+        lookups = hits + misses
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        with self.lock:
+
+            self.connection.close()
+
+
+    @staticmethod
+    def make_key(operation: str, topic: str, text: str):
+        """
+        Generates the cache key for a text.
+
+        :return: The key.
+        """
+
+        return hashlib.sha1(
+            "\x1f".join((operation, topic, NLPCache.normalize(text))).encode("utf-8")
+        ).hexdigest()
+
+
+    @staticmethod
+    def normalize(text: str):
+        """
+        Normalizes a text so that trivially different forms of the same input share a cache entry. URLs are stripped
+        of surrounding whitespace and of their fragment; other texts are also lowercased and have their whitespace
+        collapsed.
+
+        :param text: The text (or URL) to normalize.
+        :return: The normalized text.
+        """
+
+        text = text.strip()
+
+        if re.match(r"https?://", text, re.IGNORECASE):
+
+            return text.split("#", 1)[0]
+
+        return " ".join(text.lower().split())
@@ -0,0 +1,302 @@
+"""
+An offline benchmark of the RedditAgent batch process. The PRAW and Indico IO backends are replaced with the in-process
+stand-ins of 'benchmark_backends', and the benchmark reports the throughput, the latency percentiles of every pipeline
+stage and the peak resident memory of a run for each requested collection size.
+
+Run from the 'src' directory, e.g.:
+    python -m py.pipeline_benchmark --sizes 100 1000 10000 --indico-request-latency 0.05
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import indicoio
+import numpy
+import praw
+
+from . import reddit_agent
+from .benchmark_backends import FakeIndico, FakeRedditBackend
+
+
+# The ID of the problem-topic used by the benchmark.
+BENCHMARK_PTOPIC_ID = "__benchmark__"
+
+# The keywords (and relevance) of the problem-topic used by the benchmark.
+BENCHMARK_PTOPIC_KWDS = {"Puerto Rico": 0.9, "hurricane": 0.8, "Maria": 0.7, "relief": 0.6, "FEMA": 0.6, "grid": 0.4}
+
+# The utterances of the problem-topic used by the benchmark.
+BENCHMARK_UTTERANCES = (
+    "Puerto Rico is still recovering from hurricane Maria.",
+    "Much of the island's power grid remains unreliable.",
+    "Relief efforts in Puerto Rico need continued support."
+)
+
+# The methods timed as pipeline stages, by class.
+TIMED_STAGES = {
+    reddit_agent.RedditAgent: (
+        "fetch_hot_submissions",
+        "prefetch_nlp_analyses",
+        "analyze_submission",
+        "analyze_subm_title_kwds",
+        "analyze_subm_artc_kwds",
+        "analyze_relevance",
+        "process_subm_engages",
+        "run_batch_process"
+    )
+}
+
+
+def create_resources(root: str):
+    """
+    Creates the resource directory tree expected by the RedditAgent (see its '../resources' file-paths).
+
+    :param root: The directory in which to create the tree.
+    :return: The working directory from which the RedditAgent is to be run.
+    """
+
+    resources = os.path.join(root, "resources")
+    ptopic_dp = os.path.join(resources, "problem_topics", BENCHMARK_PTOPIC_ID)
+
+    for dp in (
+            os.path.join(ptopic_dp, "utterances"),
+            os.path.join(ptopic_dp, "problem_topic_kwds"),
+            os.path.join(resources, "reddit"),
+            os.path.join(resources, "dataframes", BENCHMARK_PTOPIC_ID, "data"),
+            os.path.join(root, "py")
+    ):
+        os.makedirs(dp, exist_ok=True)
+
+    with open(os.path.join(ptopic_dp, "utterances", "utterance_sentences.txt"), "w") as file:
+        file.write("\n".join(BENCHMARK_UTTERANCES))
+
+    with open(os.path.join(ptopic_dp, "problem_topic_kwds", "problem_topic_kwds.json"), "w") as file:
+        json.dump(BENCHMARK_PTOPIC_KWDS, file)
+
+
+    return os.path.join(root, "py")
+
+
+def time_stages(stage_durations: dict):
+    """
+    Wraps the methods of TIMED_STAGES so that the duration of every call is recorded.
+
+    :param stage_durations: The dict in which to record the durations (in seconds) of each stage.
+    """
+
+    def timed(name, method):
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stage_durations.setdefault(name, []).append(time.perf_counter() - start)
+
+        return wrapper
+
+    for cls, names in TIMED_STAGES.items():
+
+        for name in names:
+            setattr(cls, name, timed(name, getattr(cls, name)))
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process.
+
+    :return: The peak RSS, in megabytes.
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # 'ru_maxrss' is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def run_benchmark(size: int, options: dict):
+    """
+    Performs a single run of the batch process over a collection of generated Submissions. The run replaces the PRAW
+    and Indico IO backends of the current process, so it is meant to be performed in a dedicated process.
+
+    :param size: The amount of Submissions.
+    :param options: The benchmark options (see 'main').
+    :return: The dict of measures of the run.
+    """
+
+    # Replace the network backends.
+    backend = FakeRedditBackend(
+        submission_count=size,
+        listing_latency=options["listing_latency"],
+        forest_latency=options["forest_latency"],
+        reply_latency=options["reply_latency"],
+        ptopic_keywords=[keyword.lower() for keyword in BENCHMARK_PTOPIC_KWDS]
+    )
+    indico = FakeIndico(
+        request_latency=options["indico_request_latency"],
+        item_latency=options["indico_item_latency"],
+        error_rate=options["indico_error_rate"]
+    )
+    praw.Reddit = backend.create_reddit
+    indicoio.keywords = indico.keywords
+    indicoio.relevance = indico.relevance
+
+    # Record the duration of every stage.
+    stage_durations = {}
+    time_stages(stage_durations)
+
+    root = tempfile.mkdtemp(prefix="reddit_agent_benchmark_")
+    cwd = os.getcwd()
+
+    try:
+
+        os.chdir(create_resources(root))
+
+        agent = reddit_agent.RedditAgent(
+            reddit_params=("client_id", "client_secret", "user_agent", "username", "password"),
+            problem_topic_id=BENCHMARK_PTOPIC_ID,
+            problem_topic_title="Puerto Rico Humanitarian Crisis"
+        )
+
+        start = time.perf_counter()
+
+        agent.start(
+            work_subreddit="news",
+            engage=options["engage"],
+            process_method="batch",
+            subm_fetch_limit=size,
+            analyze_subm_articles=True,
+            analyze_subm_relevance=True,
+            relevance_threshold=options["relevance_threshold"],
+            record_data=True,
+            analysis_workers=options["analysis_workers"],
+            nlp_batch_size=options["nlp_batch_size"],
+            nlp_cache_fp=os.path.join(root, "resources", "cache", "nlp_cache.sqlite3") if options["cache"] else None,
+            engagement_interval=0,
+            expand_comment_forests=options["expand_comment_forests"],
+            relevance_backend=options["relevance_backend"]
+        )
+
+        elapsed = time.perf_counter() - start
+
+    finally:
+
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+    return {
+        "size": size,
+        "seconds": elapsed,
+        "submissions_per_second": size / elapsed if elapsed else float("inf"),
+        "analyzed": len(agent.data),
+        "indico_requests": indico.requests,
+        "replies": backend.replies,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {
+            name: {
+                "calls": len(durations),
+                "p50_ms": float(numpy.percentile(durations, 50)) * 1000,
+                "p90_ms": float(numpy.percentile(durations, 90)) * 1000,
+                "p99_ms": float(numpy.percentile(durations, 99)) * 1000,
+                "max_ms": max(durations) * 1000
+            }
+            for name, durations in stage_durations.items()
+        }
+    }
+
+
+def run_benchmark_process(size: int, options: dict, results):
+    """
+    The entry point of a dedicated benchmark process. The measures of the run, or the error that ended it, are put on
+    'results'.
+    """
+
+    try:
+
+        results.put(run_benchmark(size, options))
+
+    except Exception as e:
+
+        results.put(e)
+        raise
+
+
+def print_report(measures: dict):
+    """
+    Outputs the measures of a run as a table.
+
+    :param measures: The measures returned by 'run_benchmark'.
+    """
+
+    print("=" * 100)
+    print(
+        "Submissions: %(size)d  |  analyzed: %(analyzed)d  |  %(seconds).2f s  |  %(submissions_per_second).1f subm/s  |"
+        "  Indico IO requests: %(indico_requests)d  |  replies: %(replies)d  |  peak RSS: %(peak_rss_mb).1f MB"
+        % measures
+    )
+    print("-" * 100)
+    print("%-26s %10s %12s %12s %12s %12s" % ("stage", "calls", "p50 (ms)", "p90 (ms)", "p99 (ms)", "max (ms)"))
+
+    for name, stage in sorted(measures["stages"].items()):
+
+        print("%-26s %10d %12.3f %12.3f %12.3f %12.3f" % (
+            name, stage["calls"], stage["p50_ms"], stage["p90_ms"], stage["p99_ms"], stage["max_ms"]
+        ))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Offline benchmark of the RedditAgent batch process.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--listing-latency", type=float, default=0.0)
+    parser.add_argument("--forest-latency", type=float, default=0.0)
+    parser.add_argument("--reply-latency", type=float, default=0.0)
+    parser.add_argument("--indico-request-latency", type=float, default=0.0)
+    parser.add_argument("--indico-item-latency", type=float, default=0.0)
+    parser.add_argument("--indico-error-rate", type=float, default=0.0)
+    parser.add_argument("--analysis-workers", type=int, default=8)
+    parser.add_argument("--nlp-batch-size", type=int, default=50)
+    parser.add_argument("--relevance-threshold", type=float, default=0.65)
+    parser.add_argument("--engage", action="store_true")
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--expand-comment-forests", action="store_true")
+    parser.add_argument("--relevance-backend", choices=("indico", "local"), default="indico")
+    parser.add_argument("--json", help="The file-path to which to write the measures as JSON.")
+    options = vars(parser.parse_args())
+
+    # Perform each run in a dedicated process, so that the peak RSS of a run is not affected by the previous runs.
+    context = multiprocessing.get_context("spawn")
+    all_measures = []
+
+    for size in options["sizes"]:
+
+        results = context.Queue()
+        process = context.Process(target=run_benchmark_process, args=(size, options, results))
+        process.start()
+        measures = results.get()
+        process.join()
+
+        if isinstance(measures, Exception):
+            raise measures
+
+        print_report(measures)
+        all_measures.append(measures)
+
+    if options["json"]:
+
+        with open(options["json"], "w") as file:
+            json.dump(all_measures, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,29 @@ The script for initialization and operation of a Reddit AI agent.
 
 
 # Imports
-import csv
-
+from concurrent.futures import ThreadPoolExecutor
+
+from .analysis_record_store import AnalysisRecord, AnalysisRecordStore
+from .archive_writer import ArchiveWriter, read_records
+from .checkpoint import Checkpoint
+from .columnar_archive import ColumnarArchive
+from .engaged_submission_store import EngagedSubmissionStore
+from .engagement_scheduler import EngagementScheduler, FileRateLimiter, RateLimiter
+from .indico_operation_handler import IndicoOperationHandler
+from .keyword_index import WeightedKeywordIndex
+from .nlp_cache import NLPCache
 from .reddit_operation_handler import RedditOperationHandler
+from .relevance_engine import LocalRelevanceEngine
+from .submission_claims import SubmissionClaims
+from .utterance_selector import UtteranceSelector
 
 import indicoio
 import json
+import os
 import pandas
 import praw
 import praw.exceptions as praw_exceptions
 import praw.models as reddit
-import random
-import time
 from datetime import datetime
 from indicoio.utils.errors import IndicoError
 from nltk.corpus import stopwords as nltk_stopwords
@@ -43,6 +54,9 @@ class RedditAgent:
     # The boolean controller for analysis of Submission relevance.
     do_analyze_relevance = False
 
+    # Indicates if the algorithm is to expand the comment forest of every Submission during analysis.
+    do_expand_comment_forests = False
+
     # The boolean controller indicating if the program is to record the main DataFrame after process completion.
     record_data = False
 
@@ -56,6 +70,12 @@ class RedditAgent:
     # The collection of ptopic keywords.
     ptopic_keywords = tuple()
 
+    # The relevance of each ptopic keyword that is not a stop word.
+    ptopic_kwd_weights = dict()
+
+    # The compiled, weighted index of the ptopic keywords.
+    ptopic_kwd_index = WeightedKeywordIndex
+
     # The collection of ptopic keywords and their measured relevance level.
     ptopic_kwds_and_relevance = pandas.Series()
 
@@ -66,11 +86,18 @@ class RedditAgent:
     default_reddit_submissions = list()
 
     # The collection of completed keyword analyses for Reddit Submissions.
-    data = pandas.DataFrame()
+    data = AnalysisRecordStore()
 
     # The Submission collection limit.
     subm_fetch_limit = int()
 
+    # The IDs of the Submissions assigned to the Agent by the caller of the batch process. If None, the "Hot"
+    # Submissions of the work Subreddit are fetched.
+    subm_ids = None
+
+    # The amount of worker threads used for concurrent Submission analysis.
+    analysis_workers = 1
+
     # The Relevance threshold for a Submission's Title and Linked Article.
     relevance_threshold = float()
 
@@ -95,6 +122,27 @@ class RedditAgent:
     # The handler for Reddit-related operations.
     reddit_op_handler = RedditOperationHandler
 
+    # The handler for Indico IO natural language processing operations.
+    indico_op_handler = IndicoOperationHandler
+
+    # The scheduler for the delivery of comments.
+    engagement_scheduler = EngagementScheduler
+
+    # The selector of the utterance most similar to a Submission's Title.
+    utterance_selector = UtteranceSelector
+
+    # The writer of the incremental archive of analyses. If None, analyses are not archived incrementally.
+    archive_writer = None
+
+    # The checkpoint of the batch process.
+    checkpoint = Checkpoint
+
+    # The state of the batch process whose engagements are awaited (see 'finish_batch_process').
+    batch_state = None
+
+    # The claims of Submissions shared with the other shards of a sharded process. If None, every Submission is analyzed.
+    subm_claims = None
+
 
     """ Constructor """
     def __init__(
@@ -103,6 +151,7 @@ class RedditAgent:
             problem_topic_id: str,
             problem_topic_title: str,
             data_fp=None,
+            reddit_instance: praw.Reddit = None
     ):
         """
         Initializes a RedditAgent for a specified problem-topic.
@@ -117,10 +166,12 @@ class RedditAgent:
         :param problem_topic_id: The short ID of the problem-topic.
         :param problem_topic_title: The Title of the problem-topic.
         :param data_fp: The file-path for the main DataFrame.
+        :param reddit_instance: The PRAW Reddit object to use, e.g. one shared by several Agents. If None, one is created
+            from 'reddit_params'.
         """
 
         # The PRAW Reddit object.
-        self.reddit_instance = praw.Reddit(
+        self.reddit_instance = reddit_instance if reddit_instance is not None else praw.Reddit(
             client_id=reddit_params[0],
             client_secret=reddit_params[1],
             user_agent=reddit_params[2],
@@ -139,6 +190,9 @@ class RedditAgent:
             "../resources/problem_topics/" + self.problem_topic_id + "/utterances/utterance_sentences.txt"
         self.utterance_sentences = tuple(open(utterance_sentences_fp).read().splitlines())
 
+        # Vectorize the utterances for similarity-based selection.
+        self.utterance_selector = UtteranceSelector(self.utterance_sentences, stop_words=self.eng_stop_words)
+
         # Define location of the JSON file to archive 'data'.
         if data_fp is None:
 
@@ -147,20 +201,8 @@ class RedditAgent:
 
             self.data_archive_fp = data_fp
 
-        # Initialize the list of already-engaged Submissions.
-        try:
-
-            with open("../resources/reddit/engaged_subm_ids.csv") as file:
-
-                # Define the file iterator.
-                reader = csv.reader(file)
-
-                # Obtain the list of IDs of Submissions that have been engaged in the past.
-                self.engaged_subm_ids = [element for element in list(reader)[0] if element is not '']
-
-        except FileNotFoundError:
-
-            print("File 'engaged_subm_ids.csv' not found.")
+        # Initialize the store of IDs of Submissions that have been engaged in the past.
+        self.engaged_subm_ids = EngagedSubmissionStore(store_fp="../resources/reddit/engaged_subm_ids.csv")
 
         # Initialize dependencies for keyword analysis.
         self.init_kwd_metadata()
@@ -190,26 +232,21 @@ class RedditAgent:
         # Remove stop words.
         self.ptopic_keywords = self.remove_stopwords(self.ptopic_keywords)
 
+        # Define the relevance of the remaining keywords.
+        retained_keywords = set(self.ptopic_keywords)
+        self.ptopic_kwd_weights = {
+            keyword: weight for keyword, weight in self.ptopic_kwds_and_relevance.items()
+            if keyword.lower() in retained_keywords
+        }
 
-        # Define the main operation DataFrame.
-        self.data = pandas.DataFrame(
-            columns=[
-                'subm_object',
-                'subm_id',
-                'comment_count',
-                'title',
-                'title_kwd_intxn',
-                'title_kwd_intxn_size',
-                'title_kwds',
-                'title_relevance_score',
-                'subma_relevance_score',
-                'subma_kwd_intxn',
-                'subma_kwd_intxn_size',
-                'subma_kwds',
-                'subma_url',
-                'utterance_content'
-            ]
-        )
+        # Compile the weighted index of the keywords. Multi-word keywords (e.g. "puerto rico") are matched as phrases.
+        self.ptopic_kwd_index = WeightedKeywordIndex()
+        self.ptopic_kwd_index.add_topic(self.problem_topic_id, self.ptopic_kwd_weights)
+        self.ptopic_kwd_index.compile()
+
+
+        # Define the main operation record store.
+        self.data = AnalysisRecordStore()
 
 
     def start(
@@ -220,12 +257,86 @@ class RedditAgent:
             subm_fetch_limit: (int, None),
             analyze_subm_articles: bool,
             relevance_threshold: float,
+            **options
+    ):
+        """
+        Starts the experimental process.
+
+        :param work_subreddit: The Subreddit from which to fetch Submissions.
+        :param engage: The boolean indicating if the program is to create comments for Submissions.
+        :param process_method: The algorithm to be used:
+            - Batch: collect and analyze "Hot" Submissions.
+            - Stream: continuously collect Submissions that are newly created.
+        :param subm_fetch_limit: The amount of Submissions to fetch from the work Subreddit.
+        :param analyze_subm_articles: The boolean indicating if the program is to analyze Submission Linked Articles.
+        :param relevance_threshold: The threshold for the magnitude of relevance between a Submission and the problem-
+            topic. This value is used to determine if Submissions should be commented on.
+        :param options: The remaining options of the process (see 'configure').
+        """
+
+        # Configure the Agent.
+        self.configure(
+            work_subreddit=work_subreddit,
+            engage=engage,
+            subm_fetch_limit=subm_fetch_limit,
+            analyze_subm_articles=analyze_subm_articles,
+            relevance_threshold=relevance_threshold,
+            **options
+        )
+
+        # Initialize the Agent work process.
+        if process_method == "batch":
+
+            # Begin the batch process.
+            self.run_batch_process()
+
+        elif process_method == "stream":
+
+            # Begin the stream process.
+            self.run_stream_process()
+
+        if self.indico_op_handler.cache is not None:
+
+            # Output status.
+            print("Indico IO cache usage: ", self.indico_op_handler.cache.stats())
+
+            # Release the cache.
+            self.indico_op_handler.cache.close()
+
+
+    def configure(
+            self,
+            work_subreddit: str,
+            engage: bool,
+            subm_fetch_limit: (int, None),
+            analyze_subm_articles: bool,
+            relevance_threshold: float,
             record_data: bool = True,
             analyze_subm_titles: bool= True,
-            analyze_subm_relevance: bool = False
+            analyze_subm_relevance: bool = False,
+            analysis_workers: int = 8,
+            nlp_batch_size: int = 50,
+            nlp_cache_fp: (str, None) = "../resources/cache/nlp_cache.sqlite3",
+            engagement_interval: float = 600,
+            expand_comment_forests: bool = False,
+            relevance_backend: str = "indico",
+            utterance_recent_exclusion: int = 0,
+            archive_max_bytes: (int, None) = 64 * 1024 * 1024,
+            archive_max_seconds: (float, None) = None,
+            archive_fsync_policy: str = "interval",
+            archive_format: str = "json",
+            resume: bool = False,
+            checkpoint_interval: float = 60,
+            shard_index: int = 0,
+            shard_count: int = 1,
+            coordination_dp: (str, None) = None,
+            op_datetime_stamp: (str, None) = None,
+            subm_ids: (list, tuple, None) = None,
+            indico_op_handler: IndicoOperationHandler = None,
+            engagement_scheduler: EngagementScheduler = None
     ):
         """
-        Starts the experimental process.
+        Configures the Agent for a process, defining its options and initializing its handlers.
 
         :param relevance_threshold: The threshold for the magnitude of relevance between a Submission and the problem-
             topic. This value is used to determine if Submissions should be commented on.
@@ -234,11 +345,48 @@ class RedditAgent:
         :param analyze_subm_titles: The boolean indicating if the program is to analyze a Submission titles.
         :param analyze_subm_articles: The boolean indicating if the program is to analyze Submission Linked Articles.
         :param engage: The boolean indicating if the program is to create comments for Submissions.
-        :param process_method: The algorithm to be used:
-            - Batch: collect and analyze "Hot" Submissions.
-            - Stream: continuously collect Submissions that are newly created.
         :param subm_fetch_limit: The amount of Submissions to fetch from the work Subreddit.
         :param work_subreddit: The Subreddit from which to fetch Submissions.
+        :param analysis_workers: The amount of worker threads used to analyze Submissions concurrently. Analysis is
+            dominated by network wait (PRAW and Indico IO requests), so this may well exceed the amount of CPU cores.
+        :param nlp_batch_size: The maximum amount of texts sent within a single Indico IO request. In the stream
+            process, this is also the maximum amount of Submissions analyzed together in a micro-batch.
+        :param nlp_cache_fp: The file-path of the persistent cache of Indico IO results. If None, results are not
+            cached.
+        :param engagement_interval: The minimum amount of seconds between two comments created by the Agent.
+        :param expand_comment_forests: The boolean indicating if the comment forest of every Submission is to be
+            fetched during analysis. By default, the comment count is taken from the Submission's metadata and the
+            forest is only fetched by stages that need the comment bodies (see 'get_subm_comments').
+        :param relevance_backend: The backend used to measure relevance:
+            - Indico: the Indico IO API's 'relevance' function.
+            - Local: a LocalRelevanceEngine built from the problem-topic's keywords and Title. Its scores are not
+              calibrated against those of Indico IO, so 'relevance_threshold' must be chosen for it.
+        :param utterance_recent_exclusion: The amount of the most recently used utterances that are not used again.
+        :param archive_max_bytes: The size beyond which a segment of the incremental archive is rotated.
+        :param archive_max_seconds: The age beyond which a segment of the incremental archive is rotated.
+        :param archive_fsync_policy: The fsync policy of the incremental archive (see ArchiveWriter).
+        :param archive_format: The format of the archive of the complete data of a process:
+            - JSON: a single JSON DataFrame per process (and, for the stream process, only the incremental archive).
+            - Parquet: a file within the problem-topic and date partition of the columnar archive (see
+              ColumnarArchive), which requires the 'pyarrow' package.
+        :param resume: The boolean indicating if the batch process is to resume from the checkpoint of an interrupted
+            process of the problem-topic, if there is one.
+        :param checkpoint_interval: The minimum amount of seconds between two periodic checkpoints of the batch process.
+        :param shard_index: The index of the Agent's shard, if the process is sharded (see ShardedRunner).
+        :param shard_count: The amount of shards of the process. Each shard analyzes only the Submissions assigned to it
+            and names its archives and checkpoint after its index.
+        :param coordination_dp: The directory of the state shared by the shards of the process: the claims of
+            Submissions and the posting rate limiter. It is required if the process is sharded.
+        :param op_datetime_stamp: The date-time stamp of the process. If None, the current date-time is used; the
+            shards of a process are given the stamp of the process.
+        :param subm_ids: The IDs of the Submissions the batch process analyzes, if they were fetched by the caller (e.g.
+            a ShardedRunner, which fetches the "Hot" Submissions once for every shard). If None, the "Hot" Submissions
+            of the work Subreddit are fetched.
+        :param indico_op_handler: The Indico IO operations handler, if it is shared with other Agents (e.g. by a
+            MultiTopicRedditAgent). If None, a handler is created from 'nlp_batch_size', 'nlp_cache_fp' and
+            'relevance_backend'.
+        :param engagement_scheduler: The engagement scheduler, if it is shared with other Agents. If None, a scheduler
+            is created from 'engagement_interval' and 'coordination_dp'.
         """
 
         # Define global variables.
@@ -250,6 +398,55 @@ class RedditAgent:
         self.record_data = record_data
         self.do_analyze_subm_titles = analyze_subm_titles
         self.do_analyze_relevance = analyze_subm_relevance
+        self.analysis_workers = analysis_workers
+        self.do_expand_comment_forests = expand_comment_forests
+        self.utterance_selector.recent_exclusion = utterance_recent_exclusion
+        self.archive_max_bytes = archive_max_bytes
+        self.archive_max_seconds = archive_max_seconds
+        self.archive_fsync_policy = archive_fsync_policy
+        self.archive_format = archive_format
+        self.resume = resume
+        self.subm_ids = None if subm_ids is None else list(subm_ids)
+
+        # Define the date-time stamp for the operation.
+        self.op_datetime_stamp = op_datetime_stamp or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        # Define the claims of Submissions and, unless it is shared, the engagement scheduler. The claims and the posting
+        # rate limiter are shared with the other shards of a sharded process.
+        if coordination_dp is None:
+
+            if shard_count != 1:
+                raise ValueError("A sharded process requires a coordination directory.")
+
+            self.subm_claims = None
+
+            if engagement_scheduler is None:
+                engagement_scheduler = EngagementScheduler(rate_limiter=RateLimiter(min_interval=engagement_interval))
+
+        else:
+
+            self.subm_claims = SubmissionClaims(
+                claims_dp=os.path.join(coordination_dp, "claims", self.problem_topic_id, self.op_datetime_stamp),
+                owner="shard-" + str(shard_index),
+                shard_index=shard_index,
+                shard_count=shard_count
+            )
+
+            if engagement_scheduler is None:
+                engagement_scheduler = EngagementScheduler(rate_limiter=FileRateLimiter(
+                    slot_fp=os.path.join(coordination_dp, "engagement_slot"),
+                    min_interval=engagement_interval
+                ))
+
+        # Name the archives and checkpoint of a shard after the shard.
+        shard_suffix = "" if shard_count == 1 else "_shard-" + str(shard_index)
+        self.op_datetime_stamp += shard_suffix
+
+        # Define the checkpoint of the batch process.
+        self.checkpoint = Checkpoint(
+            checkpoint_fp="../resources/checkpoints/" + self.problem_topic_id + "/batch_process" + shard_suffix + ".json",
+            interval=checkpoint_interval
+        )
 
         # Initialize the Reddit operations handler.
         self.reddit_op_handler = RedditOperationHandler(
@@ -257,158 +454,695 @@ class RedditAgent:
             subreddit=self.work_subreddit
         )
 
-        # Initialize the Agent work process.
-        if process_method == "batch":
+        # Initialize the Indico IO operations handler, unless it is shared.
+        if indico_op_handler is None:
 
-            # Define the date-time stamp for the operation.
-            self.op_datetime_stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            indico_op_handler = IndicoOperationHandler(
+                batch_size=nlp_batch_size,
+                cache=None if nlp_cache_fp is None else NLPCache(cache_fp=nlp_cache_fp),
+                relevance_engine=self.create_relevance_engine() if relevance_backend == "local" else None
+            )
 
-            # Begin the batch process.
-            self.run_batch_process()
+        self.indico_op_handler = indico_op_handler
 
-        elif process_method == "stream":
+        # Define the engagement scheduler.
+        self.engagement_scheduler = engagement_scheduler
+
+
+    def create_relevance_engine(self, engine: LocalRelevanceEngine = None):
+        """
+        Creates an offline relevance engine for the problem-topic, or registers the problem-topic with an existing
+        engine that is shared with other Agents.
 
-            # Unimplemented.
-            pass
+        :param engine: The engine with which to register the problem-topic. If None, a new engine is created.
+        :return: The LocalRelevanceEngine, with the problem-topic registered under its Title.
+        """
+
+        if engine is None:
+            engine = LocalRelevanceEngine(stop_words=self.eng_stop_words)
+
+        engine.add_topic(self.problem_topic_title, dict(self.ptopic_kwds_and_relevance))
 
+        return engine
 
-    def run_batch_process(self):
+
+    def run_batch_process(
+            self,
+            submissions: (list, tuple) = None,
+            nlp_analyses: dict = None,
+            excluded_subm_ids: (set, frozenset) = frozenset(),
+            join: bool = True
+    ):
         """
         Performs Reddit Submission analysis using a batch method of Submission collection. The Submissions that are
         collected, by default, fall under the "Hot" category (see PRAW documentation).
 
+        Every analysis is archived incrementally as soon as it completes, and again once its engagement completes, so
+        the results of an interrupted process are not lost. The complete 'data' is also archived as a single JSON
+        DataFrame at the end of the process.
+
+        The position within the "Hot" listing, the completed analyses and the delivered engagements are checkpointed
+        periodically. If the process is interrupted, a process started with 'resume' continues from the checkpoint:
+        Submissions that were fetched or analyzed are not fetched or analyzed again, and Submissions that were engaged
+        are not engaged again.
+
+        :param submissions: The Submissions to analyze, if they were collected by the caller (e.g. a
+            MultiTopicRedditAgent). If None, the "Hot" Submissions of the work Subreddit are fetched.
+        :param nlp_analyses: The Indico IO results of the Submissions by Submission ID, if they were requested by the
+            caller (see 'prefetch_nlp_analyses'). If None, the Agent performs the requests.
+        :param excluded_subm_ids: The IDs of Submissions that are not to be engaged (see 'process_subm_engages').
+        :param join: The boolean indicating if the process is to wait for the delivery of the queued comments and
+            finish. If False, the process returns once the comments are queued, and the caller finishes it with
+            'finish_batch_process' (e.g. a MultiTopicRedditAgent, which queues the comments of every problem-topic
+            before waiting for them).
+        :return: The list of the analyses of the Submissions cleared for engagement.
         """
 
-        # Get a batch of Reddit Submissions within the "Hot" category.
-        self.default_reddit_submissions = self.reddit_op_handler.get_hot_submissions(fetch_limit=self.subm_fetch_limit)
+        # Load the checkpoint of an interrupted process, or define the state of a new process.
+        state = self.checkpoint.load() if self.resume else None
 
-        # Calculate average length of Submission title length.
-        self.avg_subm_title_size = self.calc_avg_subm_title_size(collection=self.default_reddit_submissions)
+        if state is None:
 
-        # Analyze the Reddit Submissions.
-        self.analyze_submissions()
+            # Submissions assigned by the caller are fetched by ID rather than from the "Hot" listing.
+            state = {
+                "op_datetime_stamp": self.op_datetime_stamp,
+                "stage": "fetch" if self.subm_ids is None else "analyze",
+                "fetch_after": None,
+                "fetched_subm_ids": [] if self.subm_ids is None else list(self.subm_ids),
+                "dismissed_subm_ids": [],
+                "records": []
+            }
 
-        if self.engage:
+        else:
 
-            try:
+            # Continue the archives of the interrupted process.
+            self.op_datetime_stamp = state["op_datetime_stamp"]
+
+            # Output status.
+            print("Resuming the batch process of ", self.op_datetime_stamp, " from stage '", state["stage"], "' with ",
+                  len(state["fetched_subm_ids"]), " fetched and ", len(state["records"]), " analyzed Submissions.")
+
+        # Open the incremental archive.
+        self.open_archive()
+
+        # Define the boolean indicating if the engagements of the process have been queued.
+        queued = False
+
+        try:
+
+            # Get a batch of Reddit Submissions within the "Hot" category, unless they were collected by the caller.
+            if submissions is None:
+                self.default_reddit_submissions = self.fetch_hot_submissions(state)
+            else:
+                self.default_reddit_submissions = list(submissions)
 
-                # Perform engagement for the Submissions if appropriate.
-                self.process_subm_engages()
+            # Calculate average length of Submission title length.
+            self.avg_subm_title_size = self.calc_avg_subm_title_size(collection=self.default_reddit_submissions)
 
-                # Redefine the 'engage' boolean controller.
-                self.engage = False
+            # Restore the analyses of the checkpoint.
+            submissions_by_id = {submission.id: submission for submission in self.default_reddit_submissions}
+            for analysis in state.pop("records"):
+                self.data.append(dict(analysis, subm_object=submissions_by_id.get(analysis["subm_id"])))
 
-            except praw.exceptions.APIException as e:
-                print("Encountered: ", e.message)
-                raise e
+            # Analyze the Reddit Submissions.
+            self.analyze_submissions(state, nlp_analyses)
 
+            # Define the analyses of the Submissions cleared for engagement.
+            cleared_records = []
 
-        # Archive 'data'.
-        if self.record_data:
+            if self.engage:
 
-            # Remove elements from 'data' that cannot be serialized.
-            t: pandas.DataFrame = self.data.drop("subm_object", 1)
+                # Queue engagement for the Submissions if appropriate, archiving each analysis again once its
+                # engagement is complete. Delivered engagements are durably recorded by the engaged Submission store, so
+                # the checkpoint of their measures is periodic.
+                def on_complete(record: AnalysisRecord):
 
-            # Generate the archive FP.
-            self.data_archive_fp = \
-                "../resources/dataframes/" + self.problem_topic_id + "/data/" + self.op_datetime_stamp + ".json"
+                    self.archive_record(record)
+                    self.save_checkpoint(state)
 
-            t.to_json(path_or_buf=self.data_archive_fp)
+                cleared_records = self.process_subm_engages(
+                    excluded_subm_ids=excluded_subm_ids,
+                    on_complete=on_complete
+                )
 
+            queued = True
 
-    def analyze_submissions(self):
+        finally:
+
+            if not queued:
+
+                # Checkpoint the state of the interrupted process.
+                self.save_checkpoint(state, force=True)
+
+                # Close the incremental archive.
+                self.close_archive()
+
+        # Keep the state of the process until its engagements are delivered.
+        self.batch_state = state
+
+        if join:
+            self.finish_batch_process()
+
+
+        return cleared_records
+
+
+    def finish_batch_process(self):
         """
-        Analyzes Reddit Submissions. Analysis is performed on the Titles and Linked Articles of the default collection
-        of Reddit Submissions.
+        Finishes the batch process started by 'run_batch_process': waits for the delivery of the queued comments,
+        archives 'data' and deletes the checkpoint of the completed process.
+        """
+
+        state = self.batch_state
+
+        try:
+
+            # Wait for the delivery of the queued comments.
+            self.engagement_scheduler.join()
+
+            # Redefine the 'engage' boolean controller.
+            self.engage = False
+
+            # Archive 'data'.
+            if self.record_data:
+
+                self.archive_data()
+
+        finally:
+
+            # Checkpoint the state of the process.
+            self.save_checkpoint(state, force=True)
+
+            # Close the incremental archive.
+            self.close_archive()
 
+        # Delete the checkpoint of the completed process.
+        self.checkpoint.clear()
+        self.batch_state = None
+
+
+    def fetch_hot_submissions(self, state: dict):
+        """
+        Fetches the "Hot" Submissions of the work Subreddit, checkpointing the position within the listing. The
+        Submissions that were fetched before the checkpoint are fetched again by ID, and the listing continues after the
+        last of them.
+
+        :param state: The state of the batch process.
+        :return: The list of Submission objects.
         """
 
-        # Create temporary container for keywords analyses.
-        keyword_analyses = []
+        # Fetch the Submissions that were fetched before the checkpoint, if any.
+        submissions = self.reddit_op_handler.get_submissions(state["fetched_subm_ids"]) \
+            if state["fetched_subm_ids"] else []
 
-        # Analyze the Reddit Submissions in the default collection, appending each analysis to 'data'.
-        for submission in self.default_reddit_submissions:
+        if state["stage"] == "fetch":
 
-            # Define container for Submission Title and LinkedArticle analyses.
-            analysis = {}
+            # Define the amount of Submissions that remain to be fetched.
+            remaining = None if self.subm_fetch_limit is None else self.subm_fetch_limit - len(state["fetched_subm_ids"])
 
-            try:
+            if remaining is None or remaining > 0:
+
+                for submission in self.reddit_op_handler.iter_hot_submissions(
+                        fetch_limit=remaining,
+                        after=state["fetch_after"]
+                ):
+                    submissions.append(submission)
 
-                # Resolve instances of MoreComments within the Submission's comment forest. That is, expand the forest.
-                submission.comments.replace_more(limit=0)
+                    # Record the position within the listing.
+                    state["fetched_subm_ids"].append(submission.id)
+                    state["fetch_after"] = "t3_" + submission.id
+                    self.save_checkpoint(state)
 
-                # Record the Submission ID.
-                analysis["subm_id"] = submission.id
+            state["stage"] = "analyze"
+            self.save_checkpoint(state, force=True)
+
+
+        return submissions
+
+
+    def save_checkpoint(self, state: dict, force: bool = False):
+        """
+        Saves the state of the batch process with the analyses of 'data', if a periodic checkpoint is due or if forced.
 
-                # Record the amount of comments the Submission has.
-                analysis["comment_count"] = len(submission.comments.list())
+        :param state: The state of the batch process.
+        :param force: The boolean indicating if the checkpoint is to be saved regardless of its interval.
+        """
+
+        self.checkpoint.save(
+            lambda: dict(state, records=[record.to_dict(exclude=("subm_object",)) for record in self.data]),
+            force=force
+        )
+
+
+    def archive_data(self, records: (list, tuple) = None):
+        """
+        Archives 'data' as a JSON DataFrame within the problem-topic's data directory, or within the columnar archive if
+        it is the selected archive format.
+
+        :param records: The analyses to archive in the columnar format, as dicts. If None, the records of 'data' are
+            archived.
+        """
+
+        if self.archive_format == "parquet":
+
+            if records is None:
+                records = [record.to_dict(exclude=("subm_object",)) for record in self.data]
+
+            # Write the analyses to the partition of the problem-topic and the date of the process.
+            self.data_archive_fp = ColumnarArchive().write(
+                ptopic_id=self.problem_topic_id,
+                records=records,
+                name=self.op_datetime_stamp,
+                date=self.op_datetime_stamp[:10]
+            )
+
+            return
+
+        # Export 'data', removing elements that cannot be serialized.
+        t: pandas.DataFrame = self.data.to_dataframe(exclude=("subm_object",))
+
+        # Generate the archive FP.
+        self.data_archive_fp = \
+            "../resources/dataframes/" + self.problem_topic_id + "/data/" + self.op_datetime_stamp + ".json"
+
+        t.to_json(path_or_buf=self.data_archive_fp)
+
+
+    def open_archive(self):
+        """
+        Opens the incremental archive of the process within the problem-topic's data directory, if the data is to be
+        recorded. The segments of the archive are named after the process's date-time stamp.
+        """
+
+        if not self.record_data:
+            return
+
+        self.archive_writer = ArchiveWriter(
+            archive_dp="../resources/dataframes/" + self.problem_topic_id + "/data",
+            name=self.op_datetime_stamp,
+            max_bytes=self.archive_max_bytes,
+            max_seconds=self.archive_max_seconds,
+            fsync_policy=self.archive_fsync_policy
+        )
+
+
+    def archive_record(self, record: AnalysisRecord):
+        """
+        Appends an analysis to the incremental archive, if it is open. Analyses are archived by both the analysis and
+        the engagement threads; the writer serializes output.
+
+        :param record: The analysis of the Submission.
+        """
+
+        if self.archive_writer is not None:
+
+            # Perform output, removing elements from the analysis that cannot be serialized.
+            self.archive_writer.write(record.to_dict(exclude=("subm_object",)))
+
+
+    def close_archive(self):
+        """
+        Closes the incremental archive, if it is open.
+        """
+
+        if self.archive_writer is not None:
+
+            self.archive_writer.close()
+            self.archive_writer = None
+
+
+    def run_stream_process(self):
+        """
+        Performs Reddit Submission analysis using a stream method of Submission collection. Submissions that are newly
+        created within the work Subreddit are collected one at a time and passed through the analysis, engagement and
+        archival stages individually. The analyses are archived as they complete instead of being accumulated in
+        'data', so memory use does not grow with the length of the stream.
+
+        """
+
+        # Open the incremental archive. Each line of the archive holds the JSON record of a single Submission's
+        # analysis.
+        self.open_archive()
+
+        try:
 
-                if self.do_analyze_subm_titles:
+            # Define the micro-batch of Submissions awaiting analysis.
+            window = []
 
-                    # Perform keyword analysis of the Submission's Title.
-                    analysis.update(self.analyze_subm_title_kwds(submission))
+            # Process the newly created Submissions of the work Subreddit as they arrive. The stream yields None
+            # whenever no new Submissions are available, at which point the pending micro-batch is processed.
+            for submission in self.reddit_op_handler.stream_submissions(
+                    fetch_limit=self.subm_fetch_limit,
+                    pause_after=0
+            ):
 
-                if self.do_analyze_subm_articles:
+                if submission is not None:
 
-                    # Perform keyword analysis of the Submission's Linked Article.
-                    analysis.update(self.analyze_subm_artc_kwds(submission))
+                    window.append(submission)
 
-                if self.do_analyze_relevance:
+                if window and (submission is None or len(window) >= self.indico_op_handler.batch_size):
 
-                    # Perform relevance measurement.
-                    analysis.update(self.analyze_relevance(submission))
+                    # Process the micro-batch.
+                    self.process_stream_window(window)
+                    window = []
+
+            # Process the remaining Submissions.
+            if window:
+
+                self.process_stream_window(window)
+
+            # Wait for the delivery of the queued comments.
+            self.engagement_scheduler.join()
+
+        finally:
+
+            # Close the incremental archive.
+            self.close_archive()
+
+        if self.record_data and self.archive_format == "parquet":
+
+            # Compact the incremental archive into the columnar archive.
+            self.archive_data(records=read_records(
+                archive_dp="../resources/dataframes/" + self.problem_topic_id + "/data",
+                name=self.op_datetime_stamp
+            ))
+
+
+    def process_stream_window(self, window: list):
+        """
+        Passes a micro-batch of streamed Submissions through the analysis, engagement and archival stages. The Indico
+        IO requests for the micro-batch are batched; every other stage is performed one Submission at a time.
+
+        :param window: The micro-batch of Submissions.
+        """
+
+        # Omit the Submissions of other shards.
+        window = self.claim_submissions(window)
+
+        # Perform the Indico IO requests for the micro-batch.
+        nlp_analyses = self.prefetch_nlp_analyses(window)
+
+        for submission, nlp_analysis in zip(window, nlp_analyses):
+
+            try:
+
+                # Analyze the Submission.
+                record = AnalysisRecord(**self.analyze_submission(submission, nlp_analysis))
 
             except IndicoError:
 
                 # Output status.
                 print("Dismissed Submission ", submission.id,
-                      " in 'analyze_submissions' due to an Indico IO value error.")
+                      " in 'run_stream_process' due to an Indico IO value error.")
                 continue
 
-            # Append the analysis to the collection for merging with 'data'.
-            keyword_analyses.append(analysis)
+            if self.engage:
+
+                # Perform engagement for the Submission if appropriate, archiving the analysis once the engagement is
+                # complete.
+                self.process_subm_engage(submission_data=record, on_complete=self.archive_record)
+
+            else:
+
+                # Archive the analysis.
+                self.archive_record(record)
 
 
-        # Convert 'keyword_analyses' to DataFrame for concatenation with 'data'.
-        keyword_analyses = pandas.DataFrame(keyword_analyses)
+    def analyze_submissions(self, state: dict = None, nlp_analyses: dict = None):
+        """
+        Analyzes Reddit Submissions. Analysis is performed on the Titles and Linked Articles of the default collection
+        of Reddit Submissions.
+
+        :param state: The state of the batch process, which is checkpointed as analyses complete. Submissions that were
+            analyzed or dismissed before the checkpoint are not analyzed again.
+        :param nlp_analyses: The Indico IO results of the Submissions by Submission ID, if they were requested by the
+            caller. If None, the requests are performed.
+        """
+
+        # Define the Submissions that remain to be analyzed.
+        submissions = self.default_reddit_submissions
+
+        if state is not None:
+
+            completed = set(state["dismissed_subm_ids"]) | set(self.data.index)
+            submissions = [submission for submission in submissions if submission.id not in completed]
+
+        # Omit the Submissions of other shards.
+        submissions = self.claim_submissions(submissions)
+
+        # Perform the Indico IO requests for the remaining Submissions as batch requests, unless they were performed by
+        # the caller.
+        if nlp_analyses is None:
+            nlp_analyses = self.prefetch_nlp_analyses(submissions)
+        else:
+            nlp_analyses = [nlp_analyses[submission.id] for submission in submissions]
 
-        # Update 'data'.
-        self.data = pandas.concat([self.data, keyword_analyses])
+        # Analyze the Reddit Submissions concurrently. 'map' yields the analyses in the order of the collection
+        # regardless of the order in which they complete.
+        with ThreadPoolExecutor(max_workers=max(1, self.analysis_workers)) as executor:
 
+            for submission, analysis in zip(
+                    submissions,
+                    executor.map(self.try_analyze_submission, submissions, nlp_analyses)
+            ):
+
+                # Update 'data' and archive the analysis, omitting dismissed Submissions.
+                if analysis is not None:
+
+                    self.archive_record(self.data.append(analysis))
+
+                elif state is not None:
+
+                    state["dismissed_subm_ids"].append(submission.id)
+
+                if state is not None:
+
+                    # Checkpoint the completed analyses periodically.
+                    self.save_checkpoint(state)
+
+        if state is not None:
+
+            state["stage"] = "engage"
+            self.save_checkpoint(state, force=True)
+
+
+    def claim_submissions(self, submissions: (list, tuple)):
+        """
+        Claims a collection of Submissions for the Agent's shard. If the process is not sharded, every Submission is
+        claimed.
 
-    def analyze_relevance(self, submission: reddit.Submission):
+        :param submissions: The Submission objects.
+        :return: The list of the Submissions claimed by the Agent, which it alone is to analyze and engage.
+        """
+
+        if self.subm_claims is None:
+            return list(submissions)
+
+        claimed = self.subm_claims.claim_many([submission.id for submission in submissions])
+
+        return [submission for submission, is_claimed in zip(submissions, claimed) if is_claimed]
+
+
+    def prefetch_nlp_analyses(self, submissions: (list, tuple)):
+        """
+        Performs the Indico IO requests for a collection of Submissions as chunked batch requests, as determined by the
+        analysis boolean controllers. The Titles and Linked Article URLs of all Submissions are collected and sent
+        together, and the results are fanned back out to each Submission.
+
+        :param submissions: The Submissions for which to perform the requests.
+        :return: The list of Indico IO results for each Submission, in the order of 'submissions'.
+        """
+
+        # Define the container for the results of each Submission.
+        nlp_analyses = [{} for _ in submissions]
+
+        # Define references to the Titles and Linked Article URLs of the Submissions.
+        titles = [submission.title for submission in submissions]
+        urls = [submission.url for submission in submissions]
+
+        if self.do_analyze_subm_titles:
+
+            # Generate keyword analyses for the Submission Titles.
+            for nlp_analysis, result in zip(nlp_analyses, self.indico_op_handler.batch_keywords(titles)):
+                nlp_analysis["title_kwd_analysis"] = result
+
+        if self.do_analyze_subm_articles:
+
+            # Generate keyword analyses for the Linked Articles.
+            for nlp_analysis, result in zip(nlp_analyses, self.indico_op_handler.batch_keywords(urls)):
+                nlp_analysis["subma_kwd_analysis"] = result
+
+        if self.do_analyze_relevance:
+
+            # Generate relevance measures for the Titles and Linked Articles, interleaving them so that each
+            # Submission's pair of texts is adjacent.
+            results = self.indico_op_handler.batch_relevance(
+                [text for pair in zip(titles, urls) for text in pair],
+                [self.problem_topic_title]
+            )
+
+            for i, nlp_analysis in enumerate(nlp_analyses):
+                nlp_analysis["relevance_analysis"] = results[2 * i: 2 * i + 2]
+
+
+        return nlp_analyses
+
+
+    def try_analyze_submission(self, submission: reddit.Submission, nlp_analysis: dict = None):
+        """
+        Analyzes a single Reddit Submission, dismissing it if the analysis raises an Indico IO error. An error for one
+        Submission therefore does not affect the analysis of any other Submission.
+
+        :param submission: The Submission to analyze.
+        :param nlp_analysis: The prefetched Indico IO results for the Submission (see 'prefetch_nlp_analyses').
+        :return: The completed analysis, or None if the Submission was dismissed.
+        """
+
+        try:
+
+            # Analyze the Submission.
+            return self.analyze_submission(submission, nlp_analysis)
+
+        except IndicoError:
+
+            # Output status.
+            print("Dismissed Submission ", submission.id,
+                  " in 'analyze_submissions' due to an Indico IO value error.")
+
+            return None
+
+
+    def analyze_submission(self, submission: reddit.Submission, nlp_analysis: dict = None):
+        """
+        Analyzes a single Reddit Submission. Analysis is performed on the Title and Linked Article of the Submission as
+        determined by the analysis boolean controllers.
+
+        :param submission: The Submission to analyze.
+        :param nlp_analysis: The prefetched Indico IO results for the Submission (see 'prefetch_nlp_analyses'). Any
+            result that is not provided is requested individually. Keyword intersections may also be provided (keys
+            'title_kwd_intxn' and 'subma_kwd_intxn'), in which case they are not matched again.
+        :return: The completed analysis.
+        """
+
+        if nlp_analysis is None:
+            nlp_analysis = {}
+
+        # Define container for Submission Title and LinkedArticle analyses.
+        analysis = {}
+
+        # Record the Submission ID.
+        analysis["subm_id"] = submission.id
+
+        if self.do_expand_comment_forests:
+
+            # Record the amount of comments within the Submission's expanded comment forest.
+            analysis["comment_count"] = len(self.get_subm_comments(submission))
+
+        else:
+
+            # Record the amount of comments the Submission has, as reported by its metadata.
+            analysis["comment_count"] = submission.num_comments
+
+        if self.do_analyze_subm_titles:
+
+            # Perform keyword analysis of the Submission's Title.
+            analysis.update(self.analyze_subm_title_kwds(
+                submission,
+                title_kwd_analysis=nlp_analysis.get("title_kwd_analysis"),
+                title_kwd_intxn=nlp_analysis.get("title_kwd_intxn")
+            ))
+
+        if self.do_analyze_subm_articles:
+
+            # Perform keyword analysis of the Submission's Linked Article.
+            analysis.update(self.analyze_subm_artc_kwds(
+                submission,
+                subma_kwd_analysis=nlp_analysis.get("subma_kwd_analysis"),
+                subma_kwd_intxn=nlp_analysis.get("subma_kwd_intxn")
+            ))
+
+        if self.do_analyze_relevance:
+
+            # Perform relevance measurement.
+            analysis.update(
+                self.analyze_relevance(submission, relevance_analysis=nlp_analysis.get("relevance_analysis"))
+            )
+
+
+        return analysis
+
+
+    @staticmethod
+    def get_subm_comments(submission: reddit.Submission):
+        """
+        Returns the flattened comment forest of a Submission. The forest is fetched and expanded on first use only; PRAW
+        retains it on the Submission object for later calls.
+
+        :param submission: The Submission.
+        :return: The list of the Submission's Comments.
+        """
+
+        # Resolve instances of MoreComments within the Submission's comment forest. That is, expand the forest.
+        submission.comments.replace_more(limit=0)
+
+
+        return submission.comments.list()
+
+
+    def analyze_relevance(self, submission: reddit.Submission, relevance_analysis: list = None):
         """
         Generates a definition of relevance to the problem-topic for a given Submission's Title and Linked Article using
         the IndicoIO API's 'relevance' function. The relevance measure is generated by comparing the problem-topic Title
         with a Submission's Title and Linked Article.
 
+        :param relevance_analysis: The prefetched relevance measures of the Submission's Title and Linked Article. If
+            None, the measures are requested.
         :return: The completed relevance analysis.
         """
 
-        # Define a reference to linked URL of the provided Submission.
-        subm_url = submission.url
+        if relevance_analysis is None:
 
-        # Generate a relevance measure.
-        relevance_analyses = indicoio.relevance(
-            [submission.title, subm_url],
-            [self.problem_topic_title]
-        )
+            # Define a reference to linked URL of the provided Submission.
+            subm_url = submission.url
+
+            # Generate a relevance measure.
+            relevance_analysis = self.indico_op_handler.batch_relevance(
+                [submission.title, subm_url],
+                [self.problem_topic_title]
+            )
+
+        # Retrieve the measures, raising the error of a failed request.
+        relevance_analyses = [self.indico_op_handler.resolve(result) for result in relevance_analysis]
 
         return {"title_relevance_score": relevance_analyses[0][0], "subma_relevance_score": relevance_analyses[1][0]}
 
 
-    def analyze_subm_artc_kwds(self, submission: reddit.Submission):
+    def analyze_subm_artc_kwds(
+            self,
+            submission: reddit.Submission,
+            subma_kwd_analysis: (dict, IndicoError) = None,
+            subma_kwd_intxn: list = None
+    ):
         """
         Performs keyword intersection analysis for the ptopic-keywords and a Submission's Linked Article.
 
+        :param subma_kwd_analysis: The prefetched keyword analysis of the Linked Article. If None, the analysis is
+            requested.
+        :param subma_kwd_intxn: The precomputed intersection of the ptopic-keywords and the Linked Article's keywords.
+            If None, the intersection is matched.
         :return: The completed analysis.
         """
 
         # Define a reference to linked URL of the provided Submission.
         subm_url = submission.url
 
-        # Generate keyword analysis for the Linked Article.
-        subm_artc_kwd_analysis = indicoio.keywords(subm_url)
+        if subma_kwd_analysis is None:
+
+            # Generate keyword analysis for the Linked Article.
+            subma_kwd_analysis = self.indico_op_handler.batch_keywords([subm_url])[0]
+
+        # Retrieve the keyword analysis for the Linked Article, raising the error of a failed request.
+        subm_artc_kwd_analysis = self.indico_op_handler.resolve(subma_kwd_analysis)
 
         # Retrieve the keywords identified for the Linked Article.
         subm_artc_kwds = tuple(subm_artc_kwd_analysis.keys())
@@ -417,12 +1151,15 @@ class RedditAgent:
         subm_artc_kwds = tuple(map(lambda x: x.lower(), subm_artc_kwds))
 
         # Define the intersection of the problem-topic keywords and the Linked Article's keywords.
-        subm_artc_kwd_intxn = self.intersect(self.ptopic_keywords, subm_artc_kwds)
+        subm_artc_kwd_intxn = subma_kwd_intxn
+        if subm_artc_kwd_intxn is None:
+            subm_artc_kwd_intxn = self.ptopic_kwd_index.match_collection(subm_artc_kwds).get(self.problem_topic_id, [])
 
         # Define a structure to contain all measures relevant to analysis.
         analysis = {
             "subma_kwd_intxn": subm_artc_kwd_intxn,
             "subma_kwd_intxn_size": float(len(subm_artc_kwd_intxn)),
+            "subma_kwd_weighted_score": self.ptopic_kwd_index.score(self.problem_topic_id, subm_artc_kwd_intxn),
             "subma_kwds": subm_artc_kwds,
             "subma_url": subm_url
         }
@@ -432,33 +1169,45 @@ class RedditAgent:
 
 
     # noinspection PyDictCreation
-    def analyze_subm_title_kwds(self, submission: reddit.Submission, track_subm_obj: bool = True):
+    def analyze_subm_title_kwds(
+            self,
+            submission: reddit.Submission,
+            track_subm_obj: bool = True,
+            title_kwd_analysis: (dict, IndicoError) = None,
+            title_kwd_intxn: list = None
+    ):
         """
         Performs keyword intersection analysis for the problem-topic keyword collection and a given Submission's title.
 
         In this method, we perform the keywords analysis for the Submission's title and the problem topic keywords.
-        For the title, we perform an intersection of its entire word-set, stripped of English stopwords, and
-        the problem topic-keywords. We use a Submission's title's entire token set because this is analogous to
-        manual evaluation of relevancy. The Submission's title's keywords are archived for possible necessity.
-
+        For the title, we match the problem topic-keywords, including multi-word keyphrases, against its entire token
+        sequence. We use a Submission's title's entire token sequence because this is analogous to manual evaluation of
+        relevancy. The Submission's title's keywords are archived for possible necessity.
+
+        :param title_kwd_analysis: The prefetched keyword analysis of the Submission's Title. If None, the analysis is
+            requested.
+        :param title_kwd_intxn: The precomputed intersection of the problem-topic keywords and the Submission's Title.
+            If None, the intersection is matched.
         :return: The completed analysis.
         """
 
 
-        # Define the collection of the words for the given Submission's Title.
-        subm_title_words = tuple(map(lambda x: x.lower(), submission.title.split()))
-
-        # Remove English stopwords from the Submission title token set.
-        subm_title_words = self.remove_stopwords(corpus=subm_title_words)
-
-        # Define the intersection of the problem-topic keywords and the Submission's title's content.
-        subm_title_intxn = self.intersect(self.ptopic_keywords, subm_title_words)
+        # Define the intersection of the problem-topic keywords and the Submission's title's content, matching the
+        # keywords against the Title in a single pass.
+        subm_title_intxn = title_kwd_intxn
+        if subm_title_intxn is None:
+            subm_title_intxn = self.ptopic_kwd_index.match(submission.title).get(self.problem_topic_id, [])
 
         # Define the PtopicKeyword-SubmissionTitle intersection magnitude.
         keywords_intersections_count = len(subm_title_intxn)
 
+        if title_kwd_analysis is None:
+
+            # Generate keyword analysis for the Submission's Title.
+            title_kwd_analysis = self.indico_op_handler.batch_keywords([submission.title])[0]
+
         # Define the collection of the keywords for the given Submission's Title.
-        subm_title_kwds = tuple(indicoio.keywords(submission.title).keys())
+        subm_title_kwds = tuple(self.indico_op_handler.resolve(title_kwd_analysis).keys())
         subm_title_kwds = tuple(map(lambda x: x.lower(), subm_title_kwds))
         subm_title_kwds = self.remove_stopwords(subm_title_kwds)
 
@@ -467,6 +1216,7 @@ class RedditAgent:
             "title": submission.title,
             "title_kwd_intxn": subm_title_intxn,
             "title_kwd_intxn_size": float(keywords_intersections_count),
+            "title_kwd_weighted_score": self.ptopic_kwd_index.score(self.problem_topic_id, subm_title_intxn),
             "title_kwds": subm_title_kwds
         }
 
@@ -481,64 +1231,137 @@ class RedditAgent:
         return analysis
 
 
-    def process_subm_engages(self):
+    def process_subm_engages(self, excluded_subm_ids: (set, frozenset) = frozenset(), on_complete=None):
         """
-        Conducts the engagement actions of the agent.
+        Conducts the engagement actions of the agent. Engagement clearance is determined for all analyzed Submissions at
+        once, and only the cleared Submissions are visited. The utterances of the cleared Submissions are selected
+        together, and comments are queued for delivery by the engagement scheduler.
+
+        :param excluded_subm_ids: The IDs of Submissions that are not to be engaged, e.g. because another Agent has
+            already queued a comment for them.
+        :param on_complete: The function called with the analysis of every Submission once its engagement measures are
+            final.
+        :return: The list of the analyses of the cleared Submissions.
         """
 
-        # Note: "row" necessary; causes error if exempted.
-        for index, row in self.data.iterrows():
+        # Determine engagement clearance for every Submission.
+        clearances = self.engagement_clearances(excluded_subm_ids=excluded_subm_ids)
+
+        # Output status.
+        print(len(self.data) - int(clearances.sum()), " of ", len(self.data),
+              " Submissions not granted engagement_clearance.")
+
+        # Select the utterances for the cleared Submissions.
+        cleared_records = [record for record, cleared in zip(self.data, clearances) if cleared]
+        utterances = iter(self.generate_utterances(cleared_records))
+
+        for record, cleared in zip(self.data, clearances):
+
+            if cleared:
 
-            if self.engagement_clearance(self.data.loc[index]):
+                # Perform engagement for the Submission.
+                self.process_subm_engage(
+                    submission_data=record,
+                    on_complete=on_complete,
+                    cleared=True,
+                    utterance_message=next(utterances)
+                )
 
-                # Generate the utterance message.
-                utterance_message = self.generate_utterance(submission_data=self.data.loc[index])
+            elif record.engagement_time is None:
 
                 # Save the utterance message content.
-                self.data.at[index, "utterance_content"] = utterance_message
+                record.utterance_content = "UNDEFINED"
 
-                try:
+                if on_complete is not None:
+                    on_complete(record)
 
-                    print("Delaying process for 10 minutes to avoid 'excessive posting' error. Waiting...")
-                    # Delay process to avoid encountering an "excessive posting" error from the Reddit API.
-                    time.sleep(600)
-                    print("...Done")
 
-                    # Create and deliver a message for the respective Submission providing the Submission object as the
-                    # actionable Submission and the utterance to be used.
-                    self.reddit_op_handler.create_comment(
-                        submission=self.data.subm_object[index],
-                        comment_content=utterance_message
-                    )
+        return cleared_records
 
-                    # Record the engagement time.
-                    self.data.at[index, "engagement_time"] = str(datetime.now())
 
-                    # Record the engaged Submission's ID.
-                    with open("../resources/reddit/engaged_subm_ids.csv", "a") as file:
+    def process_subm_engage(
+            self,
+            submission_data: AnalysisRecord,
+            on_complete=None,
+            cleared: bool = None,
+            utterance_message: str = None
+    ):
+        """
+        Conducts the engagement action of the agent for a single Submission. If the Submission is granted engagement
+        clearance, its comment is queued for delivery by the engagement scheduler; the engagement measures are recorded
+        in 'submission_data' once the comment has been delivered.
+
+        :param submission_data: The analysis of the Submission.
+        :param on_complete: The function called with 'submission_data' once its engagement measures are final.
+        :param cleared: The engagement clearance of the Submission, if already determined.
+        :param utterance_message: The utterance for the Submission, if already selected.
+        """
 
-                        # Perform output.
-                        file.write(self.data.at[index, "subm_id"] + ",")
+        if cleared is None:
+            cleared = self.engagement_clearance(submission_data)
 
+        if not cleared:
 
-                except praw.exceptions.APIException as e:
+            # Save the utterance message content.
+            submission_data.utterance_content = "UNDEFINED"
 
-                    # Output error details and delay operation.
-                    print("Caught error: ", e.message, "...Dismissing Submission: ", self.data.at[index, "subm_id"])
+            if on_complete is not None:
+                on_complete(submission_data)
 
-            else:
+            return
 
-                # Save the utterance message content.
-                self.data.at[index, "utterance_content"] = "UNDEFINED"
+        # Generate the utterance message.
+        if utterance_message is None:
+            utterance_message = self.generate_utterance(submission_data=submission_data)
+
+        # Save the utterance message content.
+        submission_data.utterance_content = utterance_message
+
+        def on_posted():
+
+            # Record the engagement time.
+            submission_data.engagement_time = str(datetime.now())
+
+            # Record the engaged Submission's ID.
+            self.engaged_subm_ids.add(submission_data.subm_id)
+
+            if on_complete is not None:
+                on_complete(submission_data)
+
+        def on_failed(e: Exception):
+
+            # Output error details.
+            print(
+                "Caught error: ", e.message if isinstance(e, praw_exceptions.APIException) else e,
+                "...Dismissing Submission: ", submission_data.subm_id
+            )
+
+            if on_complete is not None:
+                on_complete(submission_data)
+
+        # Queue the creation and delivery of a message for the respective Submission providing the Submission object as
+        # the actionable Submission and the utterance to be used. The scheduler delays delivery as necessary to avoid
+        # encountering an "excessive posting" error from the Reddit API.
+        self.engagement_scheduler.submit(
+            post=lambda: self.reddit_op_handler.create_comment(
+                submission=submission_data.subm_object,
+                comment_content=utterance_message
+            ),
+            on_posted=on_posted,
+            on_failed=on_failed
+        )
 
 
     def calc_avg_subm_title_size(self, collection: (list, tuple)):
         """
         Calculates the average word count of the title for each Submission in a given collection.
 
-        :return: The value of the average magnitude of Submission Title lengths.
+        :return: The value of the average magnitude of Submission Title lengths, or 0 for an empty collection.
         """
 
+        if not collection:
+            return 0
+
         # Extract the title size for each Submission in 'submission_objects'.
         x = 0
         for submission in collection:
@@ -547,24 +1370,32 @@ class RedditAgent:
             x += num_tokens
 
         # Return the average Submission Title size.
-        return int(x / len(self.default_reddit_submissions))
+        return int(x / len(collection))
 
 
-    def generate_utterance(self, submission_data: pandas.Series):
+    def generate_utterance(self, submission_data: AnalysisRecord):
         """
         Generates a message to be submitted to a Reddit Submission.
 
-        Currently selecting a random choice, further versions will implement more intelligent utterance generation.
-
-        :return: A random selection from the collection of utterances.
+        :return: The utterance most similar to the Submission's Title.
         """
 
-        # TODO:
-        #   - Define utterance choice to be generated by considering which of the sample sentences are most similar to
-        #     a respective Submission title.
+        return self.generate_utterances([submission_data])[0]
+
 
+    def generate_utterances(self, submissions_data: (list, tuple)):
+        """
+        Generates the messages to be submitted to a collection of Reddit Submissions, selecting for each the utterance
+        most similar to its Title. Submissions whose Title shares no terms with any utterance are given a random choice.
+
+        :param submissions_data: The analyses of the Submissions.
+        :return: The list of utterances, in the order of 'submissions_data'.
+        """
 
-        return random.choice(self.utterance_sentences)
+        return self.utterance_selector.select_many([
+            submission_data.subm_object.title if submission_data.title is None else submission_data.title
+            for submission_data in submissions_data
+        ])
 
 
     def get_reddit_submission(self, submission_id: str):
@@ -589,27 +1420,68 @@ class RedditAgent:
         return [word for word in corpus if word not in self.eng_stop_words]
 
 
-    def engagement_clearance(self, submission_data: pandas.Series):
+    def engagement_clearance(self, submission_data: AnalysisRecord):
         """
         Determines if the Agent is to engage in a Submission, observing the Submission metadata.
 
         :return: The boolean indicating whether or not the agent is to comment on a Submission.
         """
 
+        # Submissions without relevance scores are not relevant (see 'engagement_clearances').
+        if submission_data.title_relevance_score is None or submission_data.subma_relevance_score is None:
+
+            # Output status.
+            print("Submission " + submission_data.subm_id +
+                  " not granted engagement_clearance. Its relevance was not measured.")
+
+            return False
+
         # Determine if the sum of the relevance scores of the Submission title and linked article are above a desired
         # threshold.
-        if (submission_data.title_relevance_score + submission_data.subma_relevance_score) > self.relevance_threshold \
-                and (submission_data.subm_id not in self.engaged_subm_ids):
+        if (submission_data.title_relevance_score + submission_data.subma_relevance_score) <= self.relevance_threshold:
 
-            return True
+            # Output status.
+            print("Submission " + submission_data.subm_id +
+                  " not granted engagement_clearance. Its relevance is below the threshold.")
 
-        else:
+            return False
+
+        if submission_data.subm_id in self.engaged_subm_ids:
 
             # Output status.
             print("Submission " + submission_data.subm_id +
                   " not granted engagement_clearance. It has already been engaged.")
 
-        return False
+            return False
+
+
+        return True
+
+
+    def engagement_clearances(self, excluded_subm_ids: (set, frozenset) = frozenset()):
+        """
+        Determines engagement clearance for every Submission in 'data' in a single vectorized pass. The criteria are
+        those of 'engagement_clearance'.
+
+        :param excluded_subm_ids: The IDs of Submissions that are not to be cleared.
+        :return: The NumPy boolean array of engagement clearances, in the order of the records of 'data'.
+        """
+
+        # Determine which Submissions have a sum of the relevance scores of their title and linked article above the
+        # desired threshold. Submissions without relevance scores are not relevant.
+        relevant = (
+            self.data.column("title_relevance_score") + self.data.column("subma_relevance_score")
+        ) > self.relevance_threshold
+
+        # Determine which Submissions have already been engaged (or are excluded).
+        subm_ids = self.data.column("subm_id", dtype=object)
+        engaged = self.engaged_subm_ids.contains_many(subm_ids)
+
+        if excluded_subm_ids:
+            engaged |= pandas.Index(subm_ids, dtype=object).isin(excluded_subm_ids)
+
+
+        return relevant & ~engaged
 
 
     @staticmethod
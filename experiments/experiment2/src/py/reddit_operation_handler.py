@@ -72,6 +72,70 @@ class RedditOperationHandler:
         return submissions
 
 
+    def iter_hot_submissions(self, fetch_limit: int = None, after: str = None):
+        """
+        Returns a generator of the Submissions from the working Subreddit within the "Hot" category. Submissions are
+        yielded one at a time as the listing is fetched, which allows for the position within the listing to be
+        recorded.
+
+        :param fetch_limit: The amount of Submissions to collect.
+        :param after: The fullname (e.g. "t3_<ID>") of the Submission after which to continue the listing.
+        :return: The generator of Submission objects.
+        """
+
+        return self.working_subreddit.hot(limit=fetch_limit, params={} if after is None else {"after": after})
+
+
+    def get_submissions(self, subm_ids: (list, tuple)):
+        """
+        Returns the Submissions with the given IDs, fetching them in batches of 100.
+
+        :param subm_ids: The IDs of the Submissions.
+        :return: The list of Submission objects, in the order of 'subm_ids'. Submissions that no longer exist are
+            omitted.
+        """
+
+        # PRAW rejects an info request without fullnames.
+        if not subm_ids:
+            return []
+
+        return list(self.reddit_instance.info(["t3_" + subm_id for subm_id in subm_ids]))
+
+
+    def stream_submissions(self, fetch_limit: int = None, skip_existing: bool = False, pause_after: int = None):
+        """
+        Returns a generator of the Submissions newly created within the working Subreddit. Submissions are yielded one
+        at a time as they are created, so the collection is never held in memory in its entirety.
+
+        :param fetch_limit: The amount of Submissions to yield before the generator is exhausted. If None, the stream
+            continues indefinitely.
+        :param skip_existing: Whether or not to skip the Submissions created before the stream was opened.
+        :param pause_after: The amount of consecutive requests without new Submissions after which None is yielded
+            (see PRAW documentation). If None, the stream never yields None.
+        :return: The generator of Submission objects.
+        """
+
+        # Define the count of Submissions yielded.
+        count = 0
+
+        # Yield Submissions as they arrive from the Subreddit's Submission stream.
+        for submission in self.working_subreddit.stream.submissions(
+                skip_existing=skip_existing,
+                pause_after=pause_after
+        ):
+
+            yield submission
+
+            # Do not count pauses towards the fetch limit.
+            if submission is None:
+                continue
+
+            # End the stream once the fetch limit has been reached.
+            count += 1
+            if fetch_limit is not None and count >= fetch_limit:
+                return
+
+
     @staticmethod
     def create_comment(submission: reddit.Submission, comment_content: str):
         """
@@ -0,0 +1,216 @@
+"""
+An offline relevance engine, as an alternative to the Indico IO API's 'relevance' function. Texts and problem-topics are
+represented as hashed term vectors, and a whole batch of texts is scored against every problem-topic with a single
+sparse matrix product.
+"""
+
+import re
+import zlib
+
+import numpy
+
+
+class HashedTermVectorizer:
+    """
+    A vectorizer of texts into hashed, L2-normalized term vectors. The terms of a text are its word unigrams and
+    bigrams, so that multi-word keyphrases such as "puerto rico" contribute a feature of their own.
+    """
+
+    """ Class Fields """
+    # The pattern of a word token. Only alphabetic tokens are considered, which drops numeric IDs from URLs.
+    token_pattern = re.compile(r"[^\W\d_]+")
+
+    # Tokens that are common to every URL and carry no meaning.
+    url_tokens = frozenset(("http", "https", "www", "com", "org", "net", "html", "htm", "php", "index", "amp"))
+
+
+    """ Constructor """
+    def __init__(self, n_features: int = 2 ** 18, stop_words: (list, tuple) = ()):
+        """
+        Creates a HashedTermVectorizer.
+
+        :param n_features: The dimension of the term vectors.
+        :param stop_words: The words to ignore.
+        """
+
+        self.n_features = n_features
+        self.ignored_tokens = frozenset(stop_words) | self.url_tokens
+
+        # The cache of the feature index of each term.
+        self.feature_indices = {}
+
+
+    """ Methods """
+    def terms(self, text: str):
+        """
+        Returns the terms of a text.
+
+        :param text: The text (or URL).
+        :return: The list of unigram and bigram terms.
+        """
+
+        tokens = [token for token in self.token_pattern.findall(text.lower()) if token not in self.ignored_tokens]
+
+        return tokens + [" ".join(pair) for pair in zip(tokens, tokens[1:])]
+
+
+    def feature_index(self, term: str):
+        """
+        Returns the feature index of a term.
+
+        :param term: The term.
+        :return: The index of the term within the term vectors.
+        """
+
+        index = self.feature_indices.get(term)
+
+        if index is None:
+
+            index = zlib.crc32(term.encode("utf-8")) % self.n_features
+            self.feature_indices[term] = index
+
+
+        return index
+
+
+    def transform(self, texts: (list, tuple)):
+        """
+        Vectorizes a batch of texts into a sparse matrix in compressed-row form. Term frequencies are dampened
+        logarithmically and every row is L2-normalized.
+
+        :param texts: The texts (or URLs).
+        :return: The tuple (indices, values, offsets): row i of the matrix holds 'values[offsets[i]:offsets[i + 1]]' at
+            the columns 'indices[offsets[i]:offsets[i + 1]]'.
+        """
+
+        indices, values, offsets = [], [], [0]
+
+        for text in texts:
+
+            # Count the features of the text.
+            counts = {}
+            for term in self.terms(text):
+
+                index = self.feature_index(term)
+                counts[index] = counts.get(index, 0) + 1
+
+            indices.extend(counts.keys())
+            values.extend(counts.values())
+            offsets.append(len(indices))
+
+        indices = numpy.array(indices, dtype=numpy.int64)
+        values = 1.0 + numpy.log(numpy.array(values, dtype=numpy.float64))
+        offsets = numpy.array(offsets, dtype=numpy.int64)
+
+        # Normalize the rows.
+        norms = numpy.sqrt(self.sum_rows(values ** 2, offsets))
+        values /= numpy.repeat(numpy.where(norms > 0, norms, 1.0), numpy.diff(offsets))
+
+
+        return indices, values, offsets
+
+
+    @staticmethod
+    def sum_rows(values: numpy.ndarray, offsets: numpy.ndarray):
+        """
+        Sums the values of every row of a compressed-row matrix (empty rows sum to zero).
+
+        :return: The array of row sums.
+        """
+
+        sums = numpy.zeros((len(offsets) - 1,) + values.shape[1:], dtype=numpy.float64)
+
+        nonempty = numpy.diff(offsets) > 0
+        if values.shape[0]:
+            sums[nonempty] = numpy.add.reduceat(values, offsets[:-1][nonempty], axis=0)
+
+
+        return sums
+
+
+class LocalRelevanceEngine:
+    """
+    A relevance engine that scores texts against problem-topics by the cosine similarity of their hashed term vectors.
+
+    The vector of a problem-topic is built from its keywords, weighted by their measured relevance, and from the words of
+    its Title. The scores therefore lie within [0, 1] but are not calibrated against those of the Indico IO API, so
+    relevance thresholds must be chosen for the engine in use.
+    """
+
+    """ Constructor """
+    def __init__(self, n_features: int = 2 ** 18, stop_words: (list, tuple) = ()):
+        """
+        Creates a LocalRelevanceEngine without problem-topics.
+
+        :param n_features: The dimension of the term vectors.
+        :param stop_words: The words to ignore.
+        """
+
+        self.vectorizer = HashedTermVectorizer(n_features=n_features, stop_words=stop_words)
+
+        # The dense, L2-normalized term vector of each query (problem-topic Title).
+        self.query_vectors = {}
+
+
+    """ Methods """
+    def add_topic(self, title: str, keywords: dict):
+        """
+        Registers a problem-topic, which is then scored against when its Title is used as a query.
+
+        :param title: The Title of the problem-topic.
+        :param keywords: The keywords of the problem-topic and their measured relevance.
+        """
+
+        vector = numpy.zeros(self.vectorizer.n_features)
+
+        # Add the weighted terms of the keywords and the terms of the Title.
+        for text, weight in list(keywords.items()) + [(title, 1.0)]:
+
+            for term in self.vectorizer.terms(text):
+                vector[self.vectorizer.feature_index(term)] += float(weight)
+
+        norm = numpy.linalg.norm(vector)
+        self.query_vectors[title] = vector / norm if norm > 0 else vector
+
+
+    def query_matrix(self, queries: (list, tuple)):
+        """
+        Returns the dense matrix of the term vectors of a collection of queries. Queries that are not the Title of a
+        registered problem-topic are vectorized from their own words.
+
+        :param queries: The queries.
+        :return: The matrix of shape (n_features, len(queries)).
+        """
+
+        columns = []
+
+        for query in queries:
+
+            if query not in self.query_vectors:
+                self.add_topic(query, {})
+
+            columns.append(self.query_vectors[query])
+
+
+        return numpy.stack(columns, axis=1)
+
+
+    def relevance(self, texts: (list, tuple), queries: (list, tuple)):
+        """
+        Scores a batch of texts against a collection of queries. The results have the structure of those of the Indico
+        IO API's 'relevance' function.
+
+        :param texts: The texts (or URLs) to score.
+        :param queries: The queries (problem-topic Titles) to score every text against.
+        :return: The list of relevance measures, in the order of 'texts'. Each measure is the list of relevance scores
+            of the text for every query.
+        """
+
+        # Vectorize the texts.
+        indices, values, offsets = self.vectorizer.transform(texts)
+
+        # Compute the cosine similarity of every text and query as a sparse matrix product.
+        scores = self.vectorizer.sum_rows(values[:, None] * self.query_matrix(queries)[indices], offsets)
+
+
+        return scores.tolist()
@@ -0,0 +1,275 @@
+"""
+The script for operation of a RedditAgent batch process sharded across several processes, so that the process is not
+bound to a single CPU core. The "Hot" Submissions of the work Subreddits are fetched once by the runner and assigned to
+the shards by the hash of their ID (see SubmissionClaims); every shard is a RedditAgent in its own process which fetches
+its Submissions by ID and analyzes only them. The shards share:
+    - The claims of Submissions, so no Submission is analyzed or engaged by more than one shard.
+    - The posting rate limiter, so the shards together observe the posting interval of the Reddit account.
+    - The store of engaged Submission IDs (see EngagedSubmissionStore).
+    - The cache of Indico IO results (see NLPCache).
+Once every shard has completed, their archives are merged into the archive of the process.
+
+Shards may also be run on several hosts by calling 'run_shard' on each host with the same date-time stamp and shard
+count, in which case every shard fetches the "Hot" Submissions itself, provided the coordination directory and the
+resources directory are on a shared file system; the archives are then merged with 'ShardedRunner.merge_archives'.
+"""
+
+
+# Imports
+from concurrent.futures import ProcessPoolExecutor
+
+from .analysis_record_store import AnalysisRecordStore
+from .archive_writer import read_records
+from .columnar_archive import ColumnarArchive
+from .reddit_agent import RedditAgent
+from .reddit_operation_handler import RedditOperationHandler
+from .submission_claims import SubmissionClaims
+
+import os
+import praw
+from datetime import datetime
+
+
+def run_shard(
+        reddit_params: tuple,
+        problem_topic_id: str,
+        problem_topic_title: str,
+        work_subreddits: (list, tuple),
+        shard_index: int,
+        shard_count: int,
+        coordination_dp: str,
+        op_datetime_stamp: str,
+        options: dict,
+        subm_ids: (list, tuple) = None
+):
+    """
+    Runs a shard of a sharded batch process in the calling process.
+
+    :param reddit_params: The values necessary to create access to the Reddit API (see RedditAgent).
+    :param problem_topic_id: The short ID of the problem-topic.
+    :param problem_topic_title: The Title of the problem-topic.
+    :param work_subreddits: The Subreddits from which to fetch Submissions.
+    :param shard_index: The index of the shard.
+    :param shard_count: The amount of shards of the process.
+    :param coordination_dp: The directory of the state shared by the shards.
+    :param op_datetime_stamp: The date-time stamp of the process.
+    :param options: The options of the process (see RedditAgent.start and RedditAgent.configure).
+    :param subm_ids: The IDs of the Submissions assigned to the shard. If None, the shard fetches the "Hot" Submissions
+        of the work Subreddits and analyzes those assigned to it.
+    :return: The date-time stamp of the shard, after which its archives are named.
+    """
+
+    # Define the RedditAgent of the shard.
+    agent = RedditAgent(
+        reddit_params=reddit_params,
+        problem_topic_id=problem_topic_id,
+        problem_topic_title=problem_topic_title
+    )
+
+    # Begin the batch process of the shard. The work Subreddits are fetched together as a multireddit.
+    agent.start(
+        work_subreddit="+".join(work_subreddits),
+        process_method="batch",
+        shard_index=shard_index,
+        shard_count=shard_count,
+        coordination_dp=coordination_dp,
+        op_datetime_stamp=op_datetime_stamp,
+        subm_ids=subm_ids,
+        **options
+    )
+
+
+    return agent.op_datetime_stamp
+
+
+class ShardedRunner:
+    """
+    A runner of a RedditAgent batch process over a pool of shard processes on a single host.
+    """
+
+    """ Class Fields """
+    # The amount of shards.
+    shard_count = int()
+
+    # The directory of the state shared by the shards.
+    coordination_dp = str()
+
+
+    """ Constructor """
+    def __init__(
+            self,
+            reddit_params: tuple,
+            problem_topic_id: str,
+            problem_topic_title: str,
+            shard_count: int = None,
+            coordination_dp: str = "../resources/coordination"
+    ):
+        """
+        Creates a ShardedRunner for a specified problem-topic.
+
+        :param reddit_params: The values necessary to create access to the Reddit API (see RedditAgent). Every shard
+            creates its own PRAW Reddit object from them.
+        :param problem_topic_id: The short ID of the problem-topic.
+        :param problem_topic_title: The Title of the problem-topic.
+        :param shard_count: The amount of shards. If None, one shard is run per CPU core.
+        :param coordination_dp: The directory of the state shared by the shards.
+        """
+
+        self.reddit_params = reddit_params
+        self.problem_topic_id = problem_topic_id
+        self.problem_topic_title = problem_topic_title
+        self.shard_count = shard_count or os.cpu_count() or 1
+        self.coordination_dp = coordination_dp
+
+
+    """ Methods """
+    def start(
+            self,
+            work_subreddits: (list, tuple),
+            engage: bool,
+            subm_fetch_limit: (int, None),
+            analyze_subm_articles: bool,
+            relevance_threshold: float,
+            op_datetime_stamp: str = None,
+            **options
+    ):
+        """
+        Starts the batch process in every shard and merges the archives of the shards once they have all completed.
+
+        :param work_subreddits: The Subreddits from which to fetch Submissions.
+        :param engage: The boolean indicating if the program is to create comments for Submissions.
+        :param subm_fetch_limit: The amount of Submissions to fetch from the work Subreddits. Each shard analyzes its
+            share of them.
+        :param analyze_subm_articles: The boolean indicating if the program is to analyze Submission Linked Articles.
+        :param relevance_threshold: The threshold for the magnitude of relevance between a Submission and the problem-
+            topic.
+        :param op_datetime_stamp: The date-time stamp of the process. An interrupted process is resumed by starting it
+            again with its stamp and the 'resume' option.
+        :param options: The remaining options of every shard (see RedditAgent.configure).
+        """
+
+        # Define the date-time stamp for the operation.
+        op_datetime_stamp = op_datetime_stamp or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        # Define the options of every shard.
+        options = dict(
+            options,
+            engage=engage,
+            subm_fetch_limit=subm_fetch_limit,
+            analyze_subm_articles=analyze_subm_articles,
+            relevance_threshold=relevance_threshold
+        )
+
+        # Fetch the "Hot" Submissions of the work Subreddits once, as a multireddit, and assign them to the shards.
+        reddit_op_handler = RedditOperationHandler(
+            reddit_instance=praw.Reddit(
+                client_id=self.reddit_params[0],
+                client_secret=self.reddit_params[1],
+                user_agent=self.reddit_params[2],
+                username=self.reddit_params[3],
+                password=self.reddit_params[4]
+            ),
+            subreddit="+".join(work_subreddits)
+        )
+
+        shard_subm_ids = [[] for _ in range(self.shard_count)]
+        for submission in reddit_op_handler.iter_hot_submissions(fetch_limit=subm_fetch_limit):
+
+            shard_subm_ids[SubmissionClaims.shard_of(submission.id, self.shard_count)].append(submission.id)
+
+        # Define the shards to run. A shard without Submissions (e.g. if there are fewer Submissions than shards) is not
+        # run, unless it may resume the checkpoint of an interrupted process.
+        shard_indices = [
+            shard_index for shard_index in range(self.shard_count)
+            if shard_subm_ids[shard_index] or options.get("resume", False)
+        ]
+
+        # Run the shards.
+        with ProcessPoolExecutor(max_workers=max(1, len(shard_indices))) as executor:
+
+            shards = [
+                executor.submit(
+                    run_shard,
+                    reddit_params=self.reddit_params,
+                    problem_topic_id=self.problem_topic_id,
+                    problem_topic_title=self.problem_topic_title,
+                    work_subreddits=tuple(work_subreddits),
+                    shard_index=shard_index,
+                    shard_count=self.shard_count,
+                    coordination_dp=self.coordination_dp,
+                    op_datetime_stamp=op_datetime_stamp,
+                    options=options,
+                    subm_ids=shard_subm_ids[shard_index]
+                )
+                for shard_index in shard_indices
+            ]
+
+            # Wait for every shard, raising the error of any shard that failed.
+            for shard in shards:
+                shard.result()
+
+        if options.get("record_data", True):
+
+            # Merge the archives of the shards.
+            self.merge_archives(op_datetime_stamp, archive_format=options.get("archive_format", "json"))
+
+
+    def merge_archives(self, op_datetime_stamp: str, archive_format: str = "json"):
+        """
+        Merges the archives of the shards of a process into a single archive named after the process's date-time stamp,
+        in the given format, and removes the archives of the shards in that format. The incremental archives of the
+        shards, from which the merged archive is built, are kept.
+
+        :param op_datetime_stamp: The date-time stamp of the process.
+        :param archive_format: The format of the archive (see RedditAgent.configure).
+        :return: The file-path of the merged archive.
+        """
+
+        # Define the data directory of the problem-topic.
+        data_dp = "../resources/dataframes/" + self.problem_topic_id + "/data"
+
+        # Define the date-time stamps of the shards.
+        shard_stamps = [op_datetime_stamp + "_shard-" + str(shard_index) for shard_index in range(self.shard_count)]
+
+        # Collect the final analyses of every shard.
+        data = AnalysisRecordStore()
+        for shard_stamp in shard_stamps:
+
+            data.extend(read_records(archive_dp=data_dp, name=shard_stamp))
+
+        if archive_format == "parquet":
+
+            archive = ColumnarArchive()
+
+            # Write the merged analyses to the partition of the problem-topic and the date of the process.
+            archive_fp = archive.write(
+                ptopic_id=self.problem_topic_id,
+                records=[record.to_dict(exclude=("subm_object",)) for record in data],
+                name=op_datetime_stamp,
+                date=op_datetime_stamp[:10]
+            )
+            shard_archive_fps = [
+                archive.archive_fp(self.problem_topic_id, shard_stamp, op_datetime_stamp[:10])
+                for shard_stamp in shard_stamps
+            ]
+
+        else:
+
+            # Write the merged analyses as a JSON DataFrame.
+            archive_fp = os.path.join(data_dp, op_datetime_stamp + ".json")
+            data.to_dataframe(exclude=("subm_object",)).to_json(path_or_buf=archive_fp)
+            shard_archive_fps = [os.path.join(data_dp, shard_stamp + ".json") for shard_stamp in shard_stamps]
+
+        # Remove the archives of the shards, which the merged archive supersedes.
+        for shard_archive_fp in shard_archive_fps:
+
+            try:
+                os.remove(shard_archive_fp)
+            except FileNotFoundError:
+                pass
+
+        # Output status.
+        print("Merged the archives of ", self.shard_count, " shards (", len(data), " analyses) into '", archive_fp, "'.")
+
+
+        return archive_fp
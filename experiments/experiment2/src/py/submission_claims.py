@@ -0,0 +1,92 @@
+"""
+The claims of Reddit Submissions by the shards of a sharded process. Every Submission ID is assigned to a single shard
+by its hash, and a shard must claim a Submission before analyzing it, so no Submission is analyzed (and thus engaged) by
+more than one shard. Claims are files within a directory that may be shared by processes on several hosts.
+"""
+
+import os
+import zlib
+
+
+class SubmissionClaims:
+    """
+    A directory of Submission claims. A claim is created atomically (with O_CREAT | O_EXCL), so exactly one claimant
+    succeeds for each Submission; the claim holds the name of its owner, so an owner that is restarted (e.g. to resume an
+    interrupted process) retains its claims.
+    """
+
+    """ Constructor """
+    def __init__(self, claims_dp: str, owner: str, shard_index: int = 0, shard_count: int = 1):
+        """
+        Opens the claims at the given directory, creating the directory if it does not exist.
+
+        :param claims_dp: The directory of the claims.
+        :param owner: The name of the claimant (e.g. "shard-0").
+        :param shard_index: The index of the claimant's shard.
+        :param shard_count: The amount of shards. Submissions are assigned to shards by the CRC-32 of their ID.
+        """
+
+        if not 0 <= shard_index < shard_count:
+            raise ValueError("Invalid shard " + str(shard_index) + " of " + str(shard_count) + ".")
+
+        self.claims_dp = claims_dp
+        self.owner = owner
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+        os.makedirs(claims_dp, exist_ok=True)
+
+
+    """ Methods """
+    @staticmethod
+    def shard_of(subm_id: str, shard_count: int):
+        """
+        Returns the shard a Submission is assigned to. The assignment is stable between processes and hosts.
+
+        :param subm_id: The ID of the Submission.
+        :param shard_count: The amount of shards.
+        :return: The index of the shard.
+        """
+
+        return zlib.crc32(subm_id.encode("utf-8")) % shard_count
+
+
+    def claim(self, subm_id: str):
+        """
+        Claims a Submission, if it is assigned to the claimant's shard and it has not been claimed by another claimant.
+
+        :param subm_id: The ID of the Submission.
+        :return: The boolean indicating if the Submission is claimed by the claimant.
+        """
+
+        if self.shard_of(subm_id, self.shard_count) != self.shard_index:
+            return False
+
+        claim_fp = os.path.join(self.claims_dp, subm_id)
+
+        try:
+
+            descriptor = os.open(claim_fp, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+
+        except FileExistsError:
+
+            # The Submission is claimed; determine by whom.
+            with open(claim_fp, "r") as file:
+                return file.read() == self.owner
+
+        with os.fdopen(descriptor, "w") as file:
+            file.write(self.owner)
+
+
+        return True
+
+
+    def claim_many(self, subm_ids: (list, tuple)):
+        """
+        Claims a collection of Submissions.
+
+        :param subm_ids: The IDs of the Submissions.
+        :return: The list of booleans indicating, for each ID, if the Submission is claimed by the claimant.
+        """
+
+        return [self.claim(subm_id) for subm_id in subm_ids]
@@ -0,0 +1,159 @@
+"""
+A selector of the utterances most similar to Reddit Submission Titles. The term vectors of the utterances are computed
+once, and the utterances for a whole batch of Titles are selected with a single sparse matrix product.
+"""
+
+from collections import deque
+
+from .relevance_engine import HashedTermVectorizer
+
+import numpy
+import random
+
+
+class UtteranceSelector:
+    """
+    A selector of utterances by the cosine similarity of their hashed term vectors to those of given texts.
+    """
+
+    """ Class Fields """
+    # The amount of the most recently selected utterances that are not selected again.
+    recent_exclusion = 0
+
+
+    """ Constructor """
+    def __init__(self, utterances: (list, tuple), stop_words: (list, tuple) = (), recent_exclusion: int = 0):
+        """
+        Creates an UtteranceSelector, vectorizing the utterances.
+
+        :param utterances: The utterances to select from.
+        :param stop_words: The words to ignore.
+        :param recent_exclusion: The amount of the most recently selected utterances that are not selected again.
+        """
+
+        self.utterances = tuple(utterances)
+        self.recent_exclusion = recent_exclusion
+
+        # The indices of the most recently selected utterances, most recent last.
+        self.recent = deque()
+
+        self.vectorizer = HashedTermVectorizer(stop_words=stop_words)
+
+        # Vectorize the utterances.
+        indices, values, offsets = self.vectorizer.transform(self.utterances)
+
+        # Index the utterance matrix by feature (compressed-column form) over the features that occur in the utterances,
+        # so that the product only visits the utterances that share a feature with a text.
+        self.features, columns = numpy.unique(indices, return_inverse=True)
+        rows = numpy.repeat(numpy.arange(len(self.utterances)), numpy.diff(offsets))
+
+        order = numpy.argsort(columns, kind="stable")
+        self.posting_rows = rows[order]
+        self.posting_values = values[order]
+        self.posting_offsets = numpy.concatenate(([0], numpy.cumsum(numpy.bincount(columns, minlength=len(self.features)))))
+
+
+    """ Methods """
+    def similarities(self, texts: (list, tuple)):
+        """
+        Computes the cosine similarity of every text to every utterance.
+
+        :param texts: The texts.
+        :return: The matrix of shape (len(texts), len(utterances)).
+        """
+
+        # Vectorize the texts.
+        indices, values, offsets = self.vectorizer.transform(texts)
+        text_rows = numpy.repeat(numpy.arange(len(texts)), numpy.diff(offsets))
+
+        # Keep the features of the texts that occur in the utterances.
+        positions = numpy.searchsorted(self.features, indices)
+        positions[positions == len(self.features)] = 0
+        shared = self.features[positions] == indices if len(self.features) else numpy.zeros(len(indices), dtype=bool)
+
+        positions, values, text_rows = positions[shared], values[shared], text_rows[shared]
+
+        # Expand every feature of a text into the postings of the utterances that contain it.
+        starts = self.posting_offsets[positions]
+        lengths = self.posting_offsets[positions + 1] - starts
+        postings = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(lengths.sum())
+
+        # Accumulate the products of the shared features.
+        cells = numpy.repeat(text_rows, lengths) * len(self.utterances) + self.posting_rows[postings]
+        products = numpy.repeat(values, lengths) * self.posting_values[postings]
+
+
+        return numpy.bincount(cells, weights=products, minlength=len(texts) * len(self.utterances)).reshape(
+            len(texts), len(self.utterances)
+        )
+
+
+    def select_many(self, texts: (list, tuple)):
+        """
+        Selects the most similar utterance for each of a batch of texts. The most recently selected utterances are
+        skipped, and a text without any similar utterance is given a random choice.
+
+        :param texts: The texts.
+        :return: The list of selected utterances, in the order of 'texts'.
+        """
+
+        if not texts:
+            return []
+
+        scores = self.similarities(texts)
+
+        # Define the amount of candidates per text, enough to always include an utterance that is not excluded.
+        k = min(len(self.utterances), self.recent_exclusion + 1)
+
+        # Define the candidates of every text, most similar first.
+        candidates = numpy.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidates = numpy.take_along_axis(
+            candidates, numpy.argsort(-numpy.take_along_axis(scores, candidates, axis=1), axis=1), axis=1
+        )
+
+        selections = []
+
+        for row, row_candidates in enumerate(candidates):
+
+            excluded = set(self.recent)
+
+            if scores[row, row_candidates[0]] > 0:
+
+                # Select the most similar utterance that is not excluded.
+                choice = next(int(index) for index in row_candidates if index not in excluded)
+
+            else:
+
+                # Select a random utterance that is not excluded.
+                choice = random.choice([index for index in range(len(self.utterances)) if index not in excluded])
+
+            selections.append(self.utterances[choice])
+            self.remember(choice)
+
+
+        return selections
+
+
+    def select(self, text: str):
+        """
+        Selects the most similar utterance for a text.
+
+        :param text: The text.
+        :return: The selected utterance.
+        """
+
+        return self.select_many([text])[0]
+
+
+    def remember(self, index: int):
+        """
+        Records the selection of an utterance, forgetting the selections beyond 'recent_exclusion'. At least one
+        utterance is always left selectable.
+
+        :param index: The index of the selected utterance.
+        """
+
+        self.recent.append(index)
+
+        while len(self.recent) > min(self.recent_exclusion, len(self.utterances) - 1):
+            self.recent.popleft()
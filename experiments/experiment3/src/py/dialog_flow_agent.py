@@ -8,13 +8,19 @@ The script for the Reddit Agent that implements DialogFlow.
 
 
 """ Imports """
+from concurrent.futures import ThreadPoolExecutor
 from google.api_core.exceptions import InvalidArgument
 from praw.exceptions import APIException
-import dialogflow
+from praw.models import MoreComments
 import praw
 import time
 import google
 
+from .dialogflow_session import DialogFlowSession
+from .persistent_id_set import PersistentIDSet
+from .reply_poster import ReplyPoster
+from .response_cache import ResponseCache
+
 
 class DialogFlowAgent:
     """
@@ -29,6 +35,12 @@ class DialogFlowAgent:
             gcp_project_id: str,
             gcp_session_id: str = "dialogflow_reddit_moderation_agent",
             gcp_language_code: str = "en",
+            comment_poll_limit: int = 100,
+            full_fetch_interval: float = 3600,
+            response_cache_capacity: int = 10000,
+            reddit_instance: praw.Reddit = None,
+            dialogflow_session: DialogFlowSession = None,
+            response_cache: ResponseCache = None
     ):
         """
         Initializes a new DialogFlowAgent to conduct operations on the provided Submission.
@@ -44,10 +56,20 @@ class DialogFlowAgent:
         :param gcp_project_id: The Project ID, respective to the project on the Google Cloud Platform.
         :param gcp_session_id: Provides a description for the current session.
         :param gcp_language_code: The code indicating which language the DialogFlow agent is expected to interpret.
+        :param comment_poll_limit: The amount of the newest Comments fetched when polling for new Comments (see
+            'fetch_new_comments').
+        :param full_fetch_interval: The amount of seconds after which a poll fetches the entire Comment forest again, to
+            collect the new Comments that are not among the newest Comments (e.g. replies to older Comments).
+        :param response_cache_capacity: The maximum amount of responses kept in the response cache.
+        :param reddit_instance: The PRAW Reddit object to use, e.g. one shared by several Agents. If None, one is created
+            from 'reddit_parameters'.
+        :param dialogflow_session: The DialogFlow session to use, e.g. one shared by several Agents. If None, one is
+            created from the GCP parameters.
+        :param response_cache: The response cache to use, e.g. one shared by several Agents. If None, one is created.
         """
 
         # Define the Reddit instance with the specified parameters.
-        self.reddit_instance = praw.Reddit(
+        self.reddit_instance = reddit_instance if reddit_instance is not None else praw.Reddit(
             client_id=reddit_parameters[0],
             client_secret=reddit_parameters[1],
             user_agent=reddit_parameters[2],
@@ -62,33 +84,50 @@ class DialogFlowAgent:
         self.gcp_project_id = gcp_project_id
         self.gcp_session_id = gcp_session_id
         self.gcp_language_code = gcp_language_code
-        self.gcp_session_client = dialogflow.SessionsClient()
-        self.gcp_session = self.gcp_session_client.session_path(self.gcp_project_id, self.gcp_session_id)
 
+        # Define the DialogFlow session, whose Sessions Client is kept for the lifetime of the Agent.
+        self.dialogflow_session = dialogflow_session if dialogflow_session is not None else DialogFlowSession(
+            gcp_project_id=gcp_project_id,
+            gcp_session_id=gcp_session_id,
+            gcp_language_code=gcp_language_code
+        )
 
-    """ Methods """
-    def define_gcp_parameters(self):
-        """
-        Redefines the GCP parameters (necessary due to an error caused by the GCP remote).
-        """
+        # Define the amount of the newest Comments fetched by a poll.
+        self.comment_poll_limit = comment_poll_limit
+
+        # Define the interval between two fetches of the entire Comment forest.
+        self.full_fetch_interval = full_fetch_interval
 
-        # # Define Google Cloud Platform (GCP) Parameters.
-        # self.gcp_project_id = self.gcp_project_id
-        #
-        # # Session ID.
-        # self.gcp_session_id = self.gcp_session_id
-        #
-        # # Language code.
-        # self.gcp_language_code = self.gcp_language_code
+        # The time of the last fetch of the entire Comment forest. None until the forest has been fetched.
+        self.last_full_fetch = None
 
+        # Define the set of the IDs of the Comments that have been fetched.
+        self.fetched_comment_ids = set()
 
-        # Define the Sessions Client.
-        self.gcp_session_client = dialogflow.SessionsClient()
+        # Define the persistent set of the IDs of the Comments that have been engaged.
+        self.engaged_comment_ids = PersistentIDSet(
+            store_fp="../resources/dialogflow/" + submission_id + "/engaged_comment_ids.csv"
+        )
+
+        # Define the persistent set of the hashes of the responses that have been used (see PersistentIDSet.hash_text).
+        self.used_response_hashes = PersistentIDSet(
+            store_fp="../resources/dialogflow/" + submission_id + "/used_response_hashes.csv"
+        )
 
-        # Define the GCP Session.
-        self.gcp_session = self.gcp_session_client.session_path(self.gcp_project_id, self.gcp_session_id)
+        # Define the set of the hashes of the responses that are queued for posting.
+        self.queued_response_hashes = set()
+
+        # The poster of the generated responses, defined by 'run'.
+        self.reply_poster = None
+
+        # Define the cache of the responses to Comment texts and their near-duplicates, shared by every Submission.
+        self.response_cache = response_cache if response_cache is not None else ResponseCache(
+            capacity=response_cache_capacity,
+            cache_fp="../resources/dialogflow/response_cache.json"
+        )
 
 
+    """ Methods """
     def print_subm_comments(self):
         """
         Prints the content of the Comments of the working Submission.
@@ -104,209 +143,353 @@ class DialogFlowAgent:
             print(comment.body, "\n", '=' * 30, "\n")
 
 
-    def run(self, process_time_limit: int = 0, engage=False):
+    def fetch_new_comments(self):
+        """
+        Fetches the Comments of the working Submission that have not been fetched before. The first fetch retrieves the
+        entire Comment forest; subsequent fetches retrieve the 'comment_poll_limit' newest Comments and the unfetched
+        Comments behind the "load more comments" links among them. A reply to an older Comment need not be among the
+        newest Comments, nor is a Comment behind a "continue this thread" link, so the entire forest is fetched again
+        every 'full_fetch_interval' seconds; Comments are identified by ID, so those created before the last fetch are
+        still collected.
+
+        :return: The list of new Comment objects, in order of creation.
+        """
+
+        if self.last_full_fetch is not None and time.time() - self.last_full_fetch < self.full_fetch_interval:
+
+            # Fetch the newest Comments of the Submission.
+            submission = self.reddit_instance.submission(id=self.submission.id)
+            submission.comment_sort = "new"
+            submission.comment_limit = self.comment_poll_limit
+
+            newest_comments = submission.comments.list()
+            comments = [comment for comment in newest_comments if not isinstance(comment, MoreComments)]
+
+            # Fetch the unfetched Comments behind the "load more comments" links, in batches of 100.
+            unfetched_ids = [
+                "t1_" + comment_id
+                for more_comments in newest_comments if isinstance(more_comments, MoreComments)
+                for comment_id in more_comments.children if comment_id not in self.fetched_comment_ids
+            ]
+
+            if unfetched_ids:
+                comments.extend(self.reddit_instance.info(unfetched_ids))
+
+        else:
+
+            # Fetch the entire Comment forest of the Submission, expanding every link to further Comments.
+            submission = self.reddit_instance.submission(id=self.submission.id)
+            submission.comments.replace_more(limit=None)
+            comments = submission.comments.list()
+
+            self.last_full_fetch = time.time()
+
+        # Omit the Comments that have already been fetched.
+        comments = [comment for comment in comments if comment.id not in self.fetched_comment_ids]
+        self.fetched_comment_ids.update(comment.id for comment in comments)
+
+        comments.sort(key=lambda comment: comment.created_utc)
+
+
+        return comments
+
+
+    def run(
+            self,
+            process_time_limit: int = 0,
+            engage=False,
+            poll_interval: float = 600,
+            response_workers: int = 8,
+            reply_interval: float = 600
+    ):
         """
         The main process. The program monitors the working Submission, first generating a response (Comment) to any of
         the existing Submission's Comments that merit a response.
 
+        The responses to the new Comments of every loop are generated concurrently and queued for posting; a
+        ReplyPoster posts them in the background at a limited rate, so the generation of responses never waits on the
+        posting cadence.
+
         :param process_time_limit: The limit time for the mainloop (in seconds).
         :param engage: Boolean controller for whether or not to submit generated replies to Comments.
+        :param poll_interval: The amount of seconds between two polls of the working Submission's Comments.
+        :param response_workers: The amount of worker threads used to generate responses concurrently.
+        :param reply_interval: The minimum amount of seconds between two replies posted by the Agent.
         :return: 0 indicating a process exit.
         """
 
-        # Define the list of all Comments that have been engaged.
-        engaged_comments = []
-
-        # Define the list of the responses that have been generated.
-        comment_responses = []
-
         # Define the process time limit.
         time_limit = time.time() + process_time_limit
 
         # Define counter for mainloop iterations.
         mainloop_iterations = 0
 
-        # Run the process until 'process_time_limit' is exceeded.
-        while time.time() <= time_limit:
+        # Define the poster of the generated responses.
+        self.reply_poster = ReplyPoster(min_interval=reply_interval)
 
-            # Process a short sleep to avoid CPU hog.
-            time.sleep(1)
+        # Define the executor for the generation of responses. DialogFlow requests are dominated by network wait, so
+        # they are performed concurrently through the shared Sessions Client.
+        executor = ThreadPoolExecutor(max_workers=max(1, response_workers))
 
-            # Define list of all Comment objects of the specified Submission.
-            self.submission.comments.replace_more(limit=0)
-            submission_comments = self.submission.comments.list()
+        try:
 
-            # Consider every Comment for a response.
-            for comment in submission_comments:
+            # Run the process until 'process_time_limit' is exceeded.
+            while time.time() <= time_limit:
 
-                # Define reference to the Comment context (body).
-                comment_content = comment.body
+                # Process a short sleep to avoid CPU hog.
+                time.sleep(1)
 
-                try:
+                # Poll the Submission and respond to its new Comments.
+                self.poll(engage, executor)
 
-                    # TODO: Determine an appropriate value.
-                    # Ignore Comment is the context length is less than 5 (three words).
-                    if len(comment_content.split()) < 5:
+                # Output status.
+                print(
+                    "Finished loop: ", mainloop_iterations, "\nQueued replies: ", self.reply_poster.pending(),
+                    "\nBeginning process stall for ", poll_interval, " seconds.\n", "=" * 20, "\n\n"
+                )
 
-                        print(
-                            "Encountered Comment of insufficient context length. Adding Comment to 'engaged_comments' "
-                            "and continuing process.\n", "-" * 20
-                        )
+                # Increment mainloop iterations record.
+                mainloop_iterations += 1
 
-                        # Add Comment object to 'engaged_comments'.
-                        engaged_comments.append(comment)
-                        continue
+                # Stall process.
+                time.sleep(poll_interval)
 
-                    # Ignore Comment if it has already been processed.
-                    elif comment in engaged_comments:
+            # Output status.
+            print("\n", "Reached time-limit; completed process.")
 
-                        print("Encountered Comment which has already been processed. Continuing process.\n", "-" * 20)
-                        continue
+        # Catch a KeyboardInterrupt; this is likely to be the most common way to end the process.
+        except KeyboardInterrupt:
 
-                    # Generate a response to the comment with the DialogFlow API.
-                    else:
+            # Output status.
+            print("Finished loop: ", mainloop_iterations)
+            print("Encountered keyboard interrupt; terminating process.")
 
-                        # Respond to the Comment.
-                        self.respond(comment, comment_content, comment_responses, engage, engaged_comments)
+            # End process.
+            return 0
 
-                        # Stall process.
-                        time.sleep(600)
+        finally:
 
-                # Catch exception for invalid input to the GCP API.
-                except google.api_core.exceptions.InvalidArgument:
+            executor.shutdown(wait=False)
 
-                    # Output status.
-                    print(
-                        "Encountered invalid GCP API argument. Comment context length is likely too large.",
-                        "Adding Comment to 'engaged_comments' and continuing process.\n", "-" * 20
-                    )
+            # Stop posting. The Comments of the discarded replies are not recorded as engaged, so they are responded to
+            # again by a restarted Agent.
+            print("Discarded ", self.reply_poster.stop(), " queued replies.")
+            self.queued_response_hashes.clear()
 
-                    # Archive Comment object to 'engaged_comments'.
-                    engaged_comments.append(comment)
+            # Save the response cache.
+            self.response_cache.save()
 
-                    continue
+            # Output status.
+            print("Response cache usage: ", self.response_cache.stats())
 
-                # Catch Reddit API server-side error.
-                except praw.exceptions.APIException:
 
-                    # Output status.
-                    print(
-                        "Encountered Reddit Comment creation limit. Adding Comment to 'engaged_comments' and "
-                        "continuing process.\n", "-" * 20
-                    )
+    def poll(self, engage: bool, executor: ThreadPoolExecutor):
+        """
+        Fetches the new Comments of the working Submission, generates responses to those that merit a response and
+        queues the responses for posting through 'reply_poster'.
 
-                    # Archive Comment object to 'engaged_comments'.
-                    engaged_comments.append(comment)
+        :param engage: Boolean controller for whether or not to submit generated replies to Comments.
+        :param executor: The executor through which responses are generated concurrently.
+        :return: The list of the new Comments.
+        """
 
-                    continue
+        # Define the list of the Comment objects of the specified Submission that are new since the last poll.
+        submission_comments = self.fetch_new_comments()
 
-                # Catch a KeyboardInterrupt; this is likely to be the most common way to end the process.
-                except KeyboardInterrupt:
+        # Define the list of the new Comments that merit a response.
+        responded_comments = []
 
-                    # Output status.
-                    print("Finished loop: ", mainloop_iterations)
-                    print("Encountered keyboard interrupt; terminating process.")
+        # Define the list of the IDs of the new Comments that are too short to merit a response.
+        short_comment_ids = []
+
+        for comment in submission_comments:
+
+            # TODO: Determine an appropriate value.
+            # Ignore Comment is the context length is less than 5 (three words).
+            if len(comment.body.split()) < 5:
+
+                print(
+                    "Encountered Comment of insufficient context length. Adding Comment to 'engaged_comment_ids' and "
+                    "continuing process.\n", "-" * 20
+                )
+
+                # Add the Comment's ID to 'short_comment_ids'.
+                short_comment_ids.append(comment.id)
+
+            # Ignore Comment if it has already been processed.
+            elif comment.id in self.engaged_comment_ids:
+
+                print("Encountered Comment which has already been processed. Continuing process.\n", "-" * 20)
+
+            else:
+
+                responded_comments.append(comment)
+
+        # Archive the IDs of the short Comments to 'engaged_comment_ids' in a single append.
+        self.engaged_comment_ids.add_many(short_comment_ids)
+
+        # Generate the responses to the Comments concurrently with the DialogFlow API. The first Comment of every
+        # distinct text is answered first, so that its repetitions are answered from the response cache rather than by
+        # concurrent requests.
+        distinct_comments = list({
+            ResponseCache.normalize(comment.body): comment for comment in reversed(responded_comments)
+        }.values())
+        comment_responses = dict(zip(
+            [comment.id for comment in distinct_comments],
+            executor.map(self.try_generate_response, distinct_comments)
+        ))
+        comment_responses.update(zip(
+            [comment.id for comment in responded_comments if comment.id not in comment_responses],
+            executor.map(
+                self.try_generate_response,
+                [comment for comment in responded_comments if comment.id not in comment_responses]
+            )
+        ))
+
+        # Queue the responses for posting, in the order of the Comments.
+        for comment in responded_comments:
+
+            comment_response = comment_responses[comment.id]
 
-                    # End process.
-                    return 0
+            if comment_response is not None:
 
-                finally:
+                # Respond to the Comment.
+                self.respond(comment, comment_response, engage)
 
-                    # Redefine the GCP parameters.
-                    self.define_gcp_parameters()
+
+        return submission_comments
+
+
+    def try_generate_response(self, comment):
+        """
+        Generates a response to a Comment, recording the Comment as engaged if DialogFlow rejects it.
+
+        :param comment: The working Submission's Comment.
+        :return: The generated response, or None if DialogFlow rejected the Comment.
+        """
+
+        try:
+
+            return self.generate_dialogflow_response(comment.body)
+
+        # Catch exception for invalid input to the GCP API.
+        except google.api_core.exceptions.InvalidArgument:
 
             # Output status.
             print(
-                "Finished loop: ", mainloop_iterations, "\nBeginning process stall for 5 minutes.\n", "=" * 20, "\n\n"
+                "Encountered invalid GCP API argument. Comment context length is likely too large.",
+                "Adding Comment to 'engaged_comment_ids' and continuing process.\n", "-" * 20
             )
 
-            # Increment mainloop iterations record.
-            mainloop_iterations += 1
-
-            # Stall process.
-            time.sleep(600)
+            # Archive the Comment's ID to 'engaged_comment_ids'.
+            self.engaged_comment_ids.add(comment.id)
 
-        # Output status.
-        print("\n", "Reached time-limit; completed process.")
+            return None
 
 
-    def respond(
-            self, comment, comment_content: str, comment_responses: list, engage: bool, engaged_comments: list
-    ):
+    def respond(self, comment, comment_response: str, engage: bool):
         """
-        Generates a response to a Comment if the generated response has not already been used and submits it to Reddit
-        if desired.
+        Queues a response to a Comment for posting if the response has not already been used or queued. The Comment is
+        recorded in 'engaged_comment_ids' and the response in 'used_response_hashes' once the response is posted. If the
+        response could not be posted for a reason other than a rejection by the Reddit API, the Comment is fetched and
+        responded to again by a later poll.
 
         :param comment: The working Submission's Comment.
-        :param comment_content: The body of the Comment.
-        :param comment_responses: The collection of responses that have previously been used.
+        :param comment_response: The response generated for the Comment.
         :param engage: The boolean indicating whether or not to submit the generated response.
-        :param engaged_comments: The collection of Comments of the working Submission that have previously been engaged.
         """
 
-        # Generate response to the comment.
-        comment_response = self.generate_dialogflow_response(comment_content)
+        comment_response_hash = PersistentIDSet.hash_text(comment_response)
 
         # Create a response for the comment if the generated response has not already been used.
-        if comment_response not in comment_responses:
+        if comment_response_hash not in self.used_response_hashes \
+                and comment_response_hash not in self.queued_response_hashes:
 
-            # Create a response to the Comment with a body generated by the DialogFlow API.
-            if engage:
-                comment.reply(comment_response)
+            self.queued_response_hashes.add(comment_response_hash)
 
-            # Archive comment to 'engaged_comments'.
-            engaged_comments.append(comment)
+            def post():
 
-            # Archive generated response to 'comment_responses'.
-            comment_responses.append(comment_response)
+                # Create a response to the Comment with a body generated by the DialogFlow API.
+                if engage:
+                    comment.reply(comment_response)
 
-            # Stall process continuation in order to account for Reddit Comment creation rules and to
-            # ensure desirable perception of the Agent on Reddit.
-            print(
-                "Responded to Comment: \n",
-                comment_content, "\n",
-                "With: \n",
-                comment_response, "\n"
-                "\n",
-                "Beginning process stall for 5 minutes.",
-                "\n",
-                "-" * 20,
-            )
+            # Record the posted response.
+            def on_posted():
+
+                # Archive the Comment's ID to 'engaged_comment_ids'.
+                self.engaged_comment_ids.add(comment.id)
+
+                # Archive the hash of the generated response to 'used_response_hashes'.
+                self.used_response_hashes.add(comment_response_hash)
+                self.queued_response_hashes.discard(comment_response_hash)
+
+                # Output status.
+                print(
+                    "Responded to Comment: \n",
+                    comment.body, "\n",
+                    "With: \n",
+                    comment_response, "\n",
+                    "-" * 20,
+                )
+
+            # Catch a failure to post the response.
+            def on_failed(e: Exception):
+
+                # Release the response, which was not used.
+                self.queued_response_hashes.discard(comment_response_hash)
+
+                # Catch Reddit API server-side error.
+                if isinstance(e, APIException):
+
+                    # Output status.
+                    print(
+                        "Encountered Reddit Comment creation limit. Adding Comment to 'engaged_comment_ids' and "
+                        "continuing process.\n", "-" * 20
+                    )
+
+                    # Archive the Comment's ID to 'engaged_comment_ids'.
+                    self.engaged_comment_ids.add(comment.id)
+
+                else:
+
+                    # Output status.
+                    print("Caught error while responding to Comment ", comment.id, ": ", e, "\n", "-" * 20)
+
+                    # Forget the Comment, so that it is fetched and responded to again by a later poll.
+                    self.fetched_comment_ids.discard(comment.id)
+
+            # Queue the response.
+            self.reply_poster.submit(post, on_posted=on_posted, on_failed=on_failed)
 
         # Currently ignoring COMMENT if a RESPONSE is received that has already been used.
         else:
 
             # Output status: account for prevention of repeated response.
-            print(
-                "Received repeated Comment response. Continuing without action. \n",
-                "Beginning process stall for 5 minutes.", "\n", "-" * 20
-            )
+            print("Received repeated Comment response. Continuing without action. \n", "-" * 20)
 
-            # Archive comment to 'engaged_comments'.
-            engaged_comments.append(comment)
+            # Archive the Comment's ID to 'engaged_comment_ids'.
+            self.engaged_comment_ids.add(comment.id)
 
 
     def generate_dialogflow_response(self, text):
         """
-        Generates an appropriate response to a provided body of text using DialogFlow.
+        Generates an appropriate response to a provided body of text using DialogFlow. Texts that are identical or
+        nearly identical to a text that has already been answered are answered from the response cache.
 
         :return: The generated response.
         """
 
-        # Define the text input container for DialogFlow.
-        text_input = dialogflow.types.TextInput(
-            text=text,
-            language_code=self.gcp_language_code
-        )
+        # Answer the text from the cache, if possible.
+        cached_response, signature = self.response_cache.lookup(text)
 
-        # Define the DialogFlow text input query.
-        query_input = dialogflow.types.QueryInput(text=text_input)
+        if cached_response is not None:
+            return cached_response
 
         # Define a reference to the DialogFlow-generated response.
-        response = self.gcp_session_client.detect_intent(
-            session=self.gcp_session,
-            query_input=query_input
-        )
+        response = self.dialogflow_session.detect_intent(text)
+
+        # Cache the response.
+        self.response_cache.put(text, response.query_result.fulfillment_text, signature=signature)
 
         # Return the response.
         return response.query_result.fulfillment_text
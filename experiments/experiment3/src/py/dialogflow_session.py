@@ -0,0 +1,132 @@
+"""
+A long-lived DialogFlow session. The Sessions Client (and its gRPC channel, credentials and TLS connection) is created
+once and reused for every request; it is only recreated, after an exponential backoff, when a request fails with an
+error that indicates a broken connection.
+"""
+
+
+""" Imports """
+import random
+import threading
+import time
+
+import dialogflow
+import google.api_core.exceptions as google_exceptions
+
+
+# The errors of a request after which the Sessions Client is recreated. Other errors (e.g. an invalid argument) are
+# raised to the caller.
+RECONNECT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.Unauthenticated
+)
+
+
+class DialogFlowSession:
+    """
+    A DialogFlow session backed by a single Sessions Client, which may be shared by several threads.
+    """
+
+    """ Constructor """
+    def __init__(
+            self,
+            gcp_project_id: str,
+            gcp_session_id: str,
+            gcp_language_code: str = "en",
+            max_retries: int = 3,
+            backoff_base: float = 1.0,
+            backoff_max: float = 60.0
+    ):
+        """
+        Creates a DialogFlowSession and its Sessions Client.
+
+        :param gcp_project_id: The Project ID, respective to the project on the Google Cloud Platform.
+        :param gcp_session_id: Provides a description for the session.
+        :param gcp_language_code: The code indicating which language the DialogFlow agent is expected to interpret.
+        :param max_retries: The amount of times a request is retried after an error in RECONNECT_ERRORS.
+        :param backoff_base: The delay before the first retry, in seconds. The delay doubles with every retry.
+        :param backoff_max: The maximum delay before a retry, in seconds.
+        """
+
+        self.gcp_project_id = gcp_project_id
+        self.gcp_session_id = gcp_session_id
+        self.gcp_language_code = gcp_language_code
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # The lock that serializes the recreation of the Sessions Client.
+        self.lock = threading.Lock()
+
+        # The amount of times the Sessions Client has been created, which identifies the current client so that threads
+        # that fail on the same client recreate it only once.
+        self.generation = 0
+
+        # The Sessions Client and the GCP Session path.
+        self.gcp_session_client = None
+        self.gcp_session = str()
+
+        self.connect()
+
+
+    """ Methods """
+    def connect(self, failed_generation: int = None):
+        """
+        Creates the Sessions Client, unless it has already been recreated since the given generation failed.
+
+        :param failed_generation: The generation of the client on which a request failed. If None, the client is
+            created unconditionally.
+        """
+
+        with self.lock:
+
+            if failed_generation is not None and failed_generation != self.generation:
+                return
+
+            # Define the Sessions Client.
+            self.gcp_session_client = dialogflow.SessionsClient()
+
+            # Define the GCP Session.
+            self.gcp_session = self.gcp_session_client.session_path(self.gcp_project_id, self.gcp_session_id)
+
+            self.generation += 1
+
+
+    def detect_intent(self, text: str):
+        """
+        Detects the intent of a text, retrying with a new Sessions Client after an error in RECONNECT_ERRORS.
+
+        :param text: The text.
+        :return: The DialogFlow response.
+        """
+
+        # Define the DialogFlow text input query.
+        query_input = dialogflow.types.QueryInput(
+            text=dialogflow.types.TextInput(text=text, language_code=self.gcp_language_code)
+        )
+
+        attempt = 0
+
+        while True:
+
+            generation, client, session = self.generation, self.gcp_session_client, self.gcp_session
+
+            try:
+
+                return client.detect_intent(session=session, query_input=query_input)
+
+            except RECONNECT_ERRORS as e:
+
+                if attempt >= self.max_retries:
+                    raise
+
+                # Output status.
+                print("Encountered DialogFlow error (", type(e).__name__, "); recreating the Sessions Client.")
+
+                # Back off, with jitter so that concurrent requests do not retry together.
+                time.sleep(min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+                self.connect(failed_generation=generation)
+                attempt += 1
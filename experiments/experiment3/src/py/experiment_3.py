@@ -9,6 +9,7 @@ alexjosephswanson@gmail.com
 from auth import gcp_authentication
 
 from .dialog_flow_agent import DialogFlowAgent
+from .multi_submission_agent import MultiSubmissionDialogFlowAgent
 
 
 def process__j_g_c__(submission_id: str):
@@ -36,6 +37,32 @@ def process__j_g_c__(submission_id: str):
     )
 
 
+def process__j_g_c__multi__(submission_ids: list):
+
+    # Define a tuple of Reddit account parameters.
+    reddit_parameters_1 = (
+        "zO1z52xZNtdxrA",
+        "VbAzyOfUcj-94a71j8V_6lUTyAM",
+        "An observer of Subreddit Streams",
+        "ssa1G",
+        "subreddit.stream.agent.1.password"
+    )
+
+    # Define a single DialogFlow agent for every provided Submission.
+    dialog_flow_agent = MultiSubmissionDialogFlowAgent(
+        reddit_parameters=reddit_parameters_1,
+        submission_ids=submission_ids,
+        gcp_project_id="reddit-ai-212207"
+    )
+
+    # Start the Agent's main function.
+    dialog_flow_agent.run(
+        engage=False,
+        process_time_limit=7200
+    )
+
+
 # Run 'main'.
 if __name__ == "__main__":
     process__j_g_c__(submission_id="8gm3un")
+    # process__j_g_c__multi__(submission_ids=["8gm3un"])
@@ -0,0 +1,250 @@
+"""
+The script for the operation of several DialogFlowAgents over several Submissions within a single process. The Agents
+share one Reddit instance, one DialogFlow session, one response cache and one reply poster, and a PollScheduler decides
+which Submission to poll next.
+"""
+
+
+""" Imports """
+from concurrent.futures import ThreadPoolExecutor
+import praw
+import time
+
+from .dialog_flow_agent import DialogFlowAgent
+from .dialogflow_session import DialogFlowSession
+from .poll_scheduler import PollScheduler
+from .reply_poster import ReplyPoster
+from .response_cache import ResponseCache
+
+
+class MultiSubmissionDialogFlowAgent:
+    """
+    An orchestrator of one DialogFlowAgent per Submission, sharing the Reddit and DialogFlow clients between them.
+    """
+
+    """ Constructor """
+    def __init__(
+            self,
+            reddit_parameters: tuple,
+            submission_ids: (list, tuple),
+            gcp_project_id: str,
+            gcp_session_id: str = "dialogflow_reddit_moderation_agent",
+            gcp_language_code: str = "en",
+            comment_poll_limit: int = 100,
+            full_fetch_interval: float = 3600,
+            response_cache_capacity: int = 10000
+    ):
+        """
+        Initializes a DialogFlowAgent for each of the given Submissions.
+
+        :param reddit_parameters: The values necessary to create access to the Reddit API (see DialogFlowAgent).
+        :param submission_ids: The IDs of the Submissions for which to conduct operations.
+        :param gcp_project_id: The Project ID, respective to the project on the Google Cloud Platform.
+        :param gcp_session_id: Provides a description for the current session.
+        :param gcp_language_code: The code indicating which language the DialogFlow agent is expected to interpret.
+        :param comment_poll_limit: The amount of the newest Comments fetched when polling for new Comments.
+        :param full_fetch_interval: The amount of seconds after which a poll fetches the entire Comment forest of a
+            Submission again (see DialogFlowAgent).
+        :param response_cache_capacity: The maximum amount of responses kept in the response cache.
+        """
+
+        self.reddit_parameters = reddit_parameters
+        self.gcp_project_id = gcp_project_id
+        self.gcp_session_id = gcp_session_id
+        self.gcp_language_code = gcp_language_code
+        self.comment_poll_limit = comment_poll_limit
+        self.full_fetch_interval = full_fetch_interval
+
+        # The PRAW Reddit object.
+        self.reddit_instance = praw.Reddit(
+            client_id=reddit_parameters[0],
+            client_secret=reddit_parameters[1],
+            user_agent=reddit_parameters[2],
+            username=reddit_parameters[3],
+            password=reddit_parameters[4]
+        )
+
+        # Define the DialogFlow session.
+        self.dialogflow_session = DialogFlowSession(
+            gcp_project_id=gcp_project_id,
+            gcp_session_id=gcp_session_id,
+            gcp_language_code=gcp_language_code
+        )
+
+        # Define the response cache.
+        self.response_cache = ResponseCache(
+            capacity=response_cache_capacity,
+            cache_fp="../resources/dialogflow/response_cache.json"
+        )
+
+        # The DialogFlowAgents, by Submission ID.
+        self.agents = {}
+
+        # The scheduler of the polls of the Submissions.
+        self.poll_scheduler = PollScheduler()
+
+        # The poster of the generated responses, shared by every Agent and defined by 'run'.
+        self.reply_poster = None
+
+        for submission_id in submission_ids:
+
+            self.add_submission(submission_id)
+
+
+    """ Methods """
+    def add_submission(self, submission_id: str):
+        """
+        Adds a Submission to the Submissions that are monitored. A Submission may be added while the process runs.
+
+        :param submission_id: The ID of the Submission.
+        """
+
+        if submission_id in self.agents:
+            return
+
+        agent = DialogFlowAgent(
+            reddit_parameters=self.reddit_parameters,
+            submission_id=submission_id,
+            gcp_project_id=self.gcp_project_id,
+            gcp_session_id=self.gcp_session_id,
+            gcp_language_code=self.gcp_language_code,
+            comment_poll_limit=self.comment_poll_limit,
+            full_fetch_interval=self.full_fetch_interval,
+            reddit_instance=self.reddit_instance,
+            dialogflow_session=self.dialogflow_session,
+            response_cache=self.response_cache
+        )
+        agent.reply_poster = self.reply_poster
+
+        self.agents[submission_id] = agent
+        self.poll_scheduler.add(submission_id)
+
+
+    def run(
+            self,
+            process_time_limit: int = 0,
+            engage=False,
+            response_workers: int = 8,
+            reply_interval: float = 600,
+            min_poll_interval: float = 30,
+            max_poll_interval: float = 600,
+            max_poll_failures: int = 5
+    ):
+        """
+        The main process. The program polls the Submission chosen by the PollScheduler, generating responses to its new
+        Comments, until 'process_time_limit' is exceeded. The replies to every Submission are posted by a single
+        ReplyPoster, which observes the posting rate of the Reddit account.
+
+        :param process_time_limit: The limit time for the mainloop (in seconds).
+        :param engage: Boolean controller for whether or not to submit generated replies to Comments.
+        :param response_workers: The amount of worker threads used to generate responses concurrently.
+        :param reply_interval: The minimum amount of seconds between two replies posted by the Agent.
+        :param min_poll_interval: The minimum amount of seconds between two polls of a Submission.
+        :param max_poll_interval: The maximum amount of seconds between two polls of a Submission.
+        :param max_poll_failures: The amount of consecutive failed polls of a Submission after which it is no longer
+            monitored. A failed poll counts as a poll without new Comments, so the Submission is polled less often.
+        :return: 0 indicating a process exit.
+        """
+
+        # Define the process time limit.
+        time_limit = time.time() + process_time_limit
+
+        # Define the poll intervals. The velocities observed by a previous process are kept.
+        self.poll_scheduler.min_interval = min_poll_interval
+        self.poll_scheduler.max_interval = max_poll_interval
+
+        # Define the poster of the generated responses, shared by every Agent.
+        self.reply_poster = ReplyPoster(min_interval=reply_interval)
+        for agent in self.agents.values():
+            agent.reply_poster = self.reply_poster
+
+        # Define the executor for the generation of responses.
+        executor = ThreadPoolExecutor(max_workers=max(1, response_workers))
+
+        # Define counter for polls.
+        polls = 0
+
+        # Define the amount of consecutive failed polls of every Submission, by Submission ID.
+        poll_failures = {}
+
+        try:
+
+            while time.time() <= time_limit:
+
+                # Determine the Submission to poll next.
+                submission_id, delay = self.poll_scheduler.next_poll()
+
+                if submission_id is None or delay > 0:
+
+                    # Wait for the next due Submission.
+                    time.sleep(max(0.0, min(delay, time_limit - time.time())))
+                    continue
+
+                # Poll the Submission and respond to its new Comments. An error of one Submission does not end the
+                # monitoring of the others.
+                try:
+
+                    submission_comments = self.agents[submission_id].poll(engage, executor)
+
+                except Exception as e:
+
+                    poll_failures[submission_id] = poll_failures.get(submission_id, 0) + 1
+
+                    # Output status.
+                    print("Caught error while polling Submission ", submission_id, " (", poll_failures[submission_id],
+                          " consecutive failures): ", e)
+
+                    if poll_failures[submission_id] >= max_poll_failures:
+
+                        # Stop monitoring the Submission.
+                        print("Removing Submission ", submission_id, " from the monitored Submissions.")
+                        self.poll_scheduler.remove(submission_id)
+                        self.agents.pop(submission_id)
+                        poll_failures.pop(submission_id)
+
+                    else:
+
+                        # Back off by recording a poll without new Comments.
+                        self.poll_scheduler.record_poll(submission_id, [])
+
+                    continue
+
+                poll_failures.pop(submission_id, None)
+                self.poll_scheduler.record_poll(submission_id, [comment.created_utc for comment in submission_comments])
+                polls += 1
+
+                # Output status.
+                print(
+                    "Polled Submission ", submission_id, ": ", len(submission_comments), " new Comments, ",
+                    "Comment velocity: ", round(self.poll_scheduler.velocities[submission_id] * 60, 2), "/min, ",
+                    "queued replies: ", self.reply_poster.pending(), "\n", "=" * 20, "\n"
+                )
+
+            # Output status.
+            print("\n", "Reached time-limit; completed process after ", polls, " polls.")
+
+        # Catch a KeyboardInterrupt; this is likely to be the most common way to end the process.
+        except KeyboardInterrupt:
+
+            # Output status.
+            print("Finished polls: ", polls)
+            print("Encountered keyboard interrupt; terminating process.")
+
+            # End process.
+            return 0
+
+        finally:
+
+            executor.shutdown(wait=False)
+
+            # Stop posting. The Comments of the discarded replies are not recorded as engaged, so they are responded to
+            # again by a restarted Agent.
+            print("Discarded ", self.reply_poster.stop(), " queued replies.")
+            for agent in self.agents.values():
+                agent.queued_response_hashes.clear()
+
+            # Save the response cache.
+            self.response_cache.save()
+
+            # Output status.
+            print("Response cache usage: ", self.response_cache.stats())
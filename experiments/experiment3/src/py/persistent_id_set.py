@@ -0,0 +1,138 @@
+"""
+A persistent, hash-indexed set of IDs (e.g. of the Comments a DialogFlowAgent has engaged, or of the hashes of the
+responses it has used), so that a restarted Agent does not process the same items again.
+"""
+
+import fcntl
+import hashlib
+import os
+import threading
+
+
+class PersistentIDSet:
+    """
+    An append-only set of IDs backed by a file of comma-terminated IDs.
+
+    IDs are written in batches: a poll of a Submission may skip many Comments at once, and every batch costs a single
+    write and a single 'fsync' of the file. A crash during a write leaves at most a partial ID at the end of the file,
+    which is discarded when the file is read.
+    """
+
+    """ Constructor """
+    def __init__(self, store_fp: str):
+        """
+        Opens the set at the given file-path. The file and its directory are created if they do not exist.
+
+        :param store_fp: The file-path of the set.
+        """
+
+        self.store_fp = store_fp
+
+        # The set of IDs.
+        self.ids = set()
+
+        # The lock that serializes access to 'ids' between threads.
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(store_fp) or ".", exist_ok=True)
+
+        # Read the existing IDs, considering only those that are terminated.
+        try:
+
+            with open(store_fp, "rb") as file:
+                content = file.read()
+
+            self.ids.update(
+                element for element in content[:content.rfind(b",") + 1].decode("utf-8").split(",") if element != ''
+            )
+
+        except FileNotFoundError:
+
+            print("File '" + os.path.basename(store_fp) + "' not found. Starting an empty set.")
+
+
+    """ Methods """
+    @staticmethod
+    def hash_text(text: str):
+        """
+        Returns the ID of a text, for sets of texts (e.g. responses). Texts are compared regardless of letter case and
+        whitespace.
+
+        :param text: The text.
+        :return: The hexadecimal SHA-1 digest of the normalized text.
+        """
+
+        return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+    def add(self, element_id: str):
+        """
+        Adds an ID to the set. See 'add_many'.
+
+        :param element_id: The ID, which must not contain a comma.
+        """
+
+        self.add_many([element_id])
+
+
+    def add_many(self, element_ids: (list, tuple, set)):
+        """
+        Adds a batch of IDs to the set. The IDs that are not yet in the set are written to the file, and synced to
+        disk, in a single append before they are added to the in-memory set.
+
+        :param element_ids: The IDs, none of which may contain a comma.
+        """
+
+        with self.lock:
+
+            # Define the IDs that are not yet in the set, without repetitions.
+            new_ids = [element_id for element_id in dict.fromkeys(element_ids) if element_id not in self.ids]
+
+            if not new_ids:
+                return
+
+            with open(self.store_fp, "ab") as file:
+
+                # Several Agents may monitor the same Submission, so the file is locked for the append.
+                fcntl.flock(file, fcntl.LOCK_EX)
+
+                try:
+
+                    # Cut off a partial ID at the end of the file, so that it is not joined to the first new ID. IDs are
+                    # far shorter than the 4096 bytes read.
+                    file_size = file.tell()
+                    if file_size > 0:
+
+                        with open(self.store_fp, "rb") as reader:
+
+                            reader.seek(max(0, file_size - 4096))
+                            tail = reader.read()
+
+                        if not tail.endswith(b","):
+                            os.ftruncate(file.fileno(), file_size - len(tail) + tail.rfind(b",") + 1)
+
+                    # Perform output.
+                    file.write("".join(element_id + "," for element_id in new_ids).encode("utf-8"))
+                    file.flush()
+                    os.fsync(file.fileno())
+
+                finally:
+
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+            self.ids.update(new_ids)
+
+
+    def __contains__(self, element_id: str):
+
+        return element_id in self.ids
+
+
+    def __iter__(self):
+
+        return iter(set(self.ids))
+
+
+    def __len__(self):
+
+        return len(self.ids)
@@ -0,0 +1,169 @@
+"""
+A scheduler of the polls of several Reddit Submissions. Every Submission is polled at an interval that adapts to its
+observed Comment velocity, so busy threads are polled often and quiet threads rarely; among the Submissions that are
+due, the one with the most pending (expected, unfetched) Comments is polled first.
+"""
+
+
+""" Imports """
+import time
+
+
+class PollScheduler:
+    """
+    A scheduler of Submission polls. A Submission is due once the amount of Comments expected since its last poll
+    (its Comment velocity times the time elapsed) reaches 'target_backlog', and at least every 'max_interval' seconds,
+    but never within 'min_interval' seconds of its last poll.
+    """
+
+    """ Constructor """
+    def __init__(
+            self,
+            min_interval: float = 30,
+            max_interval: float = 600,
+            target_backlog: float = 10,
+            smoothing: float = 0.5
+    ):
+        """
+        Creates an empty PollScheduler.
+
+        :param min_interval: The minimum amount of seconds between two polls of a Submission.
+        :param max_interval: The maximum amount of seconds between two polls of a Submission.
+        :param target_backlog: The amount of new Comments a poll is expected to fetch.
+        :param smoothing: The weight of the latest poll in the Comment velocity of a Submission (an exponentially
+            weighted moving average).
+        """
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_backlog = target_backlog
+        self.smoothing = smoothing
+
+        # The time of the last poll of every Submission, by Submission ID. None until the Submission is first polled.
+        self.last_polls = {}
+
+        # The Comment velocity of every Submission (Comments per second), by Submission ID.
+        self.velocities = {}
+
+
+    """ Methods """
+    def add(self, submission_id: str):
+        """
+        Adds a Submission to the schedule. A Submission that has not been polled is due immediately.
+
+        :param submission_id: The ID of the Submission.
+        """
+
+        self.last_polls.setdefault(submission_id, None)
+        self.velocities.setdefault(submission_id, 0.0)
+
+
+    def remove(self, submission_id: str):
+        """
+        Removes a Submission from the schedule.
+
+        :param submission_id: The ID of the Submission.
+        """
+
+        self.last_polls.pop(submission_id, None)
+        self.velocities.pop(submission_id, None)
+
+
+    def record_poll(self, submission_id: str, comment_times: (list, tuple), poll_time: float = None):
+        """
+        Records a poll of a Submission and updates its Comment velocity.
+
+        :param submission_id: The ID of the Submission.
+        :param comment_times: The creation times (in UTC seconds) of the new Comments fetched by the poll.
+        :param poll_time: The time of the poll. If None, the current time is used.
+        """
+
+        poll_time = time.time() if poll_time is None else poll_time
+        last_poll = self.last_polls[submission_id]
+
+        # Define the period over which the Comments were created. The first poll fetches every existing Comment, which
+        # were created since the oldest of them.
+        if last_poll is not None:
+            period = poll_time - last_poll
+        elif comment_times:
+            period = poll_time - min(comment_times)
+        else:
+            period = 0.0
+
+        if period > 0:
+
+            velocity = len(comment_times) / period
+
+            # Update the moving average. The first observation replaces the initial velocity.
+            self.velocities[submission_id] = velocity if last_poll is None \
+                else self.smoothing * velocity + (1 - self.smoothing) * self.velocities[submission_id]
+
+        self.last_polls[submission_id] = poll_time
+
+
+    def backlog(self, submission_id: str, now: float = None):
+        """
+        Returns the amount of Comments expected to have been created since the last poll of a Submission.
+
+        :param submission_id: The ID of the Submission.
+        :param now: The current time. If None, the current time is used.
+        :return: The expected amount of new Comments, or infinity if the Submission has not been polled.
+        """
+
+        now = time.time() if now is None else now
+        last_poll = self.last_polls[submission_id]
+
+        if last_poll is None:
+            return float("inf")
+
+        return self.velocities[submission_id] * (now - last_poll)
+
+
+    def due_time(self, submission_id: str):
+        """
+        Returns the time at which a Submission is due to be polled.
+
+        :param submission_id: The ID of the Submission.
+        :return: The due time.
+        """
+
+        last_poll = self.last_polls[submission_id]
+
+        if last_poll is None:
+            return float("-inf")
+
+        velocity = self.velocities[submission_id]
+        interval = self.max_interval if velocity <= 0 else self.target_backlog / velocity
+
+
+        return last_poll + min(self.max_interval, max(self.min_interval, interval))
+
+
+    def next_poll(self, now: float = None):
+        """
+        Determines the Submission to poll next.
+
+        :param now: The current time. If None, the current time is used.
+        :return: The tuple of the ID of the Submission and the amount of seconds until it is due (0 if it is due). If
+            the schedule is empty, the ID is None.
+        """
+
+        now = time.time() if now is None else now
+
+        if not self.last_polls:
+            return None, self.max_interval
+
+        due_submission_ids = [
+            submission_id for submission_id in self.last_polls if self.due_time(submission_id) <= now
+        ]
+
+        if due_submission_ids:
+
+            # Poll the due Submission with the most pending Comments.
+            return max(due_submission_ids, key=lambda submission_id: self.backlog(submission_id, now)), 0.0
+
+        # Wait for the Submission that is due first.
+        submission_id = min(self.last_polls, key=self.due_time)
+
+
+        return submission_id, self.due_time(submission_id) - now
@@ -0,0 +1,189 @@
+"""
+A queue of generated Comment replies that a background worker posts to Reddit at a limited rate. Replies are generated
+independently of the posting cadence and wait in the queue for their posting slot.
+
+RateLimiter and ReplyPoster follow the design of the RateLimiter and EngagementScheduler of experiment2
+('engagement_scheduler.py'), which posts the comments of the Reddit Agent; the experiments are separate packages, so
+the design is kept in both rather than imported. The only additions here are 'ReplyPoster.stop', which ends a
+DialogFlowAgent process without waiting for its queued replies, and the 'stopped' event of 'RateLimiter.acquire' that it
+relies on. A change to the posting semantics of either module should be made to both.
+"""
+
+
+""" Imports """
+import queue
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A rate limiter that grants posting slots separated by a minimum interval.
+    """
+
+    """ Class Fields """
+    # The minimum amount of seconds between two posts.
+    min_interval = float()
+
+
+    """ Constructor """
+    def __init__(self, min_interval: float = 600):
+        """
+        Creates a RateLimiter.
+
+        :param min_interval: The minimum amount of seconds between two posts, which accounts for Reddit Comment creation
+            rules and ensures a desirable perception of the Agent on Reddit.
+        """
+
+        self.min_interval = min_interval
+
+        # The time at which the next slot becomes available.
+        self.next_slot = 0.0
+
+        # The lock that serializes slot reservations.
+        self.lock = threading.Lock()
+
+
+    """ Methods """
+    def acquire(self, stopped: threading.Event = None):
+        """
+        Blocks until a posting slot is available and reserves it.
+
+        :param stopped: The event that ends the wait early, if any.
+        :return: False if the wait was ended by 'stopped', True otherwise.
+        """
+
+        with self.lock:
+
+            # Reserve the next slot.
+            slot = max(self.next_slot, time.time())
+            self.next_slot = slot + self.min_interval
+
+        # Wait for the reserved slot.
+        delay = max(0.0, slot - time.time())
+        if stopped is not None:
+            return not stopped.wait(delay)
+
+        time.sleep(delay)
+
+
+        return True
+
+
+class ReplyPoster:
+    """
+    A queue of pending replies drained by a background worker through a RateLimiter.
+    """
+
+    """ Constructor """
+    def __init__(self, min_interval: float = 600, rate_limiter: RateLimiter = None):
+        """
+        Creates a ReplyPoster and starts its worker.
+
+        :param min_interval: The minimum amount of seconds between two posts, used if no 'rate_limiter' is given.
+        :param rate_limiter: The rate limiter that grants posting slots.
+        """
+
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(min_interval=min_interval)
+
+        # The queue of pending replies.
+        self.replies = queue.Queue()
+
+        # The event that stops the worker.
+        self.stopped = threading.Event()
+
+        # Define and start the worker.
+        self.worker = threading.Thread(target=self.run, name="reply-poster", daemon=True)
+        self.worker.start()
+
+
+    """ Methods """
+    def submit(self, post, on_posted=None, on_failed=None):
+        """
+        Queues a reply.
+
+        :param post: The function that posts the reply.
+        :param on_posted: The function called once the reply has been posted.
+        :param on_failed: The function called, with the raised exception, if the reply could not be posted (e.g. an
+            APIException if the Reddit API rejects the reply).
+        """
+
+        self.replies.put((post, on_posted, on_failed))
+
+
+    def pending(self):
+        """
+        Returns the amount of replies that have not been posted.
+
+        :return: The amount of pending replies.
+        """
+
+        return self.replies.unfinished_tasks
+
+
+    def join(self):
+        """
+        Blocks until every queued reply has been processed.
+        """
+
+        self.replies.join()
+
+
+    def stop(self):
+        """
+        Stops the worker, discarding the pending replies.
+
+        :return: The amount of discarded replies.
+        """
+
+        self.stopped.set()
+        self.worker.join()
+
+
+        return self.replies.qsize()
+
+
+    def run(self):
+        """
+        The worker process. Posts the queued replies, waiting for a posting slot before each one.
+        """
+
+        while not self.stopped.is_set():
+
+            try:
+                post, on_posted, on_failed = self.replies.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            try:
+
+                # Wait for a posting slot, unless the worker is stopped in the meantime.
+                if not self.rate_limiter.acquire(stopped=self.stopped):
+
+                    # Return the reply to the queue so that it is counted as discarded.
+                    self.replies.put((post, on_posted, on_failed))
+                    return
+
+                try:
+
+                    # Post the reply.
+                    post()
+
+                except Exception as e:
+
+                    if on_failed is not None:
+                        on_failed(e)
+
+                else:
+
+                    if on_posted is not None:
+                        on_posted()
+
+            except Exception as e:
+
+                # Keep the worker alive for the remaining replies.
+                print("Caught error in 'ReplyPoster': ", e)
+
+            finally:
+
+                self.replies.task_done()
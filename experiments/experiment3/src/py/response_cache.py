@@ -0,0 +1,317 @@
+"""
+A cache of DialogFlow responses by Comment text. Comments are looked up by their normalized text and, failing an exact
+match, by MinHash similarity through a locality-sensitive hashing (LSH) index, so that repeated and near-identical
+Comments are answered without a DialogFlow request. The cache is bounded by least-recent use and may be saved to disk.
+"""
+
+
+""" Imports """
+from collections import OrderedDict
+import json
+import numpy
+import os
+import re
+import threading
+import zlib
+
+
+# The Mersenne prime 2^31 - 1, the modulus of the MinHash permutations. Products of two residues fit within 64 bits.
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class ResponseCache:
+    """
+    An LRU-bounded map from normalized Comment text to DialogFlow response, with a MinHash LSH index for near-duplicate
+    lookups. The MinHash signature of a text is taken over its character shingles; it is divided into bands, and two
+    texts are candidates for a near-duplicate match if any of their bands are identical. A candidate is a match if the
+    estimated Jaccard similarity of the texts' shingles reaches the similarity threshold.
+    """
+
+    """ Constructor """
+    def __init__(
+            self,
+            capacity: int = 10000,
+            similarity_threshold: float = 0.8,
+            num_permutations: int = 64,
+            num_bands: int = 16,
+            shingle_size: int = 4,
+            cache_fp: str = None
+    ):
+        """
+        Creates a ResponseCache, loading the saved cache if there is one.
+
+        :param capacity: The maximum amount of entries. The least recently used entry is evicted beyond it.
+        :param similarity_threshold: The minimum estimated Jaccard similarity of a near-duplicate.
+        :param num_permutations: The length of the MinHash signatures.
+        :param num_bands: The amount of LSH bands, which must divide 'num_permutations'. More bands find less similar
+            candidates.
+        :param shingle_size: The length of the character shingles of a text.
+        :param cache_fp: The file-path to which the cache is saved. If None, the cache is not persisted.
+        """
+
+        if num_permutations % num_bands != 0:
+            raise ValueError("The amount of bands must divide the amount of permutations.")
+
+        self.capacity = capacity
+        self.similarity_threshold = similarity_threshold
+        self.num_bands = num_bands
+        self.band_size = num_permutations // num_bands
+        self.shingle_size = shingle_size
+        self.cache_fp = cache_fp
+
+        # Define the MinHash permutations, (a * x + b) mod p. The seed is fixed so that signatures are stable.
+        generator = numpy.random.RandomState(196)
+        self.permutation_a = generator.randint(1, MERSENNE_PRIME, size=(num_permutations, 1)).astype(numpy.int64)
+        self.permutation_b = generator.randint(0, MERSENNE_PRIME, size=(num_permutations, 1)).astype(numpy.int64)
+
+        # The entries, by normalized text, in order of use: the response and the MinHash signature of the text.
+        self.entries = OrderedDict()
+
+        # The LSH index: the normalized texts of the entries, by band index and band of signature.
+        self.buckets = {}
+
+        # The counts of exact hits, near-duplicate hits and misses.
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        # The lock that serializes access to the cache, which is shared by the response generation threads.
+        self.lock = threading.Lock()
+
+        if cache_fp is not None:
+            self.load()
+
+
+    """ Methods """
+    @staticmethod
+    def normalize(text: str):
+        """
+        Normalizes a text, ignoring letter case, punctuation and whitespace.
+
+        :param text: The text.
+        :return: The normalized text.
+        """
+
+        return " ".join(re.findall(r"\w+", text.lower()))
+
+
+    def signature(self, normalized_text: str):
+        """
+        Computes the MinHash signature of a normalized text over its character shingles.
+
+        :param normalized_text: The normalized text.
+        :return: The signature, as a tuple of 'num_permutations' integers.
+        """
+
+        # Define the hashes of the shingles. Texts shorter than a shingle are a single shingle.
+        shingles = numpy.fromiter(
+            {
+                zlib.crc32(normalized_text[i:i + self.shingle_size].encode("utf-8")) % MERSENNE_PRIME
+                for i in range(max(1, len(normalized_text) - self.shingle_size + 1))
+            },
+            dtype=numpy.int64
+        )
+
+        # Apply every permutation to every shingle and keep the minimum of each permutation.
+        return tuple(((self.permutation_a * shingles + self.permutation_b) % MERSENNE_PRIME).min(axis=1).tolist())
+
+
+    def bands(self, signature: tuple):
+        """
+        Returns the LSH bucket keys of a signature.
+
+        :param signature: The MinHash signature.
+        :return: The list of (band index, band) keys.
+        """
+
+        return [
+            (band, signature[band * self.band_size:(band + 1) * self.band_size]) for band in range(self.num_bands)
+        ]
+
+
+    def get(self, text: str):
+        """
+        Returns the cached response to a text, or to a near-duplicate of it.
+
+        :param text: The text of the Comment.
+        :return: The response, or None if neither the text nor a near-duplicate is cached.
+        """
+
+        return self.lookup(text)[0]
+
+
+    def lookup(self, text: str):
+        """
+        Looks up a text in the cache (see 'get').
+
+        :param text: The text of the Comment.
+        :return: The tuple of the response (or None) and the MinHash signature of the text (or None if the text itself
+            is cached), which may be passed to 'put' if the response is to be cached.
+        """
+
+        normalized_text = self.normalize(text)
+
+        with self.lock:
+
+            # Look up the text itself.
+            entry = self.entries.get(normalized_text)
+
+            if entry is not None:
+
+                self.entries.move_to_end(normalized_text)
+                self.hits += 1
+
+                return entry[0], None
+
+        # Compute the signature of the text outside of the lock.
+        signature = self.signature(normalized_text)
+
+        with self.lock:
+
+            # Collect the candidates that share a band with the text.
+            candidates = set()
+            for key in self.bands(signature):
+                candidates.update(self.buckets.get(key, ()))
+
+            # Define the most similar candidate.
+            best_text, best_similarity = None, 0.0
+            for candidate in candidates:
+
+                similarity = sum(
+                    x == y for x, y in zip(signature, self.entries[candidate][1])
+                ) / len(signature)
+
+                if similarity > best_similarity:
+                    best_text, best_similarity = candidate, similarity
+
+            if best_text is None or best_similarity < self.similarity_threshold:
+
+                self.misses += 1
+
+                return None, signature
+
+            self.entries.move_to_end(best_text)
+            self.near_hits += 1
+
+
+            return self.entries[best_text][0], signature
+
+
+    def put(self, text: str, response: str, signature: tuple = None):
+        """
+        Caches the response to a text, evicting the least recently used entries beyond the capacity.
+
+        :param text: The text of the Comment.
+        :param response: The response.
+        :param signature: The MinHash signature of the text, if it has been computed (see 'lookup').
+        """
+
+        normalized_text = self.normalize(text)
+        if signature is None:
+            signature = self.signature(normalized_text)
+
+        with self.lock:
+
+            self.insert(normalized_text, response, signature)
+
+
+    def insert(self, normalized_text: str, response: str, signature: tuple):
+        """
+        Inserts an entry while the lock is held.
+
+        :param normalized_text: The normalized text.
+        :param response: The response.
+        :param signature: The MinHash signature of the text.
+        """
+
+        if normalized_text in self.entries:
+            self.remove(normalized_text)
+
+        self.entries[normalized_text] = (response, signature)
+
+        for key in self.bands(signature):
+            self.buckets.setdefault(key, set()).add(normalized_text)
+
+        # Evict the least recently used entries.
+        while len(self.entries) > self.capacity:
+            self.remove(next(iter(self.entries)))
+
+
+    def remove(self, normalized_text: str):
+        """
+        Removes an entry and its LSH index keys while the lock is held.
+
+        :param normalized_text: The normalized text.
+        """
+
+        _, signature = self.entries.pop(normalized_text)
+
+        for key in self.bands(signature):
+
+            bucket = self.buckets[key]
+            bucket.discard(normalized_text)
+
+            if not bucket:
+                del self.buckets[key]
+
+
+    def stats(self):
+        """
+        Returns the usage statistics of the cache.
+
+        :return: The dict of the amount of entries, exact hits, near-duplicate hits and misses, and the hit rate.
+        """
+
+        with self.lock:
+
+            lookups = self.hits + self.near_hits + self.misses
+
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0
+            }
+
+
+    def save(self):
+        """
+        Saves the entries of the cache, in order of use, to 'cache_fp'. The file is replaced atomically.
+        """
+
+        if self.cache_fp is None:
+            return
+
+        with self.lock:
+
+            entries = [[normalized_text, entry[0]] for normalized_text, entry in self.entries.items()]
+
+        os.makedirs(os.path.dirname(self.cache_fp) or ".", exist_ok=True)
+        temporary_fp = self.cache_fp + ".tmp"
+
+        with open(temporary_fp, "w") as file:
+            json.dump(entries, file)
+
+        os.replace(temporary_fp, self.cache_fp)
+
+
+    def load(self):
+        """
+        Loads the saved entries of the cache from 'cache_fp', if it exists.
+        """
+
+        try:
+
+            with open(self.cache_fp, "r") as file:
+                entries = json.load(file)
+
+        except FileNotFoundError:
+
+            print("File '" + os.path.basename(self.cache_fp) + "' not found. Starting an empty cache.")
+            return
+
+        with self.lock:
+
+            for normalized_text, response in entries:
+                self.insert(normalized_text, response, self.signature(normalized_text))